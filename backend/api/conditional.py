@@ -0,0 +1,77 @@
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+import hashlib
+
+
+def library_validators(user: Dict, variant: str = "") -> Tuple[str, Optional[datetime]]:
+    """
+    ETag and Last-Modified for data derived from a user's last scrape.
+    Stored library data only changes when a scrape rewrites the user row and
+    its scraped_at, so together with the variant (which endpoint and query)
+    that identifies the response body.
+    """
+    scraped_at = user.get('scraped_at')
+    digest = hashlib.sha256(f"{user.get('id')}|{scraped_at}|{variant}".encode('utf-8')).hexdigest()
+    etag = f'"{digest[:32]}"'
+
+    last_modified = None
+    if scraped_at:
+        try:
+            last_modified = datetime.fromisoformat(str(scraped_at).replace('Z', '+00:00'))
+        except ValueError:
+            last_modified = None
+    if last_modified is not None and last_modified.tzinfo is None:
+        # Timestamps are stored as naive UTC
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return etag, last_modified
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """Evaluate If-None-Match, or failing that If-Modified-Since, per RFC 7232"""
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        candidates = [tag.strip() for tag in if_none_match.split(',')]
+        # If-None-Match uses weak comparison
+        return '*' in candidates or etag in [tag[2:] if tag.startswith('W/') else tag for tag in candidates]
+
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP dates have one-second resolution
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def conditional_response(
+    request: Request,
+    etag: str,
+    last_modified: Optional[datetime],
+    build_payload: Callable[[], Any],
+) -> Response:
+    """
+    Return 304 when the client's copy is current; otherwise build, encode and
+    return the payload. The payload is only built when it will be sent, and
+    may itself be a Response (e.g. a streamed one), which gets the validators.
+    The body's format can follow the Accept header, so caches are told so.
+    """
+    headers = {'ETag': etag, 'Cache-Control': 'private, no-cache', 'Vary': 'Accept'}
+    if last_modified is not None:
+        headers['Last-Modified'] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    payload = build_payload()
+    if isinstance(payload, Response):
+        payload.headers.update(headers)
+        return payload
+    return JSONResponse(content=jsonable_encoder(payload), headers=headers)
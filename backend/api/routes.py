@@ -1,8 +1,21 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
-from pydantic import BaseModel, HttpUrl
-from typing import Optional, Dict
-from services.scraping_service import scraping_service
-from middleware.auth import verify_api_key, get_api_keys
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import FileResponse, JSONResponse, Response
+from pydantic import BaseModel, Field, HttpUrl
+from typing import Optional, Dict, List
+from services.scraping_service import ScrapingService, get_scraping_service
+from services.job_service import JobService, get_job_service
+from services.cache import library_cache
+from services.lifecycle import build_timings
+from services.metrics import render as render_metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from services.startup import startup_state, check_readiness
+from services.refresh_scheduler import get_refresh_scheduler
+from services.profiling import find_profile
+from middleware.auth import verify_api_key, verify_admin_api_key, is_admin_api_key, get_api_keys
+from middleware.profiling import run_blocking
+from models.user_book import ReadingStatus
+from services.database import DatabaseService, get_database_service, build_user_books_select
+from api.conditional import library_validators, conditional_response
+from api.streaming import requested_stream_format, stream_rows
 import logging
 import os
 
@@ -13,6 +26,14 @@ router = APIRouter()
 class ScrapeRequest(BaseModel):
     profile_url: HttpUrl
     full_scrape: bool = True
+    streaming: bool = False
+    incremental: bool = True
+
+class BatchScrapeRequest(BaseModel):
+    profile_urls: List[HttpUrl] = Field(..., min_length=1, max_length=1000)
+    max_parallel: int = Field(4, ge=1, le=16)
+    streaming: bool = False
+    incremental: bool = True
 
 class ScrapeResponse(BaseModel):
     success: bool
@@ -20,8 +41,29 @@ class ScrapeResponse(BaseModel):
     user_id: Optional[str] = None
     username: Optional[str] = None
     books_count: Optional[int] = None
+    changes: Optional[Dict[str, int]] = None
+    timings: Optional[Dict[str, float]] = None
     error: Optional[str] = None
 
+class ScrapeJobResponse(BaseModel):
+    job_id: str
+    state: str
+    status_url: str
+
+class ScrapeJobStatusResponse(BaseModel):
+    job_id: str
+    kind: str
+    params: Dict
+    state: str
+    attempts: int
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    timings: Dict[str, float] = {}
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+    profile_id: Optional[str] = None
+
 class AuthValidateRequest(BaseModel):
     api_key: str
 
@@ -29,24 +71,41 @@ class AuthValidateResponse(BaseModel):
     is_admin: bool
     key_type: Optional[str] = None
 
-@router.post("/scrape", response_model=ScrapeResponse)
+@router.post("/scrape", response_model=ScrapeJobResponse, status_code=202)
 async def scrape_goodreads_profile(
     request: ScrapeRequest,
-    background_tasks: BackgroundTasks,
-    api_key: str = Depends(verify_api_key)
+    http_request: Request,
+    api_key: str = Depends(verify_api_key),
+    job_service: JobService = Depends(get_job_service)
 ):
+    """
+    Queue a scrape of a Goodreads profile. The scrape runs in the background;
+    poll the returned status_url for its progress and result.
+
+    Admin requests that ask for profiling (X-Profile header or profile query
+    flag) also profile the scrape itself; the job status carries its profile_id.
+
+    While a scrape of the same profile is queued or running, its job is
+    returned rather than a new one.
+    """
     try:
         profile_url = str(request.profile_url)
 
         if "goodreads.com" not in profile_url:
             raise HTTPException(status_code=400, detail="Invalid Goodreads URL")
 
-        result = scraping_service.scrape_and_save_user(profile_url)
-
-        if not result['success']:
-            raise HTTPException(status_code=500, detail=result.get('message', 'Scraping failed'))
+        job = job_service.submit_scrape(
+            profile_url,
+            streaming=request.streaming,
+            incremental=request.incremental,
+            profile_mode=getattr(http_request.state, 'profile_mode', None)
+        )
 
-        return ScrapeResponse(**result)
+        return ScrapeJobResponse(
+            job_id=job.id,
+            state=job.state.value,
+            status_url=f"/api/v1/scrape/jobs/{job.id}"
+        )
 
     except HTTPException:
         raise
@@ -54,18 +113,108 @@ async def scrape_goodreads_profile(
         logger.error(f"Error in scrape endpoint: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/scrape/batch", response_model=ScrapeJobResponse, status_code=202)
+async def batch_scrape_goodreads_profiles(
+    request: BatchScrapeRequest,
+    api_key: str = Depends(verify_api_key),
+    job_service: JobService = Depends(get_job_service)
+):
+    """
+    Queue a scrape of many Goodreads profiles as one job. The job result lists
+    each profile's outcome along with aggregate throughput.
+    """
+    profile_urls = [str(url) for url in request.profile_urls]
+
+    invalid = [url for url in profile_urls if "goodreads.com" not in url]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid Goodreads URLs: {', '.join(invalid)}")
+
+    try:
+        job = job_service.submit_batch_scrape(
+            profile_urls,
+            max_parallel=request.max_parallel,
+            streaming=request.streaming,
+            incremental=request.incremental
+        )
+
+        return ScrapeJobResponse(
+            job_id=job.id,
+            state=job.state.value,
+            status_url=f"/api/v1/scrape/jobs/{job.id}"
+        )
+
+    except Exception as e:
+        logger.error(f"Error in batch scrape endpoint: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/scrape/jobs/{job_id}", response_model=ScrapeJobStatusResponse)
+async def get_scrape_job(
+    job_id: str,
+    api_key: str = Depends(verify_api_key),
+    job_service: JobService = Depends(get_job_service)
+):
+    job = job_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return job.to_dict()
+
 @router.get("/user/{username}")
 async def get_user_data(
     username: str,
-    api_key: str = Depends(verify_api_key)
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    format: Optional[str] = Query(None, pattern="^(json|ndjson|json-stream)$"),
+    api_key: str = Depends(verify_api_key),
+    scraping_service: ScrapingService = Depends(get_scraping_service),
+    database_service: DatabaseService = Depends(get_database_service)
 ):
-    try:
-        result = scraping_service.get_user_library(username)
+    """
+    Return a user and their library. Pass limit to page through the books
+    (newest first) using the returned next_cursor, and fields (comma-separated,
+    e.g. title,author,image_url,status) to return only those book fields.
+
+    format=ndjson (or Accept: application/x-ndjson) streams one book per line,
+    and format=json-stream streams the usual document; both read the library
+    from the database in chunks instead of loading it whole.
+
+    Library reads are blocking database calls, so they run in the threadpool,
+    where concurrent cold reads of one user share a fetch.
+    """
+    def respond():
+        user = scraping_service.get_user(username)
+        if not user:
+            raise HTTPException(status_code=404, detail='User not found')
+
+        field_list = [field for field in fields.split(',') if field.strip()] if fields else None
+        stream_format = requested_stream_format(request, format)
 
-        if not result['success']:
-            raise HTTPException(status_code=404, detail=result.get('message', 'User not found'))
+        def build_library():
+            if stream_format:
+                try:
+                    build_user_books_select(field_list)
+                except ValueError as e:
+                    raise HTTPException(status_code=400, detail=str(e))
+                books = database_service.iter_user_books(user['id'], fields=field_list)
+                return stream_rows(stream_format, {"success": True, "user": user}, "books", "total_books", books)
 
-        return result
+            try:
+                result = scraping_service.get_user_library(
+                    username, limit=limit, cursor=cursor, fields=field_list
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            if not result['success']:
+                raise HTTPException(status_code=404, detail=result.get('message', 'User not found'))
+            return result
+
+        etag, last_modified = library_validators(user, f"library|{limit}|{cursor}|{fields}|{stream_format}")
+        return conditional_response(request, etag, last_modified, build_library)
+
+    try:
+        return await run_blocking(request, respond)
 
     except HTTPException:
         raise
@@ -76,19 +225,27 @@ async def get_user_data(
 @router.get("/user/{username}/currently-reading")
 async def get_currently_reading_books(
     username: str,
-    api_key: str = Depends(verify_api_key)
+    request: Request,
+    api_key: str = Depends(verify_api_key),
+    scraping_service: ScrapingService = Depends(get_scraping_service),
+    database_service: DatabaseService = Depends(get_database_service)
 ):
     try:
-        from services.database import database_service
-        books = database_service.get_currently_reading_books(username)
+        def build_books():
+            books = database_service.get_currently_reading_books(username)
+            return {
+                "success": True,
+                "username": username,
+                "currently_reading": books,
+                "count": len(books)
+            }
 
-        return {
-            "success": True,
-            "username": username,
-            "currently_reading": books,
-            "count": len(books)
-        }
+        return await run_blocking(
+            request, lambda: library_response(request, scraping_service, username, "currently-reading", build_books)
+        )
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching currently reading books: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -96,23 +253,116 @@ async def get_currently_reading_books(
 @router.get("/user/{username}/read")
 async def get_read_books(
     username: str,
-    api_key: str = Depends(verify_api_key)
+    request: Request,
+    api_key: str = Depends(verify_api_key),
+    scraping_service: ScrapingService = Depends(get_scraping_service),
+    database_service: DatabaseService = Depends(get_database_service)
 ):
     try:
-        from services.database import database_service
-        books = database_service.get_read_books(username)
+        def build_books():
+            books = database_service.get_read_books(username)
+            return {
+                "success": True,
+                "username": username,
+                "read_books": books,
+                "count": len(books)
+            }
 
-        return {
-            "success": True,
-            "username": username,
-            "read_books": books,
-            "count": len(books)
-        }
+        return await run_blocking(
+            request, lambda: library_response(request, scraping_service, username, "read", build_books)
+        )
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching read books: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/user/{username}/status/{status}")
+async def get_books_by_status(
+    username: str,
+    status: ReadingStatus,
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    format: Optional[str] = Query(None, pattern="^(json|ndjson|json-stream)$"),
+    api_key: str = Depends(verify_api_key),
+    scraping_service: ScrapingService = Depends(get_scraping_service),
+    database_service: DatabaseService = Depends(get_database_service)
+):
+    """
+    Return a user's books on one status shelf. Pass limit to page through
+    them (newest first) using the returned next_cursor. format=ndjson or
+    format=json-stream stream the books, read from the database in chunks.
+    """
+    try:
+        stream_format = requested_stream_format(request, format)
+
+        def build_books():
+            if stream_format:
+                user = scraping_service.get_user(username)
+                books = database_service.iter_user_books(user['id'], status=status.value) if user else iter(())
+                return stream_rows(
+                    stream_format,
+                    {"success": True, "username": username, "status": status.value},
+                    "books",
+                    "count",
+                    books
+                )
+
+            if limit:
+                user = scraping_service.get_user(username)
+                try:
+                    page = database_service.get_user_books_page(
+                        user['id'], limit, cursor=cursor, status=status.value
+                    ) if user else {'books': [], 'next_cursor': None}
+                except ValueError as e:
+                    raise HTTPException(status_code=400, detail=str(e))
+                return {
+                    "success": True,
+                    "username": username,
+                    "status": status.value,
+                    "books": page['books'],
+                    "count": len(page['books']),
+                    "next_cursor": page['next_cursor']
+                }
+
+            books = database_service.get_books_by_status(username, status.value)
+            return {
+                "success": True,
+                "username": username,
+                "status": status.value,
+                "books": books,
+                "count": len(books)
+            }
+
+        return await run_blocking(
+            request,
+            lambda: library_response(
+                request, scraping_service, username, f"status:{status.value}|{limit}|{cursor}|{stream_format}", build_books
+            ),
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching {status.value} books: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def library_response(
+    request: Request, scraping_service: ScrapingService, username: str, variant: str, build_payload
+):
+    """
+    Respond with conditional-request support when the user is known. Unknown
+    users keep the plain response (an empty list) without validators.
+    """
+    user = scraping_service.get_user(username)
+    if not user:
+        return build_payload()
+
+    etag, last_modified = library_validators(user, variant)
+    return conditional_response(request, etag, last_modified, build_payload)
+
 @router.post("/auth/validate", response_model=AuthValidateResponse)
 async def validate_api_key(request: AuthValidateRequest):
     """
@@ -139,8 +389,7 @@ async def validate_api_key(request: AuthValidateRequest):
             )
 
         # Determine if this is an admin key
-        personal_key = os.getenv("PERSONAL_API_KEY")
-        is_admin = (api_key == personal_key)
+        is_admin = is_admin_api_key(api_key)
 
         key_type = "personal" if is_admin else "web_app"
 
@@ -157,4 +406,58 @@ async def validate_api_key(request: AuthValidateRequest):
 
 @router.get("/health")
 async def health_check():
-    return {"status": "healthy", "service": "goodreads-scraper-api"}
\ No newline at end of file
+    """
+    Liveness. Reports "starting" until the background warm-up has built the
+    services, and "degraded" if it failed; it never touches the backends.
+    """
+    if startup_state.error:
+        status = "degraded"
+    elif startup_state.warmed_up:
+        status = "healthy"
+    else:
+        status = "starting"
+
+    return {
+        "status": status,
+        "service": "goodreads-scraper-api",
+        "services": {
+            "database": get_database_service.initialized,
+            "scraping": get_scraping_service.initialized,
+            "jobs": get_job_service.initialized,
+            "refresh": get_refresh_scheduler.initialized,
+        },
+        "startup_timings": startup_state.report or build_timings,
+        "library_cache": library_cache.stats(),
+        "refresh": get_refresh_scheduler().stats() if get_refresh_scheduler.initialized else None
+    }
+
+@router.get("/ready")
+def readiness_check():
+    """
+    Readiness: 200 once the services are built and the storage backend
+    answers a query, 503 until then.
+    """
+    ready, checks = check_readiness()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "checks": checks}
+    )
+
+@router.get("/metrics")
+async def metrics(api_key: str = Depends(verify_admin_api_key)):
+    """Prometheus metrics: route and scrape stage latencies, upstream and database calls, cache lookups"""
+    return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, api_key: str = Depends(verify_admin_api_key)):
+    """
+    Download a stored profile: pstats for cprofile runs (load with pstats or
+    snakeviz), speedscope JSON for sampled runs (open in speedscope.app).
+    """
+    found = find_profile(profile_id)
+    if not found:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    mode, path = found
+    media_type = "application/json" if mode == "sample" else "application/octet-stream"
+    return FileResponse(path, media_type=media_type, filename=os.path.basename(path))
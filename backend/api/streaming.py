@@ -0,0 +1,86 @@
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from typing import Dict, Iterator, Optional
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Rows are encoded and sent in groups of this size
+ROWS_PER_WRITE = 100
+
+
+def requested_stream_format(request: Request, format: Optional[str]) -> Optional[str]:
+    """
+    "ndjson" or "json-stream" when the client asked for a streamed response,
+    via ?format= or an Accept: application/x-ndjson header; otherwise None.
+    """
+    if format in ("ndjson", "json-stream"):
+        return format
+    if format is None and NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        return "ndjson"
+    return None
+
+
+def _encode(value) -> str:
+    return json.dumps(value, default=str, separators=(",", ":"))
+
+
+def _grouped(encoded_rows: Iterator[str], separator: str) -> Iterator[bytes]:
+    group = []
+    for encoded in encoded_rows:
+        group.append(encoded)
+        if len(group) >= ROWS_PER_WRITE:
+            yield (separator.join(group) + separator).encode("utf-8")
+            group = []
+    if group:
+        yield (separator.join(group) + separator).encode("utf-8")
+
+
+def ndjson_chunks(rows: Iterator[Dict]) -> Iterator[bytes]:
+    """One JSON document per line, per row"""
+    return _grouped((_encode(row) for row in rows), "\n")
+
+
+def json_document_chunks(head: Dict, list_key: str, count_key: str, rows: Iterator[Dict]) -> Iterator[bytes]:
+    """
+    Incrementally encode {**head, list_key: [rows...], count_key: n}, the same
+    document the buffered endpoint returns, without holding all rows at once.
+    """
+    count = 0
+    opening = _encode(head)[:-1]
+    yield f'{opening}{"," if head else ""}"{list_key}":['.encode("utf-8")
+
+    first = True
+    group = []
+    for row in rows:
+        group.append(("" if first else ",") + _encode(row))
+        first = False
+        count += 1
+        if len(group) >= ROWS_PER_WRITE:
+            yield "".join(group).encode("utf-8")
+            group = []
+    if group:
+        yield "".join(group).encode("utf-8")
+
+    yield f'],"{count_key}":{count}}}'.encode("utf-8")
+
+
+def _logged(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    # Once streaming has started the status code is sent, so errors can only be logged
+    try:
+        yield from chunks
+    except Exception as e:
+        logger.error(f"Error while streaming response: {e}")
+        raise
+
+
+def stream_rows(stream_format: str, head: Dict, list_key: str, count_key: str, rows: Iterator[Dict]) -> StreamingResponse:
+    """Stream rows as NDJSON or as an incrementally encoded JSON document"""
+    if stream_format == "ndjson":
+        return StreamingResponse(_logged(ndjson_chunks(rows)), media_type=NDJSON_MEDIA_TYPE)
+    return StreamingResponse(
+        _logged(json_document_chunks(head, list_key, count_key, rows)), media_type="application/json"
+    )
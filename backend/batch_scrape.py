@@ -0,0 +1,70 @@
+"""
+Scrape many Goodreads profiles from the command line.
+
+    python batch_scrape.py https://www.goodreads.com/user/show/1-a https://www.goodreads.com/user/show/2-b
+    python batch_scrape.py --file profiles.txt --parallel 8
+
+Upstream requests are rate limited per host (UPSTREAM_REQUESTS_PER_SECOND,
+UPSTREAM_REQUEST_BURST), the same as for the API.
+"""
+import argparse
+import json
+import logging
+import sys
+import services.config  # noqa: F401  (loads .env)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+
+def read_profile_urls(args) -> list:
+    urls = list(args.profile_urls)
+    if args.file:
+        with open(args.file) as f:
+            urls.extend(line.strip() for line in f if line.strip() and not line.startswith('#'))
+    return urls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape many Goodreads profiles")
+    parser.add_argument('profile_urls', nargs='*', help="Goodreads profile URLs")
+    parser.add_argument('--file', help="File with one profile URL per line")
+    parser.add_argument('--parallel', type=int, default=4, help="Profiles scraped at once (default 4)")
+    parser.add_argument('--streaming', action='store_true', help="Persist each RSS page as it is fetched")
+    parser.add_argument('--full', action='store_true', help="Delete and reinsert instead of syncing incrementally")
+    parser.add_argument('--json', action='store_true', help="Print the full result as JSON")
+    args = parser.parse_args()
+
+    profile_urls = read_profile_urls(args)
+    if not profile_urls:
+        parser.error("no profile URLs given")
+
+    from services.scraping_service import get_scraping_service
+
+    result = get_scraping_service().scrape_many(
+        profile_urls,
+        max_parallel=args.parallel,
+        streaming=args.streaming,
+        incremental=not args.full
+    )
+
+    if args.json:
+        print(json.dumps(result, indent=2, default=str))
+    else:
+        for profile in result['results']:
+            outcome = f"{profile.get('books_count')} books" if profile['success'] else f"FAILED: {profile.get('error')}"
+            print(f"{profile['profile_url']}  {profile['elapsed_seconds']}s  {outcome}")
+        summary = result['summary']
+        print(
+            f"\n{summary['succeeded']}/{summary['profiles']} profiles, {summary['books_count']} books "
+            f"in {summary['elapsed_seconds']}s ({summary['profiles_per_second']} profiles/s, "
+            f"{summary['books_per_second']} books/s)"
+        )
+
+    sys.exit(0 if result['success'] else 1)
+
+
+if __name__ == "__main__":
+    main()
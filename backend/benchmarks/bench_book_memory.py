@@ -0,0 +1,47 @@
+"""
+Memory held by a parsed library as ScrapedBook records versus the plain
+dicts parse_rss_entry used to return, measured with tracemalloc.
+
+    python -m benchmarks.bench_book_memory [--sizes 1000 10000]
+"""
+import argparse
+import gc
+import tracemalloc
+
+from benchmarks.synthetic import list_rss_feed
+from scrapers.goodreads_rss_scraper import GoodreadsRSSScraper
+
+RSS_URL = "https://www.goodreads.com/review/list_rss/12345?per_page=1000"
+
+
+def retained_bytes(build) -> int:
+    """Bytes still allocated once build() has returned, while its result is alive"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parsed book memory benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="Entries per feed")
+    args = parser.parse_args()
+
+    scraper = GoodreadsRSSScraper()
+    print(f"{'entries':>8}  {'dicts':>12}{'ScrapedBook':>14}{'saved':>8}")
+    for size in args.sizes:
+        books, _, _ = scraper.parse_rss_page(list_rss_feed(entries=size).encode("utf-8"), RSS_URL)
+        # Both representations share the field values, so only the containers are measured
+        as_dicts = retained_bytes(lambda: [book.to_dict() for book in books])
+        as_slots = retained_bytes(lambda: [type(book)(**book.to_dict()) for book in books])
+        print(
+            f"{size:>8}  {as_dicts / size:>10.0f} B{as_slots / size:>12.0f} B"
+            f"{1 - as_slots / as_dicts:>8.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Compare the RSS parser engines (RSS_PARSER_ENGINE) on synthetic list_rss
+feeds: every engine must produce the same books and metadata, then each is
+timed end to end through GoodreadsRSSScraper.parse_rss_page.
+
+    python -m benchmarks.bench_feed_parsers [--sizes 1000 10000] [--repeat 3]
+"""
+import argparse
+import sys
+import time
+
+from benchmarks.synthetic import list_rss_feed
+from scrapers.feed_parsers import PARSER_ENGINES
+from scrapers.goodreads_rss_scraper import GoodreadsRSSScraper
+
+RSS_URL = "https://www.goodreads.com/review/list_rss/12345?per_page=1000"
+
+
+def parse(engine: str, content: bytes):
+    return GoodreadsRSSScraper(parser_engine=engine).parse_rss_page(content, RSS_URL)
+
+
+def check_equivalent(content: bytes) -> bool:
+    results = {engine: parse(engine, content) for engine in PARSER_ENGINES}
+    reference_engine, reference = next(iter(results.items()))
+    equivalent = True
+    for engine, result in results.items():
+        if result == reference:
+            continue
+        equivalent = False
+        for index, (book, expected) in enumerate(zip(result[0], reference[0])):
+            if book != expected:
+                print(f"{engine} differs from {reference_engine} on entry {index}: {book} != {expected}")
+                break
+        else:
+            print(f"{engine} differs from {reference_engine} in metadata or entry count")
+    return equivalent
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RSS parser engine benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="Entries per feed")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs, best is reported (default 3)")
+    args = parser.parse_args()
+
+    if not check_equivalent(list_rss_feed(entries=200, edge_cases=True).encode("utf-8")):
+        sys.exit(1)
+
+    print(f"{'entries':>8}  {'engine':<12}{'seconds':>9}{'entries/s':>12}")
+    for size in args.sizes:
+        content = list_rss_feed(entries=size).encode("utf-8")
+        if not check_equivalent(content):
+            sys.exit(1)
+        for engine in PARSER_ENGINES:
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                parse(engine, content)
+                timings.append(time.perf_counter() - start)
+            best = min(timings)
+            print(f"{size:>8}  {engine:<12}{best:>9.3f}{size / best:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
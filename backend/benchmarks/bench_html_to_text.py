@@ -0,0 +1,47 @@
+"""
+Time html_to_text against the BeautifulSoup get_text it replaces on synthetic
+review/description fragments. Their outputs are checked for equality in
+tests/test_html_to_text.py.
+
+    python -m benchmarks.bench_html_to_text [--count 2000] [--repeat 5]
+"""
+import argparse
+import time
+
+from bs4 import BeautifulSoup
+
+from benchmarks.synthetic import html_corpus
+from scrapers.goodreads_rss_scraper import html_to_text
+
+
+def soup_text(fragment: str) -> str:
+    return BeautifulSoup(fragment, "html.parser").get_text(strip=True)
+
+
+def best_time(func, corpus, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for fragment in corpus:
+            func(fragment)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="html_to_text vs BeautifulSoup")
+    parser.add_argument("--count", type=int, default=2000, help="Fragments in the corpus (default 2000)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs, best is reported (default 5)")
+    args = parser.parse_args()
+
+    corpus = html_corpus(args.count)
+    soup_seconds = best_time(soup_text, corpus, args.repeat)
+    fast_seconds = best_time(html_to_text, corpus, args.repeat)
+    print(f"{len(corpus)} fragments")
+    print(f"BeautifulSoup  {soup_seconds * 1e6 / len(corpus):8.1f} us/fragment")
+    print(f"html_to_text   {fast_seconds * 1e6 / len(corpus):8.1f} us/fragment")
+    print(f"speedup        {soup_seconds / fast_seconds:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Time parse_rss_page in-process against the process pool for large synthetic
+feeds, checking the merged books match the in-process result. Pool sizes
+below 2 run in-process, so they are covered by the first row of each size.
+
+    python -m benchmarks.bench_parallel_parse [--sizes 10000 50000] [--workers 2 4]
+"""
+import argparse
+import os
+import sys
+import time
+
+from benchmarks.synthetic import list_rss_feed
+from scrapers import parallel_parser
+from scrapers.goodreads_rss_scraper import GoodreadsRSSScraper
+
+RSS_URL = "https://www.goodreads.com/review/list_rss/12345?per_page=1000"
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel RSS parsing benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000], help="Entries per feed")
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=[2, os.cpu_count() or 2], help="Pool sizes to try"
+    )
+    args = parser.parse_args()
+    # get_pool() has no pool below 2 workers
+    pool_sizes = sorted({workers for workers in args.workers if workers >= 2})
+
+    scraper = GoodreadsRSSScraper()
+    print(f"{os.cpu_count()} CPUs")
+    print(f"{'entries':>8}  {'workers':>7}{'seconds':>9}{'entries/s':>12}")
+    for size in args.sizes:
+        content = list_rss_feed(entries=size).encode("utf-8")
+        expected, seconds = timed(lambda: scraper.parse_rss_page(content, RSS_URL, parallel=False))
+        print(f"{size:>8}  {1:>7}{seconds:>9.3f}{size / seconds:>12.0f}")
+
+        for workers in pool_sizes:
+            parallel_parser.shutdown_pool()
+            parallel_parser.PARSE_WORKERS = workers
+            parallel_parser.PARALLEL_MIN_ITEMS = 0
+            # Start the workers outside the timed run
+            parallel_parser.get_pool().submit(int).result()
+            result, seconds = timed(lambda: scraper.parse_rss_page(content, RSS_URL))
+            if result != expected:
+                print(f"MISMATCH with {workers} workers")
+                sys.exit(1)
+            print(f"{size:>8}  {workers:>7}{seconds:>9.3f}{size / seconds:>12.0f}")
+    parallel_parser.shutdown_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+End-to-end scrape benchmark: ScrapingService.scrape_and_save_user against
+a local Goodreads stand-in (benchmarks.goodreads_stub) and the in-memory
+Supabase fake (benchmarks.fake_supabase), on synthetic libraries. Nothing
+leaves the machine.
+
+Each library is scraped in three scenarios, starting from an empty database
+on every repetition:
+
+    initial  first scrape; every row is inserted
+    resync   the same feed again with cached feed validators dropped, so it
+             is fetched, parsed and diffed, and nothing is written
+    changed  one entry in twenty edited; only those rows are rewritten
+
+Reports p50/p99 latency, throughput, peak memory (traced allocations during
+the scrape, including rows the fake stores) and round trips: HTTP requests
+to the stand-in and Supabase calls. Results are compared with the stored
+baseline; latencies are machine dependent, round trips are not.
+
+    python -m benchmarks.bench_scrape_pipeline [--sizes 100 1000 10000] [--modes sync streaming async]
+    python -m benchmarks.bench_scrape_pipeline --save-baseline
+    python -m benchmarks.bench_scrape_pipeline --check     # exit 1 on a regression
+
+Modes: sync is the default scrape, which saves each 100-entry feed page as
+it is fetched, streaming is the same walk requested with streaming=True, and
+async saves each page too, with the following pages downloading concurrently
+meanwhile (SCRAPER_ENGINE=async).
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Dict, List
+
+from benchmarks.fake_supabase import FakeSupabase
+from benchmarks.goodreads_stub import GoodreadsStub
+from scrapers.goodreads_rss_scraper import GoodreadsRSSScraper
+from services.database import DatabaseService
+from services.rate_limiter import rate_limiter
+from services.scraping_service import ScrapingService
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "scrape_pipeline.json")
+SCENARIOS = ("initial", "resync", "changed")
+MODES = ("sync", "streaming", "async")
+
+
+class FakeDatabaseService(DatabaseService):
+    """The Supabase backend running against the in-memory fake"""
+
+    def __init__(self, client: FakeSupabase):
+        super().__init__()
+        self.supabase = client
+        self.engine = None
+        self.SessionLocal = None
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def scrape(service: ScrapingService, stub: GoodreadsStub, client: FakeSupabase, user_id: str, mode: str) -> Dict:
+    GoodreadsRSSScraper.forget_feed_validators()
+    stub.reset_counters()
+    client.reset_counters()
+    start = time.perf_counter()
+    result = service.scrape_and_save_user(stub.profile_url(user_id), streaming=mode == "streaming")
+    elapsed = time.perf_counter() - start
+    if not result["success"]:
+        raise RuntimeError(f"Scrape failed: {result.get('error')}")
+    return {
+        "seconds": elapsed,
+        "books": sum(result["changes"].values()) if result.get("books_count") is None else result["books_count"],
+        "http_requests": stub.requests,
+        "db_calls": client.round_trips,
+    }
+
+
+def run_scenarios(stub: GoodreadsStub, user_id: str, mode: str, db_latency: float, trace_memory: bool) -> Dict[str, Dict]:
+    """One repetition: every scenario in order, from an empty database"""
+    library = stub.libraries[user_id]
+    library.revision = 0
+    client = FakeSupabase(latency=db_latency)
+    service = ScrapingService(db=FakeDatabaseService(client), base_url=stub.url)
+    service.scraper_engine = "async" if mode == "async" else "sync"
+
+    runs = {}
+    for scenario in SCENARIOS:
+        if scenario == "changed":
+            library.revise()
+        if trace_memory:
+            tracemalloc.start()
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        runs[scenario] = scrape(service, stub, client, user_id, mode)
+        if trace_memory:
+            runs[scenario]["peak_bytes"] = tracemalloc.get_traced_memory()[1] - before
+            tracemalloc.stop()
+    return runs
+
+
+def benchmark(stub: GoodreadsStub, size: int, mode: str, repeat: int, db_latency: float) -> Dict[str, Dict]:
+    user_id = str(100000 + size)
+    if user_id not in stub.libraries:
+        stub.add_library(user_id, f"Reader{size}", size)
+
+    timed = [run_scenarios(stub, user_id, mode, db_latency, trace_memory=False) for _ in range(repeat)]
+    # Memory is traced in a run of its own, since tracing slows allocation down
+    traced = run_scenarios(stub, user_id, mode, db_latency, trace_memory=True)
+
+    results = {}
+    for scenario in SCENARIOS:
+        seconds = [runs[scenario]["seconds"] for runs in timed]
+        last = timed[-1][scenario]
+        p50 = percentile(seconds, 0.5)
+        results[f"{mode}/{size}/{scenario}"] = {
+            "books": last["books"],
+            "p50_ms": round(p50 * 1000, 2),
+            "p99_ms": round(percentile(seconds, 0.99) * 1000, 2),
+            "books_per_second": round(last["books"] / p50, 1) if p50 else None,
+            "peak_mb": round(traced[scenario]["peak_bytes"] / 1e6, 2),
+            "http_requests": last["http_requests"],
+            "db_calls": last["db_calls"],
+        }
+    return results
+
+
+def load_baseline() -> Dict:
+    try:
+        with open(BASELINE_PATH) as f:
+            return json.load(f)["results"]
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(results: Dict):
+    os.makedirs(os.path.dirname(BASELINE_PATH), exist_ok=True)
+    with open(BASELINE_PATH, "w") as f:
+        json.dump(
+            {
+                "python": platform.python_version(),
+                "machine": f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPU",
+                "results": results,
+            },
+            f,
+            indent=2,
+            sort_keys=True,
+        )
+        f.write("\n")
+
+
+def compare(result: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Regressions of result against its baseline entry"""
+    regressions = []
+    if result["p50_ms"] > baseline["p50_ms"] * (1 + tolerance):
+        regressions.append(f"p50 {baseline['p50_ms']} -> {result['p50_ms']} ms")
+    for counter in ("http_requests", "db_calls"):
+        if result[counter] > baseline[counter]:
+            regressions.append(f"{counter} {baseline[counter]} -> {result[counter]}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end scrape pipeline benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="Library sizes")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=["sync", "streaming"], help="Scrape modes")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions per scenario (default 5)")
+    parser.add_argument("--db-latency-ms", type=float, default=0.0, help="Added to every Supabase call")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p50 slowdown (default 0.25)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if any result regressed")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    # The stand-in is local; measure the pipeline, not the upstream throttle
+    rate_limiter.rate = rate_limiter.capacity = 1e9
+
+    baseline = load_baseline()
+    results = {}
+    regressions = {}
+    print(
+        f"{'scenario':<28}{'books':>7}{'p50 ms':>10}{'p99 ms':>10}{'books/s':>10}"
+        f"{'peak MB':>9}{'http':>6}{'db':>6}  vs baseline"
+    )
+    with GoodreadsStub() as stub:
+        for mode in args.modes:
+            for size in args.sizes:
+                for key, result in benchmark(stub, size, mode, args.repeat, args.db_latency_ms / 1000).items():
+                    results[key] = result
+                    if key in baseline:
+                        delta = result["p50_ms"] / baseline[key]["p50_ms"] - 1
+                        found = compare(result, baseline[key], args.tolerance)
+                        if found:
+                            regressions[key] = found
+                        versus = f"{delta:+.0%}" + (f"  REGRESSED: {', '.join(found)}" if found else "")
+                    else:
+                        versus = "-"
+                    print(
+                        f"{key:<28}{result['books']:>7}{result['p50_ms']:>10}{result['p99_ms']:>10}"
+                        f"{result['books_per_second']:>10}{result['peak_mb']:>9}"
+                        f"{result['http_requests']:>6}{result['db_calls']:>6}  {versus}"
+                    )
+
+    if args.save_baseline:
+        save_baseline({**baseline, **results})
+        print(f"\nBaseline saved to {BASELINE_PATH}")
+    if args.check and regressions:
+        print(f"\n{len(regressions)} result(s) regressed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,390 @@
+"""
+An in-memory stand-in for the Supabase client's table API, covering what
+DatabaseService uses: select (with embedded resources and inner joins),
+insert, upsert, update and delete, filtered with eq/neq/lt/lte/gt/gte,
+in_, is_, not_ and or_, ordered and paged with order, limit and range.
+
+Every execute() is one round trip: payloads and results go through JSON
+as they would over the wire, an optional latency is added, and calls are
+counted per table and operation.
+"""
+import json
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Primary key per table, "id" unless listed
+PRIMARY_KEYS = {"rss_payloads": "content_hash"}
+
+# Embeddable resources per table: name -> (foreign key column, table)
+RELATIONS = {
+    "user_books": {"books": ("book_id", "books"), "goodreads_users": ("user_id", "goodreads_users")},
+    "rss_feeds": {"goodreads_users": ("user_id", "goodreads_users")},
+}
+
+Predicate = Callable[[Dict], Optional[bool]]
+
+
+class FakeAPIError(Exception):
+    pass
+
+
+class FakeResponse:
+    def __init__(self, data: List[Dict], count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+def _split_top_level(text: str) -> List[str]:
+    """Split on commas outside parentheses and double quotes"""
+    parts, depth, quoted, current = [], 0, False, []
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and char == ",":
+            parts.append("".join(current).strip())
+            current = []
+            continue
+        current.append(char)
+    if current:
+        parts.append("".join(current).strip())
+    return [part for part in parts if part]
+
+
+def _comparable(stored: Any, given: Any) -> Tuple[Any, Any]:
+    if isinstance(stored, (int, float)) and not isinstance(stored, bool) and isinstance(given, str):
+        try:
+            return stored, float(given)
+        except ValueError:
+            pass
+    if type(stored) is not type(given):
+        return str(stored), str(given)
+    return stored, given
+
+
+def _compare(op: str, stored: Any, given: Any) -> Optional[bool]:
+    """SQL semantics: comparing NULL yields NULL (None), which filters the row out"""
+    if op == "is":
+        expected = {"null": None, "true": True, "false": False}[str(given).lower()]
+        return stored is expected if expected is None else stored == expected
+    if op == "in":
+        # given is a set of the values' string forms, as they'd appear in the URL
+        return None if stored is None else str(stored) in given
+    if stored is None or given is None:
+        return None
+    stored, given = _comparable(stored, given)
+    return {
+        "eq": stored == given,
+        "neq": stored != given,
+        "lt": stored < given,
+        "lte": stored <= given,
+        "gt": stored > given,
+        "gte": stored >= given,
+    }[op]
+
+
+def _negate(result: Optional[bool]) -> Optional[bool]:
+    return None if result is None else not result
+
+
+class FakeQuery:
+    def __init__(self, client: "FakeSupabase", table: str):
+        self.client = client
+        self.table_name = table
+        self.operation = "select"
+        self.payload: Any = None
+        self.columns = "*"
+        self.count: Optional[str] = None
+        self.on_conflict: Optional[str] = None
+        self.ignore_duplicates = False
+        self.filters: List[Predicate] = []
+        self.orders: List[Tuple[str, bool, Optional[bool]]] = []
+        self.offset = 0
+        self.row_limit: Optional[int] = None
+        self._negate_next = False
+
+    # Operations
+
+    def select(self, columns: str = "*", count: Optional[str] = None) -> "FakeQuery":
+        self.operation, self.columns, self.count = "select", columns, count
+        return self
+
+    def insert(self, rows) -> "FakeQuery":
+        self.operation, self.payload = "insert", rows
+        return self
+
+    def upsert(self, rows, on_conflict: Optional[str] = None, ignore_duplicates: bool = False, **kwargs) -> "FakeQuery":
+        self.operation, self.payload = "upsert", rows
+        self.on_conflict, self.ignore_duplicates = on_conflict, ignore_duplicates
+        return self
+
+    def update(self, values: Dict) -> "FakeQuery":
+        self.operation, self.payload = "update", values
+        return self
+
+    def delete(self) -> "FakeQuery":
+        self.operation = "delete"
+        return self
+
+    # Filters
+
+    @property
+    def not_(self) -> "FakeQuery":
+        self._negate_next = True
+        return self
+
+    def _filter(self, column: str, op: str, value: Any) -> "FakeQuery":
+        negate, self._negate_next = self._negate_next, False
+        lookup = self.client._column_lookup(self.table_name, column)
+
+        def predicate(row):
+            result = _compare(op, lookup(row), value)
+            return _negate(result) if negate else result
+
+        self.filters.append(predicate)
+        return self
+
+    def eq(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(column, "eq", value)
+
+    def neq(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(column, "neq", value)
+
+    def lt(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(column, "lt", value)
+
+    def lte(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(column, "lte", value)
+
+    def gt(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(column, "gt", value)
+
+    def gte(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(column, "gte", value)
+
+    def in_(self, column: str, values) -> "FakeQuery":
+        return self._filter(column, "in", {str(value) for value in values})
+
+    def is_(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(column, "is", "null" if value is None else value)
+
+    def or_(self, filters: str) -> "FakeQuery":
+        """PostgREST logic trees: col.op.value, col.not.op.value, and(...), or(...)"""
+        self.filters.append(self._logic_tree("or", filters))
+        return self
+
+    def _logic_tree(self, junction: str, filters: str) -> Predicate:
+        children = []
+        for condition in _split_top_level(filters):
+            for nested in ("and", "or"):
+                if condition.startswith(f"{nested}(") and condition.endswith(")"):
+                    children.append(self._logic_tree(nested, condition[len(nested) + 1:-1]))
+                    break
+            else:
+                children.append(self._condition(condition))
+
+        def predicate(row):
+            results = [child(row) for child in children]
+            if junction == "and":
+                return False if False in results else (None if None in results else True)
+            return True if True in results else (None if None in results else False)
+
+        return predicate
+
+    def _condition(self, condition: str) -> Predicate:
+        column, rest = condition.split(".", 1)
+        negate = rest.startswith("not.")
+        if negate:
+            rest = rest[len("not."):]
+        op, value = rest.split(".", 1)
+        if value.startswith('"') and value.endswith('"'):
+            value = value[1:-1]
+        lookup = self.client._column_lookup(self.table_name, column)
+
+        def predicate(row):
+            result = _compare(op, lookup(row), value)
+            return _negate(result) if negate else result
+
+        return predicate
+
+    # Ordering and paging
+
+    def order(self, column: str, desc: bool = False, nullsfirst: Optional[bool] = None) -> "FakeQuery":
+        self.orders.append((column, desc, nullsfirst))
+        return self
+
+    def limit(self, count: int) -> "FakeQuery":
+        self.row_limit = count
+        return self
+
+    def range(self, start: int, end: int) -> "FakeQuery":
+        self.offset, self.row_limit = start, end - start + 1
+        return self
+
+    def execute(self) -> FakeResponse:
+        return self.client._execute(self)
+
+
+class FakeSupabase:
+    """Tables held as dicts keyed by primary key, shared by every query"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.tables: Dict[str, Dict[Any, Dict]] = defaultdict(dict)
+        self.calls: Counter = Counter()
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self._lock = threading.Lock()
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    from_ = table
+
+    @property
+    def round_trips(self) -> int:
+        return sum(self.calls.values())
+
+    def reset_counters(self):
+        with self._lock:
+            self.calls.clear()
+            self.bytes_sent = 0
+            self.bytes_received = 0
+
+    def _column_lookup(self, table: str, column: str) -> Callable[[Dict], Any]:
+        if "." not in column:
+            return lambda row: row.get(column)
+        resource, related_column = column.split(".", 1)
+        foreign_key, related_table = RELATIONS[table][resource]
+        rows = self.tables[related_table]
+
+        def lookup(row):
+            related = rows.get(row.get(foreign_key))
+            return related.get(related_column) if related else None
+
+        return lookup
+
+    def _wire(self, data: Any, sent: bool) -> Any:
+        encoded = json.dumps(data, default=str)
+        if sent:
+            self.bytes_sent += len(encoded)
+        else:
+            self.bytes_received += len(encoded)
+        return json.loads(encoded)
+
+    def _execute(self, query: FakeQuery) -> FakeResponse:
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.calls[(query.table_name, query.operation)] += 1
+            payload = self._wire(query.payload, sent=True) if query.payload is not None else None
+            handler = getattr(self, f"_{query.operation}")
+            data, count = handler(query, payload)
+            return FakeResponse(self._wire(data, sent=False), count)
+
+    def _matching(self, query: FakeQuery) -> List[Dict]:
+        rows = self.tables[query.table_name].values()
+        return [row for row in rows if all(predicate(row) for predicate in query.filters)]
+
+    def _select(self, query: FakeQuery, payload) -> Tuple[List[Dict], Optional[int]]:
+        rows = self._matching(query)
+        inner_joins = []
+        projection = []
+        for item in _split_top_level(query.columns):
+            if "(" in item:
+                resource, columns = item[:-1].split("(", 1)
+                inner = resource.endswith("!inner")
+                resource = resource.replace("!inner", "")
+                if inner:
+                    inner_joins.append(resource)
+                projection.append((resource, [column.strip() for column in columns.split(",") if column.strip()]))
+            else:
+                projection.append((item, None))
+
+        relations = RELATIONS.get(query.table_name, {})
+        for resource in inner_joins:
+            foreign_key, related_table = relations[resource]
+            rows = [row for row in rows if row.get(foreign_key) in self.tables[related_table]]
+
+        # Python's sort is stable, so sort by the last key first
+        for column, desc, nullsfirst in reversed(query.orders):
+            nulls_first = desc if nullsfirst is None else nullsfirst
+            present = [row for row in rows if row.get(column) is not None]
+            missing = [row for row in rows if row.get(column) is None]
+            present.sort(key=lambda row: row[column], reverse=desc)
+            rows = missing + present if nulls_first else present + missing
+
+        count = len(rows) if query.count else None
+        end = None if query.row_limit is None else query.offset + query.row_limit
+        rows = rows[query.offset:end]
+
+        results = []
+        for row in rows:
+            result = {}
+            for name, columns in projection:
+                if columns is None:
+                    result.update(row if name == "*" else {name: row.get(name)})
+                    continue
+                if not columns:
+                    continue
+                foreign_key, related_table = relations[name]
+                related = self.tables[related_table].get(row.get(foreign_key))
+                if related is not None and columns != ["*"]:
+                    related = {column: related.get(column) for column in columns}
+                result[name] = related
+            results.append(result)
+        return results, count
+
+    def _insert(self, query: FakeQuery, payload) -> Tuple[List[Dict], None]:
+        key = PRIMARY_KEYS.get(query.table_name, "id")
+        table = self.tables[query.table_name]
+        rows = payload if isinstance(payload, list) else [payload]
+        for row in rows:
+            if row.get(key) in table:
+                raise FakeAPIError(f"duplicate key value violates unique constraint on {query.table_name}.{key}")
+        for row in rows:
+            table[row[key]] = dict(row)
+        return rows, None
+
+    def _upsert(self, query: FakeQuery, payload) -> Tuple[List[Dict], None]:
+        key = PRIMARY_KEYS.get(query.table_name, "id")
+        conflict = query.on_conflict or key
+        table = self.tables[query.table_name]
+        by_conflict = table if conflict == key else {stored.get(conflict): stored for stored in table.values()}
+        written = []
+        for row in payload if isinstance(payload, list) else [payload]:
+            existing = by_conflict.get(row.get(conflict))
+            if existing is not None:
+                if query.ignore_duplicates:
+                    continue
+                existing.update(row)
+                written.append(existing)
+            else:
+                if key not in row:
+                    # The column default, as for the uuid primary keys
+                    row = {**row, key: str(uuid.uuid4())}
+                table[row[key]] = dict(row)
+                if conflict != key:
+                    by_conflict[row.get(conflict)] = table[row[key]]
+                written.append(row)
+        return written, None
+
+    def _update(self, query: FakeQuery, payload) -> Tuple[List[Dict], None]:
+        rows = self._matching(query)
+        for row in rows:
+            row.update(payload)
+        return rows, None
+
+    def _delete(self, query: FakeQuery, payload) -> Tuple[List[Dict], None]:
+        key = PRIMARY_KEYS.get(query.table_name, "id")
+        rows = self._matching(query)
+        table = self.tables[query.table_name]
+        for row in rows:
+            del table[row[key]]
+        return rows, None
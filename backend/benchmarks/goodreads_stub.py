@@ -0,0 +1,145 @@
+"""
+A local stand-in for the parts of Goodreads the scraper talks to: profile
+pages and the paginated list_rss feed, served from synthetic libraries.
+Feeds carry an ETag and answer a matching If-None-Match with 304, like
+Goodreads does, and every request is counted.
+"""
+import hashlib
+import random
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.synthetic import item_seed, profile_page, rss_document, rss_item
+
+_PROFILE_PATH_RE = re.compile(r"^/user/show/(\d+)-(.+)$")
+_RSS_PATH_RE = re.compile(r"^/review/list_rss/(\d+)$")
+
+DEFAULT_PER_PAGE = 100
+
+
+class SyntheticLibrary:
+    """One user's shelf: entries rendered on demand and kept per revision"""
+
+    def __init__(self, user_id: str, name: str, entries: int, seed: int = 0):
+        self.user_id = user_id
+        self.name = name
+        self.entries = entries
+        self.seed = seed
+        self.revision = 0
+        self._items: Dict[Tuple[int, str], str] = {}
+
+    def revise(self):
+        """Change every REVISED_EVERY-th entry, keeping its guid"""
+        self.revision += 1
+
+    def items(self, start: int, count: int) -> List[str]:
+        rendered = []
+        for index in range(start, min(start + count, self.entries)):
+            seed = item_seed(self.seed, index, self.revision)
+            item = self._items.get((index, seed))
+            if item is None:
+                item = self._items[(index, seed)] = rss_item(random.Random(seed), index, self.user_id)
+            rendered.append(item)
+        return rendered
+
+
+class GoodreadsStub:
+    """
+    Serves libraries on 127.0.0.1 from a background thread. Use as a context
+    manager; `url` is the base URL to scrape against.
+    """
+
+    def __init__(self):
+        self.libraries: Dict[str, SyntheticLibrary] = {}
+        self.requests = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def add_library(self, user_id: str, name: str, entries: int, seed: int = 0) -> SyntheticLibrary:
+        library = self.libraries[user_id] = SyntheticLibrary(user_id, name, entries, seed)
+        return library
+
+    def profile_url(self, user_id: str) -> str:
+        return f"{self.url}/user/show/{user_id}-{self.libraries[user_id].name}"
+
+    def reset_counters(self):
+        with self._lock:
+            self.requests = 0
+            self.bytes_sent = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="goodreads-stub", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _record(self, body_bytes: int):
+        with self._lock:
+            self.requests += 1
+            self.bytes_sent += body_bytes
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                profile = _PROFILE_PATH_RE.match(parts.path)
+                feed = _RSS_PATH_RE.match(parts.path)
+                if profile and profile.group(1) in stub.libraries:
+                    library = stub.libraries[profile.group(1)]
+                    body = profile_page(library.user_id, library.name, library.entries).encode("utf-8")
+                    self._respond(200, body, "text/html; charset=utf-8")
+                elif feed and feed.group(1) in stub.libraries:
+                    self._feed(stub.libraries[feed.group(1)], parse_qs(parts.query))
+                else:
+                    self._respond(404, b"not found", "text/plain")
+
+            def _feed(self, library: SyntheticLibrary, query: Dict[str, List[str]]):
+                per_page = int(query.get("per_page", [DEFAULT_PER_PAGE])[0])
+                page = int(query.get("page", ["1"])[0])
+                items = library.items((page - 1) * per_page, per_page)
+                body = rss_document(library.user_id, "".join(items)).encode("utf-8")
+                etag = f'"{hashlib.sha1(body).hexdigest()}"'
+                if self.headers.get("If-None-Match") == etag:
+                    self._respond(304, b"", None, etag)
+                else:
+                    self._respond(200, body, "application/xml; charset=utf-8", etag)
+
+            def _respond(self, status: int, body: bytes, content_type: Optional[str], etag: Optional[str] = None):
+                self.send_response(status)
+                if content_type:
+                    self.send_header("Content-Type", content_type)
+                if etag:
+                    self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                stub._record(len(body))
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,190 @@
+"""
+Deterministic synthetic Goodreads data shaped like the real list_rss feed
+and profile page, for benchmarks that must not touch goodreads.com.
+"""
+import random
+from typing import List
+from xml.sax.saxutils import escape
+
+_WORDS = (
+    "the a of and to in is was for on that with as his her they at by from "
+    "book story novel world life love war night city sea house time year "
+    "dark light king queen river stone fire winter summer journey secret"
+).split()
+
+_SHELF_CHOICES = ["", "", "", "to-read", "currently-reading", "favorites", "to-read,favorites", "dnf"]
+
+
+def _sentence(rng: random.Random, min_words: int = 6, max_words: int = 18) -> str:
+    words = [rng.choice(_WORDS) for _ in range(rng.randint(min_words, max_words))]
+    return " ".join(words).capitalize() + "."
+
+
+def html_fragment(rng: random.Random, paragraphs: int = 3) -> str:
+    """A review/description-style HTML fragment with inline markup and entities"""
+    parts = []
+    for _ in range(paragraphs):
+        sentence = _sentence(rng)
+        choice = rng.random()
+        if choice < 0.25:
+            sentence = sentence.replace(" ", " <i>", 1) + "</i>"
+        elif choice < 0.5:
+            sentence = f"<b>{sentence}</b> &amp; {_sentence(rng, 3, 6)}"
+        elif choice < 0.6:
+            sentence = f'<a href="https://www.goodreads.com/book/show/{rng.randint(1, 10**6)}">{sentence}</a>'
+        elif choice < 0.7:
+            sentence = f"{sentence} &#8220;{_sentence(rng, 2, 5)}&#8221; &mdash; {_sentence(rng, 2, 4)}"
+        parts.append(sentence)
+    return "<br /><br />".join(parts)
+
+
+def _rfc822(rng: random.Random) -> str:
+    day = rng.randint(1, 28)
+    month = rng.choice(["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"])
+    year = rng.randint(2010, 2024)
+    return f"Mon, {day:02d} {month} {year} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00 -0700"
+
+
+def rss_item(rng: random.Random, index: int, user_id: str) -> str:
+    book_id = 1000 + index
+    review_id = 500000 + index
+    title = _sentence(rng, 1, 5).rstrip(".")
+    author = f"{rng.choice(_WORDS).capitalize()} {rng.choice(_WORDS).capitalize()}"
+    read_at = _rfc822(rng) if rng.random() < 0.6 else ""
+    review = html_fragment(rng, rng.randint(1, 4)) if rng.random() < 0.3 else ""
+    image = f"https://i.gr-assets.com/images/S/compressed.photo.goodreads.com/books/{book_id}"
+    link = f"https://www.goodreads.com/review/show/{review_id}?utm_medium=api&amp;utm_source=rss"
+    return f"""
+    <item>
+      <guid><![CDATA[https://www.goodreads.com/review/show/{review_id}?utm_medium=api&utm_source=rss]]></guid>
+      <pubDate><![CDATA[{_rfc822(rng)}]]></pubDate>
+      <title>{escape(title)}</title>
+      <link>{link}</link>
+      <book_id>{book_id}</book_id>
+      <book_image_url><![CDATA[{image}._SY75_.jpg]]></book_image_url>
+      <book_small_image_url><![CDATA[{image}._SY75_.jpg]]></book_small_image_url>
+      <book_medium_image_url><![CDATA[{image}._SX98_.jpg]]></book_medium_image_url>
+      <book_large_image_url><![CDATA[{image}._SY475_.jpg]]></book_large_image_url>
+      <book_description><![CDATA[{html_fragment(rng, rng.randint(2, 8))}]]></book_description>
+      <book id="{book_id}">
+        <num_pages>{rng.randint(80, 900) if rng.random() < 0.9 else ""}</num_pages>
+      </book>
+      <author_name>{escape(author)}</author_name>
+      <isbn>{rng.randint(10**9, 10**10 - 1) if rng.random() < 0.7 else ""}</isbn>
+      <user_name>Reader {user_id}</user_name>
+      <user_rating>{rng.randint(0, 5)}</user_rating>
+      <user_read_at><![CDATA[{read_at}]]></user_read_at>
+      <user_date_added><![CDATA[{_rfc822(rng)}]]></user_date_added>
+      <user_date_created><![CDATA[{_rfc822(rng)}]]></user_date_created>
+      <user_shelves>{rng.choice(_SHELF_CHOICES)}</user_shelves>
+      <user_review><![CDATA[{review}]]></user_review>
+      <average_rating>{rng.uniform(2.5, 4.9):.2f}</average_rating>
+      <book_published>{rng.randint(1850, 2024) if rng.random() < 0.9 else ""}</book_published>
+      <description>
+        <![CDATA[<a href="https://www.goodreads.com/book/show/{book_id}"><img alt="{escape(title)}" src="{image}._SY75_.jpg" /></a><br/>
+        author: {escape(author)}<br/>]]>
+      </description>
+    </item>"""
+
+
+# Items exercising escaping, whitespace and missing or empty elements
+EDGE_CASE_ITEMS = [
+    "<item><title>Tom &amp; Jerry by Someone</title><book_id>1</book_id></item>",
+    "<item><title><![CDATA[<b>Bold</b> title]]></title></item>",
+    "<item><title>A &lt;i&gt;tagged&lt;/i&gt; title</title>"
+    "<user_review>a &lt;b&gt;b&lt;/b&gt; &amp;amp; c</user_review></item>",
+    "<item><guid>x</guid><link>https://www.goodreads.com/book/show/55-x</link>"
+    "<user_shelves>  to-read , favorites </user_shelves><num_pages></num_pages><isbn/></item>",
+    "<item><title>  spaced   </title><user_rating>0</user_rating><average_rating>n/a</average_rating>"
+    "<user_read_at>   </user_read_at></item>",
+    "<item><title>Caf\u00e9 \u2014 \u201cquoted\u201d</title><book_description>  </book_description></item>",
+    "<item><title>relative</title><link>/review/show/1</link></item>",
+]
+
+
+# One item in this many changes with each library revision
+REVISED_EVERY = 20
+
+
+def item_seed(seed: int, index: int, revision: int = 0) -> str:
+    if revision and index % REVISED_EVERY == 0:
+        return f"{seed}-{index}-r{revision}"
+    return f"{seed}-{index}"
+
+
+def list_rss_feed(
+    user_id: str = "12345",
+    entries: int = 100,
+    seed: int = 0,
+    start: int = 0,
+    edge_cases: bool = False,
+    revision: int = 0,
+) -> str:
+    """
+    A list_rss document with `entries` items. For pagination, start is the
+    index of the first item in the whole library; item content only depends
+    on the seed and the item's index, so pages of one library are consistent.
+    Each later revision rewrites every REVISED_EVERY-th item's content,
+    keeping its guid, the way edits to a shelf look in the feed.
+    """
+    items = list(EDGE_CASE_ITEMS) if edge_cases else []
+    for index in range(start, start + entries):
+        items.append(rss_item(random.Random(item_seed(seed, index, revision)), index, user_id))
+    return rss_document(user_id, "".join(items))
+
+
+def rss_document(user_id: str, items: str) -> str:
+    """A list_rss document around already rendered items"""
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">
+  <channel>
+    <xhtml:meta xmlns:xhtml="http://www.w3.org/1999/xhtml" name="robots" content="noindex" />
+    <title>Reader {user_id}'s bookshelf: all</title>
+    <copyright><![CDATA[Copyright (C) 2024 Goodreads Inc. All rights reserved.]]></copyright>
+    <link><![CDATA[https://www.goodreads.com/review/list_rss/{user_id}]]></link>
+    <atom:link href="https://www.goodreads.com/review/list_rss/{user_id}" rel="self" type="application/rss+xml"/>
+    <description><![CDATA[Reader {user_id}'s bookshelf: all]]></description>
+    <language>en-US</language>
+    <lastBuildDate>Mon, 01 Jan 2024 10:00:00 -0800</lastBuildDate>
+    <ttl>60</ttl>
+    <image>
+      <title>Reader {user_id}'s bookshelf: all</title>
+      <link>https://www.goodreads.com/review/list_rss/{user_id}</link>
+      <width>144</width>
+      <height>41</height>
+      <url>https://www.goodreads.com/images/layout/goodreads_logo_144.jpg</url>
+    </image>{items}
+  </channel>
+</rss>
+"""
+
+
+def html_corpus(count: int = 1000, seed: int = 0) -> List[str]:
+    """Review/description fragments, including a few edge cases"""
+    rng = random.Random(seed)
+    corpus = [html_fragment(rng, rng.randint(1, 8)) for _ in range(count)]
+    corpus += [
+        "  plain text without markup  ",
+        "Tom &amp; Jerry &lt;3 &nbsp;",
+        "a < b and c > d",
+        "<p>one</p>\n<p>two</p>",
+        '<a title="x > y" href="#">quoted</a> tail',
+        "<!-- hidden --> visible",
+        "<script>var x = 1;</script>after",
+        "unterminated <b",
+        "",
+    ]
+    return corpus
+
+
+def profile_page(user_id: str = "12345", name: str = "Reader", ratings: int = 100) -> str:
+    return f"""<!DOCTYPE html>
+<html><head><title>{escape(name)} | Goodreads</title></head>
+<body>
+  <h1 itemprop="name">{escape(name)}</h1>
+  <div class="profilePageUserStats">
+    <a href="/review/list/{user_id}?sort=rating">{ratings} ratings</a>
+    <a href="/review/list/{user_id}?sort=review">{ratings // 4} reviews</a>
+  </div>
+</body></html>
+"""
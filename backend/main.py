@@ -1,13 +1,16 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+import services.config  # noqa: F401  (loads .env)
 from api.routes import router
-from services.database import database_service
+from middleware.metrics import RequestMetricsMiddleware
+from middleware.profiling import ProfilingMiddleware
+from services.job_service import get_job_service
+from services.refresh_scheduler import get_refresh_scheduler
+from services.startup import start_warm_up
+from scrapers.parallel_parser import shutdown_pool
 import logging
-from dotenv import load_dotenv
 from contextlib import asynccontextmanager
 
-load_dotenv()
-
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -15,12 +18,18 @@ logging.basicConfig(
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
+    # Startup: services are built in the background; /api/v1/ready reports
+    # when they are up and the database is reachable
     logging.info("Starting Cozy Bookshelf API...")
-    database_service.create_tables()
+    start_warm_up()
     yield
     # Shutdown
     logging.info("Shutting down Cozy Bookshelf API...")
+    if get_refresh_scheduler.initialized:
+        get_refresh_scheduler().stop()
+    if get_job_service.initialized:
+        get_job_service().shutdown()
+    shutdown_pool()
 
 app = FastAPI(
     title="Cozy Bookshelf API",
@@ -37,6 +46,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(RequestMetricsMiddleware)
+app.add_middleware(ProfilingMiddleware)
+
 app.include_router(router, prefix="/api/v1")
 
 @app.get("/")
@@ -49,4 +61,4 @@ async def root():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
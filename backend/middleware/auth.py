@@ -1,10 +1,8 @@
 from fastapi import HTTPException, Security, status
 from fastapi.security import APIKeyHeader
 from typing import Optional
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
+import secrets
+from services.config import env_bool, env_str
 
 API_KEY_HEADER = APIKeyHeader(name="X-API-Key", auto_error=False)
 
@@ -12,8 +10,8 @@ def get_api_keys():
     """Get valid API keys from environment variables"""
     keys = []
 
-    web_app_key = os.getenv("WEB_APP_API_KEY")
-    personal_key = os.getenv("PERSONAL_API_KEY")
+    web_app_key = env_str("WEB_APP_API_KEY")
+    personal_key = env_str("PERSONAL_API_KEY")
 
     if web_app_key:
         keys.append(web_app_key)
@@ -28,7 +26,7 @@ def verify_api_key(api_key: Optional[str] = Security(API_KEY_HEADER)) -> str:
     Returns the API key if valid, raises HTTPException otherwise.
     """
     # Check if API key authentication is enabled
-    if os.getenv("API_KEY_AUTH_ENABLED", "false").lower() != "true":
+    if not env_bool("API_KEY_AUTH_ENABLED"):
         return "auth_disabled"
 
     if not api_key:
@@ -54,12 +52,45 @@ def verify_api_key(api_key: Optional[str] = Security(API_KEY_HEADER)) -> str:
 
     return api_key
 
+def is_admin_api_key(api_key: Optional[str]) -> bool:
+    """Whether api_key is the personal (admin) API key"""
+    personal_key = env_str("PERSONAL_API_KEY")
+    return bool(api_key and personal_key and secrets.compare_digest(api_key, personal_key))
+
+def verify_admin_api_key(api_key: Optional[str] = Security(API_KEY_HEADER)) -> str:
+    """
+    Require the personal (admin) API key, whether or not API key
+    authentication is enabled for the other endpoints.
+    """
+    personal_key = env_str("PERSONAL_API_KEY")
+
+    if not personal_key:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Admin API key not configured",
+        )
+
+    if not api_key:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="API key missing",
+            headers={"WWW-Authenticate": "ApiKey"},
+        )
+
+    if not secrets.compare_digest(api_key, personal_key):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin API key required",
+        )
+
+    return api_key
+
 def get_optional_api_key(api_key: Optional[str] = Security(API_KEY_HEADER)) -> Optional[str]:
     """
     Optional API key verification for endpoints that should work with or without authentication.
     Returns the API key if provided and valid, None if not provided, raises HTTPException if invalid.
     """
-    if os.getenv("API_KEY_AUTH_ENABLED", "false").lower() != "true":
+    if not env_bool("API_KEY_AUTH_ENABLED"):
         return None
 
     if not api_key:
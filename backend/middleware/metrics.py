@@ -0,0 +1,58 @@
+import time
+from services.metrics import http_request_duration
+
+
+def route_template(scope) -> str:
+    """
+    The matched route's path template, including the prefix of the router it
+    was included under. Depending on the FastAPI version the route in the
+    scope carries its path with or without that prefix, so the prefix is
+    taken from the concrete path: the segments before those the template
+    matched.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+    segments = scope["path"].rstrip("/").split("/")
+    template_segments = template.rstrip("/").split("/")
+    prefix_length = len(segments) - len(template_segments)
+    if prefix_length <= 0 or ":path}" in template:
+        return template
+    return "/".join(segments[:prefix_length + 1]) + template
+
+
+class RequestMetricsMiddleware:
+    """
+    Observes every HTTP request's latency, labelled by the route template
+    (/api/v1/user/{username}, not the concrete path) so series stay bounded.
+    Timing runs until the last body chunk is sent, so streamed responses
+    are measured in full.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router records the matched route in the scope
+            http_request_duration.labels(
+                method=scope["method"],
+                route=route_template(scope),
+                status=str(status),
+            ).observe(time.perf_counter() - start)
@@ -0,0 +1,109 @@
+import asyncio
+from urllib.parse import parse_qs
+from typing import Callable, Optional, TypeVar
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from middleware.auth import is_admin_api_key
+from services.profiling import parse_profile_mode, profiled, start_profile
+
+T = TypeVar("T")
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY_PARAM = "profile"
+
+
+def requested_profile_mode(scope) -> Optional[str]:
+    """
+    Profiling mode asked for by an admin request, via the X-Profile header or
+    the profile query parameter (cprofile or sample). None for every other
+    request, which is decided without parsing anything for the common case.
+    """
+    headers = scope["headers"]
+    value = None
+    for name, header_value in headers:
+        if name == PROFILE_HEADER:
+            value = header_value.decode("latin-1")
+            break
+    if value is None:
+        if PROFILE_QUERY_PARAM.encode() not in scope["query_string"]:
+            return None
+        values = parse_qs(scope["query_string"].decode("latin-1")).get(PROFILE_QUERY_PARAM)
+        value = values[0] if values else None
+
+    mode = parse_profile_mode(value)
+    if mode is None:
+        return None
+    api_key = next((v.decode("latin-1") for name, v in headers if name == b"x-api-key"), None)
+    return mode if is_admin_api_key(api_key) else None
+
+
+class ProfilingMiddleware:
+    """
+    Runs admin requests that ask for it under the profiler and stores the
+    profile, returning its id in the X-Profile-Id header; fetch it from
+    /api/v1/profiles/{id}. The mode is also left in request.state.profile_mode
+    for handlers that hand work off, such as /scrape, to profile that work too.
+
+    That profile covers the event loop thread while the request is served, so
+    it also holds whatever other requests ran on the loop meanwhile; it is
+    named as such and marked with X-Profile-Scope: event-loop. Handlers that
+    run their blocking work through run_blocking() get that work profiled on
+    its worker thread alone, and that profile's id is returned in the
+    X-Handler-Profile-Id header. Profiles are written to disk off the loop.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        mode = requested_profile_mode(scope)
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        scope.setdefault("state", {})["profile_mode"] = mode
+        profile = start_profile(
+            mode, f"{scope['method']} {scope['path']} (event loop, including concurrent requests)"
+        )
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start" and profile is not None:
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile.id.encode()))
+                headers.append((b"x-profile-scope", b"event-loop"))
+                handler_profile_id = scope["state"].get("handler_profile_id")
+                if handler_profile_id:
+                    headers.append((b"x-handler-profile-id", handler_profile_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            if profile is not None:
+                profile.stop()
+                await asyncio.get_running_loop().run_in_executor(None, profile.store)
+
+
+async def run_blocking(request: Request, work: Callable[[], T]) -> T:
+    """
+    Run a handler's blocking work in the threadpool, keeping the event loop
+    free. When the request is being profiled, the work is profiled on the
+    worker thread that runs it and the profile's id is left for the
+    X-Handler-Profile-Id header.
+    """
+    mode = getattr(request.state, "profile_mode", None)
+    if mode is None:
+        return await run_in_threadpool(work)
+
+    def profiled_work() -> T:
+        with profiled(mode, f"{request.method} {request.url.path} (handler)") as info:
+            # Recorded up front so failed requests still report their profile
+            request.state.handler_profile_id = info.get("profile_id")
+            return work()
+
+    return await run_in_threadpool(profiled_work)
@@ -0,0 +1,5 @@
+-- Incremental re-scrapes: per-row fingerprint of the scraped RSS entry.
+-- Existing rows start without a hash and are rewritten once on their next scrape.
+ALTER TABLE user_books ADD COLUMN IF NOT EXISTS content_hash VARCHAR;
+
+CREATE INDEX IF NOT EXISTS idx_user_books_user_id_rss_guid ON user_books(user_id, rss_guid);
@@ -0,0 +1,22 @@
+-- Compressed, content-addressed archive of raw RSS feeds.
+-- After applying, run `python migrations/migrate_rss_archive.py` to move
+-- existing raw_rss_content into rss_payloads.
+CREATE TABLE IF NOT EXISTS rss_payloads (
+    content_hash VARCHAR PRIMARY KEY,
+    encoding VARCHAR NOT NULL,
+    compressed_content TEXT NOT NULL,
+    raw_size INTEGER,
+    compressed_size INTEGER,
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
+ALTER TABLE rss_feeds ADD COLUMN IF NOT EXISTS content_hash VARCHAR REFERENCES rss_payloads(content_hash);
+ALTER TABLE rss_feeds ALTER COLUMN raw_rss_content DROP NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_rss_feeds_content_hash ON rss_feeds(content_hash);
+
+ALTER TABLE rss_payloads ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Allow public read access" ON rss_payloads FOR SELECT USING (true);
+CREATE POLICY "Allow public insert access" ON rss_payloads FOR INSERT WITH CHECK (true);
+CREATE POLICY "Allow public update access" ON rss_payloads FOR UPDATE USING (true);
+CREATE POLICY "Allow public delete access" ON rss_payloads FOR DELETE USING (true);
@@ -0,0 +1,17 @@
+-- Composite indexes shaped to the hot queries, replacing single-column ones.
+-- A user's library page filters on user_id (and optionally status) and sorts
+-- by date_added desc, id desc, so one index serves filter, sort and cursor.
+-- On a large live table, run each CREATE INDEX with CONCURRENTLY (outside a
+-- transaction) to avoid blocking writes while it builds.
+CREATE INDEX IF NOT EXISTS idx_user_books_user_id_date_added ON user_books(user_id, date_added DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_user_books_user_id_status_date_added ON user_books(user_id, status, date_added DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_user_books_user_id_rss_guid ON user_books(user_id, rss_guid);
+
+-- Covered by the composite indexes above
+DROP INDEX IF EXISTS idx_user_books_user_id;
+DROP INDEX IF EXISTS idx_user_books_status;
+DROP INDEX IF EXISTS idx_user_books_rss_guid;
+
+-- Duplicates of the indexes behind the UNIQUE constraints
+DROP INDEX IF EXISTS idx_goodreads_users_username;
+DROP INDEX IF EXISTS idx_books_goodreads_id;
@@ -0,0 +1,10 @@
+-- Users are matched across scrapes on their numeric Goodreads id rather than
+-- on the username, which comes from the profile URL's slug and can differ
+-- between URLs of the same profile. Existing rows take it from profile_url.
+ALTER TABLE goodreads_users ADD COLUMN IF NOT EXISTS goodreads_id VARCHAR;
+
+UPDATE goodreads_users
+SET goodreads_id = substring(profile_url FROM '/user/show/([0-9]+)')
+WHERE goodreads_id IS NULL;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_goodreads_users_goodreads_id ON goodreads_users(goodreads_id);
@@ -0,0 +1,88 @@
+"""
+Move legacy uncompressed rss_feeds.raw_rss_content into the compressed
+rss_payloads archive. Apply 002_rss_payload_archive.sql first, then run from
+the backend directory:
+
+    python migrations/migrate_rss_archive.py [--batch-size 50] [--keep-raw] [--prune-orphans]
+
+Safe to re-run: only rows without a content_hash are migrated.
+"""
+import argparse
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.database import get_database_service, PAGE_SIZE  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("migrate_rss_archive")
+
+
+def migrate(batch_size: int, keep_raw: bool) -> int:
+    supabase = get_database_service().supabase
+    migrated = 0
+    while True:
+        response = supabase.table('rss_feeds').select('id, raw_rss_content').is_(
+            'content_hash', 'null'
+        ).not_.is_('raw_rss_content', 'null').limit(batch_size).execute()
+        if not response.data:
+            return migrated
+
+        for feed in response.data:
+            payload_hash = get_database_service().save_rss_payload(feed['raw_rss_content'])
+            update = {'content_hash': payload_hash}
+            if not keep_raw:
+                update['raw_rss_content'] = None
+            supabase.table('rss_feeds').update(update).eq('id', feed['id']).execute()
+            migrated += 1
+        logger.info(f"Migrated {migrated} feeds so far")
+
+
+def select_all(table: str, column: str) -> set:
+    supabase = get_database_service().supabase
+    values = set()
+    start = 0
+    while True:
+        response = supabase.table(table).select(column).not_.is_(column, 'null').order(column).range(
+            start, start + PAGE_SIZE - 1
+        ).execute()
+        values.update(row[column] for row in response.data)
+        if len(response.data) < PAGE_SIZE:
+            return values
+        start += PAGE_SIZE
+
+
+def prune_orphans() -> int:
+    """Delete archived payloads no longer referenced by any feed"""
+    orphans = sorted(select_all('rss_payloads', 'content_hash') - select_all('rss_feeds', 'content_hash'))
+    for start in range(0, len(orphans), 100):
+        get_database_service().supabase.table('rss_payloads').delete().in_(
+            'content_hash', orphans[start:start + 100]
+        ).execute()
+    return len(orphans)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive raw RSS feeds into rss_payloads")
+    parser.add_argument('--batch-size', type=int, default=50, help="Feeds loaded per request (default 50)")
+    parser.add_argument('--keep-raw', action='store_true', help="Leave raw_rss_content in place")
+    parser.add_argument('--prune-orphans', action='store_true', help="Delete payloads no feed references")
+    args = parser.parse_args()
+
+    if not get_database_service().supabase:
+        sys.exit("Supabase is not configured (SUPABASE_URL / SUPABASE_ANON_KEY)")
+
+    migrated = migrate(args.batch_size, args.keep_raw)
+    logger.info(f"Archived {migrated} legacy RSS feeds")
+
+    if args.prune_orphans:
+        logger.info(f"Pruned {prune_orphans()} orphaned RSS payloads")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+from models.base import Base
+from models.user import GoodreadsUser
+from models.book import Book
+from models.user_book import UserBook, ReadingStatus
+from models.shelf import Shelf
+from models.rss_payload import RSSPayload
+from models.rss_feed import RSSFeed
+
+__all__ = [
+    "Base",
+    "GoodreadsUser",
+    "Book",
+    "UserBook",
+    "ReadingStatus",
+    "Shelf",
+    "RSSPayload",
+    "RSSFeed",
+]
@@ -0,0 +1,4 @@
+from sqlalchemy.orm import declarative_base
+
+# Shared by every model so that Base.metadata describes the whole schema
+Base = declarative_base()
@@ -1,22 +1,26 @@
-from sqlalchemy import Column, String, Text, DateTime, Integer
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import Column, String, Text, DateTime, Integer, ForeignKey, Index
+from models.base import Base
 from datetime import datetime
 
-Base = declarative_base()
-
 class RSSFeed(Base):
     __tablename__ = "rss_feeds"
 
     id = Column(String, primary_key=True)
-    user_id = Column(String, nullable=False)
+    user_id = Column(String, ForeignKey('goodreads_users.id'), nullable=False)
     feed_url = Column(String, nullable=False)
     feed_title = Column(String)
     feed_description = Column(Text)
     feed_language = Column(String)
     feed_last_build_date = Column(DateTime)
     feed_ttl = Column(Integer)
-    raw_rss_content = Column(Text, nullable=False)  # Store the entire RSS XML
+    content_hash = Column(String, ForeignKey('rss_payloads.content_hash'))  # Archived, compressed RSS XML
+    raw_rss_content = Column(Text)  # Legacy uncompressed RSS XML, for rows not yet archived
     scraped_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        Index("idx_rss_feeds_user_id", user_id),
+        Index("idx_rss_feeds_content_hash", content_hash),
+    )
+
     def __repr__(self):
         return f"<RSSFeed(id='{self.id}', user_id='{self.user_id}', title='{self.feed_title}')>"
\ No newline at end of file
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, Text, DateTime, Integer
+from models.base import Base
+from datetime import datetime
+
+class RSSPayload(Base):
+    """Compressed raw RSS feed content, stored once per distinct payload"""
+    __tablename__ = "rss_payloads"
+
+    content_hash = Column(String, primary_key=True)  # sha256 of the uncompressed UTF-8 content
+    encoding = Column(String, nullable=False)  # Compression used, e.g. "gzip"
+    compressed_content = Column(Text, nullable=False)  # base64 of the compressed bytes
+    raw_size = Column(Integer)
+    compressed_size = Column(Integer)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<RSSPayload(content_hash='{self.content_hash}', encoding='{self.encoding}')>"
@@ -1,10 +1,8 @@
 from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Boolean
 from sqlalchemy.orm import relationship
-from sqlalchemy.ext.declarative import declarative_base
+from models.base import Base
 from datetime import datetime
 
-Base = declarative_base()
-
 class Shelf(Base):
     __tablename__ = 'shelves'
 
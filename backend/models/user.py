@@ -1,13 +1,12 @@
 from sqlalchemy import Column, String, DateTime, Integer, Text, Float
-from sqlalchemy.ext.declarative import declarative_base
+from models.base import Base
 from datetime import datetime
 
-Base = declarative_base()
-
 class GoodreadsUser(Base):
     __tablename__ = 'goodreads_users'
 
     id = Column(String, primary_key=True)
+    goodreads_id = Column(String, unique=True)  # Numeric Goodreads user id, from the profile URL
     username = Column(String, unique=True, nullable=False)
     profile_url = Column(String, nullable=False)
     name = Column(String)
@@ -1,11 +1,9 @@
-from sqlalchemy import Column, String, DateTime, Integer, Text, Float, Date, ForeignKey, Enum
+from sqlalchemy import Column, String, DateTime, Integer, Text, Float, Date, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
-from sqlalchemy.ext.declarative import declarative_base
+from models.base import Base
 from datetime import datetime
 import enum
 
-Base = declarative_base()
-
 class ReadingStatus(enum.Enum):
     TO_READ = "to-read"
     CURRENTLY_READING = "currently-reading"
@@ -18,7 +16,16 @@ class UserBook(Base):
     id = Column(String, primary_key=True)
     user_id = Column(String, ForeignKey('goodreads_users.id'), nullable=False)
     book_id = Column(String, ForeignKey('books.id'), nullable=False)
-    status = Column(Enum(ReadingStatus), nullable=False)
+    # Stored as the shelf name (e.g. "to-read") in a VARCHAR, as in setup_database.sql
+    status = Column(
+        Enum(
+            ReadingStatus,
+            name="reading_status",
+            native_enum=False,
+            values_callable=lambda statuses: [status.value for status in statuses],
+        ),
+        nullable=False,
+    )
     rating = Column(Integer)  # From RSS: user_rating
     review = Column(Text)  # From RSS: user_review
     review_id = Column(String)
@@ -35,5 +42,15 @@ class UserBook(Base):
     comments_count = Column(Integer)
     likes_count = Column(Integer)
     pub_date = Column(DateTime)  # From RSS: pubDate (when review was published)
+    content_hash = Column(String)  # Hash of the scraped RSS entry, for incremental re-scrapes
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
\ No newline at end of file
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Shaped to the library queries: a user's books newest first, optionally
+    # on one status shelf, and the rss_guid lookup of incremental re-scrapes
+    __table_args__ = (
+        Index("idx_user_books_user_id_date_added", user_id, date_added.desc(), id.desc()),
+        Index("idx_user_books_user_id_status_date_added", user_id, status, date_added.desc(), id.desc()),
+        Index("idx_user_books_user_id_rss_guid", user_id, rss_guid),
+        Index("idx_user_books_book_id", book_id),
+    )
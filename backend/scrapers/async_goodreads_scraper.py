@@ -0,0 +1,276 @@
+import asyncio
+import functools
+import hashlib
+import httpx
+import threading
+from typing import AsyncIterator, Dict, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+import logging
+from scrapers.goodreads_rss_scraper import GoodreadsRSSScraper, RSS_BASE_URL, RSS_PAGE_SIZE, PROFILE_USER_ID_RE
+from scrapers.parallel_parser import get_pool, parse_document
+from services.timing import StageTimer
+from services.rate_limiter import rate_limiter
+from services.metrics import record_upstream_response
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncGoodreadsRSSScraper:
+    """
+    asyncio variant of GoodreadsRSSScraper.
+
+    The profile page and the RSS pages are fetched concurrently over a pooled
+    keep-alive client, with at most max_connections_per_host requests in flight
+    per upstream host. Parsing is shared with GoodreadsRSSScraper, so both
+    produce the same batches. Synchronous callers drive it through
+    AsyncScraperThread.
+
+    The first feed page is requested conditionally on the validators of the
+    last committed fetch, as GoodreadsRSSScraper does. Its new validators are
+    held by `parser` until its commit_feed_validators() is called, so pass in
+    the scraper whose validators the caller commits once the data is saved.
+    """
+
+    def __init__(
+        self,
+        timer: Optional[StageTimer] = None,
+        base_url: str = RSS_BASE_URL,
+        max_connections_per_host: int = 4,
+        per_page: int = RSS_PAGE_SIZE,
+        timeout: float = 30.0,
+        parser: Optional[GoodreadsRSSScraper] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.timer = timer or StageTimer()
+        self.parser = parser or GoodreadsRSSScraper(timer=self.timer, base_url=base_url)
+        self.max_connections_per_host = max_connections_per_host
+        self.per_page = per_page
+        self.client = httpx.AsyncClient(
+            headers=dict(self.parser.session.headers),
+            timeout=timeout,
+            follow_redirects=True,
+            transport=transport,
+            limits=httpx.Limits(
+                max_connections=max_connections_per_host * 4,
+                max_keepalive_connections=max_connections_per_host * 4,
+            ),
+        )
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def get(self, url: str, headers: Optional[Dict] = None) -> httpx.Response:
+        """
+        GET a URL, waiting for a free slot on its host and its rate limit.
+        Error statuses raise; a 304 is returned.
+        """
+        host = urlsplit(url).netloc
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._host_semaphores[host] = asyncio.BoundedSemaphore(
+                self.max_connections_per_host
+            )
+        async with semaphore:
+            await rate_limiter.acquire_async(url)
+            response = await self.client.get(url, headers=headers)
+        record_upstream_response(url, response.status_code, len(response.content))
+        if response.status_code != 304:
+            response.raise_for_status()
+        return response
+
+    async def scrape_user_profile_basic(self, profile_url: str) -> Dict:
+        try:
+            logger.info(f"Fetching profile: {profile_url}")
+            with self.timer.stage("profile_fetch"):
+                response = await self.get(profile_url)
+            return self.parser.parse_profile_html(profile_url, response.text)
+        except Exception as e:
+            logger.error(f"Error scraping profile: {e}")
+            return self.parser.minimal_profile(profile_url)
+
+    async def fetch_rss_page(
+        self, user_id: str, page: int, shelf: Optional[str] = None, use_cache: bool = False
+    ) -> Optional[Dict]:
+        """
+        Fetch and parse one list_rss page into a batch like iter_books_via_rss
+        yields. With use_cache, the request is conditional on the validators
+        of the last committed fetch of the page, and None is returned when it
+        is unchanged; the first page's validators go to the parser's pending
+        validators. Parsing runs in the RSS_PARSE_WORKERS process pool when it is
+        enabled, so pages in flight together are parsed on separate cores, and
+        on the loop's default executor otherwise; either way it doesn't hold
+        up the other fetches. The stages are timed per page, so with pages in
+        flight together their sums exceed the wall-clock time.
+        """
+        rss_url = self.parser.build_rss_url(user_id, shelf, self.per_page, page)
+        cached = self.parser.cached_validators(rss_url) if use_cache else {}
+
+        logger.info(f"Fetching RSS feed page {page}: {rss_url}")
+        with self.timer.stage("rss_fetch"):
+            response = await self.get(rss_url, headers=self.parser.conditional_headers(cached))
+        if response.status_code == 304:
+            logger.info(f"RSS feed not modified (304): {rss_url}")
+            return None
+
+        content_hash = hashlib.sha256(response.content).hexdigest()
+        if cached.get("content_hash") == content_hash:
+            logger.info(f"RSS feed content unchanged: {rss_url}")
+            return None
+        loop = asyncio.get_running_loop()
+        pool = get_pool()
+        with self.timer.stage("parse"):
+            parsed = None
+            if pool is not None:
+                try:
+                    parsed = await loop.run_in_executor(
+                        pool, parse_document, response.content, rss_url, shelf, self.parser.parser_engine
+                    )
+                except Exception as e:
+                    logger.warning(f"Parsing RSS feed page in the pool failed ({e}), parsing in-process: {rss_url}")
+            if parsed is None:
+                parsed = await loop.run_in_executor(
+                    None, self.parser.parse_rss_page, response.content, rss_url, shelf, False
+                )
+        books, rss_metadata, item_count = parsed
+        if page == 1:
+            self.parser.hold_feed_validators(rss_url, response.headers, content_hash, item_count < self.per_page)
+        rss_metadata["raw_rss_data"] = response.text
+        return {"page": page, "books": books, "rss_metadata": rss_metadata, "item_count": item_count}
+
+    async def scrape_profile_and_first_page(
+        self, profile_url: str, use_cache: bool = True
+    ) -> Tuple[Dict, Optional[Dict]]:
+        """
+        Fetch the profile and the first feed page at the same time; the feed
+        only needs the numeric user id, which is taken from the profile URL.
+        With use_cache the page is requested conditionally, and is None when
+        unchanged, which the user data's "not_modified" records.
+        """
+        user_id_match = PROFILE_USER_ID_RE.search(profile_url)
+        if not user_id_match:
+            raise ValueError("Could not extract user ID from profile URL")
+
+        user_data, first_page = await asyncio.gather(
+            self.scrape_user_profile_basic(profile_url),
+            self.fetch_rss_page(user_id_match.group(1), 1, use_cache=use_cache),
+        )
+        user_data["not_modified"] = first_page is None
+        return user_data, first_page
+
+    async def iter_rss_pages(
+        self, first: Dict, user_id: str, shelf: Optional[str] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Yield the batch of an already fetched page, then each following page
+        in page order until a short (last) page. Empty pages are not yielded.
+
+        Following pages are requested ahead of the caller: each page's request
+        goes out as soon as one of the host's max_connections_per_host slots
+        is free, so a slow page holds up only its own batch, not the requests
+        after it. At most twice that many pages are fetched ahead, which bounds
+        the batches held at once. As soon as any page comes back short, no
+        page past it is requested and those in flight are cancelled.
+        """
+        if first["item_count"]:
+            yield first
+        if first["item_count"] < self.per_page:
+            logger.info(f"Reached last RSS feed page ({first['page']}) for user {user_id}")
+            return
+
+        lookahead = 2 * self.max_connections_per_host
+        pending: Dict[int, asyncio.Task] = {}
+        # The first short page seen so far, in whatever order pages answer
+        last_page = None
+
+        def page_done(page: int, task: asyncio.Task):
+            nonlocal last_page
+            if task.cancelled() or task.exception() is not None or task.result()["item_count"] >= self.per_page:
+                return
+            if last_page is None or page < last_page:
+                last_page = page
+                for later_page, later in pending.items():
+                    if later_page > page:
+                        later.cancel()
+
+        page = next_page = first["page"] + 1
+        try:
+            while True:
+                while len(pending) < lookahead and (last_page is None or next_page <= last_page):
+                    task = pending[next_page] = asyncio.ensure_future(self.fetch_rss_page(user_id, next_page, shelf))
+                    task.add_done_callback(functools.partial(page_done, next_page))
+                    next_page += 1
+                batch = await pending.pop(page)
+                if batch["item_count"]:
+                    yield batch
+                if batch["item_count"] < self.per_page:
+                    logger.info(f"Reached last RSS feed page ({page}) for user {user_id}")
+                    return
+                page += 1
+        finally:
+            for task in pending.values():
+                task.cancel()
+            await asyncio.gather(*pending.values(), return_exceptions=True)
+
+
+class AsyncScraperThread:
+    """
+    Runs an AsyncGoodreadsRSSScraper, built from the given options, on an
+    event loop in a thread of its own, for synchronous callers. Pages
+    requested ahead keep downloading on that loop while the caller works on
+    (e.g. saves) the batch it was given. Use as a context manager.
+    """
+
+    def __init__(self, **scraper_options):
+        self._scraper_options = scraper_options
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self.scraper: Optional[AsyncGoodreadsRSSScraper] = None
+
+    def __enter__(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="async-scraper", daemon=True)
+        self._thread.start()
+        self.scraper = self.run(self._open())
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            # Page walks the caller abandoned cancel their requests as they close
+            self.run(self._loop.shutdown_asyncgens())
+            self.run(self.scraper.aclose())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+
+    async def _open(self) -> AsyncGoodreadsRSSScraper:
+        return AsyncGoodreadsRSSScraper(**self._scraper_options)
+
+    def run(self, coroutine):
+        """Run a coroutine on the scraper's loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def scrape_profile_and_first_page(self, profile_url: str, use_cache: bool = True) -> Tuple[Dict, Optional[Dict]]:
+        return self.run(self.scraper.scrape_profile_and_first_page(profile_url, use_cache=use_cache))
+
+    def fetch_rss_page(self, user_id: str, page: int = 1, use_cache: bool = False) -> Optional[Dict]:
+        return self.run(self.scraper.fetch_rss_page(user_id, page, use_cache=use_cache))
+
+    def iter_rss_pages(self, first: Dict, user_id: str, shelf: Optional[str] = None) -> Iterator[Dict]:
+        pages = self.scraper.iter_rss_pages(first, user_id, shelf)
+        try:
+            while True:
+                try:
+                    yield self.run(pages.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            if self._loop.is_running():
+                self.run(pages.aclose())
@@ -0,0 +1,110 @@
+import feedparser
+import io
+import xml.etree.ElementTree as ET
+from typing import Callable, Dict, Iterator, Optional
+import logging
+from services.config import env_str
+
+logger = logging.getLogger(__name__)
+
+# Channel-level elements copied into rss_metadata, keyed by lowercased tag
+CHANNEL_FIELDS = {
+    "title": "feed_title",
+    "description": "feed_description",
+    "language": "feed_language",
+    "lastbuilddate": "feed_last_build_date",
+    "ttl": "feed_ttl",
+}
+
+
+class RSSItem:
+    """
+    Attribute view of a list_rss <item>, using the same lowercased names
+    feedparser exposes so it can be handed to parse_rss_entry.
+    """
+
+    def __init__(self, fields: Dict[str, str]):
+        self.__dict__.update(fields)
+
+
+def iterparse_rss_items(source, channel: Optional[Dict] = None) -> Iterator[RSSItem]:
+    """
+    Incrementally parse an RSS document, yielding one RSSItem per <item> and
+    freeing each element once it has been converted. Channel-level fields are
+    written into the optional channel dict as they are encountered.
+    """
+    depth = 0
+    item_depth = None
+    channel_elem = None
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            depth += 1
+            if elem.tag == "channel":
+                channel_elem = elem
+            elif elem.tag == "item" and item_depth is None:
+                item_depth = depth
+            continue
+
+        depth -= 1
+        tag = elem.tag.lower()
+        if item_depth is not None and tag == "item" and depth == item_depth - 1:
+            fields = {}
+            # Flatten nested elements (e.g. <book><num_pages>) like feedparser does
+            for child in elem.iter():
+                if child is elem or "}" in child.tag:
+                    continue
+                fields[child.tag.lower()] = (child.text or "").strip()
+            item_depth = None
+            elem.clear()
+            if channel_elem is not None:
+                channel_elem.remove(elem)
+            yield RSSItem(fields)
+        elif item_depth is None and channel is not None and tag in CHANNEL_FIELDS and depth == 2:
+            channel[CHANNEL_FIELDS[tag]] = (elem.text or "").strip() or None
+
+
+def etree_entries(content: bytes, channel: Dict) -> Iterator:
+    """
+    Schema-specific engine: walk the list_rss document with ElementTree's
+    iterparse, converting each <item> straight into an RSSItem. Raises
+    ET.ParseError on malformed XML.
+    """
+    return iterparse_rss_items(io.BytesIO(content), channel)
+
+
+def feedparser_entries(content: bytes, channel: Dict) -> Iterator:
+    """Generic engine: parse the whole document with feedparser."""
+    feed = feedparser.parse(content)
+    if feed.bozo and feed.bozo_exception:
+        logger.warning(f"RSS feed parsing had issues: {feed.bozo_exception}")
+
+    channel.update(
+        {
+            "feed_title": getattr(feed.feed, "title", None),
+            "feed_description": getattr(feed.feed, "description", None),
+            "feed_language": getattr(feed.feed, "language", None),
+            # feedparser exposes <lastBuildDate> as "updated"
+            "feed_last_build_date": getattr(feed.feed, "updated", None),
+            "feed_ttl": getattr(feed.feed, "ttl", None),
+        }
+    )
+    return iter(feed.entries)
+
+
+# Each engine takes the raw feed bytes and a dict to fill with channel
+# metadata, and returns the feed's entries in order
+PARSER_ENGINES: Dict[str, Callable[[bytes, Dict], Iterator]] = {
+    "etree": etree_entries,
+    "feedparser": feedparser_entries,
+}
+
+DEFAULT_PARSER_ENGINE = env_str("RSS_PARSER_ENGINE", "etree").lower()
+
+
+def get_parser_engine(name: Optional[str] = None) -> Callable[[bytes, Dict], Iterator]:
+    name = (name or DEFAULT_PARSER_ENGINE).lower()
+    if name not in PARSER_ENGINES:
+        raise ValueError(
+            f"Unknown RSS parser engine '{name}' (expected one of: {', '.join(sorted(PARSER_ENGINES))})"
+        )
+    return PARSER_ENGINES[name]
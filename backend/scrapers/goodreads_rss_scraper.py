@@ -1,12 +1,92 @@
 import requests
 from bs4 import BeautifulSoup
-import feedparser
 import re
-from typing import Dict, Optional
+import html
+import html.entities
+import hashlib
+import threading
+import time
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterator, List, Optional, Tuple
 import logging
+from scrapers.feed_parsers import CHANNEL_FIELDS, get_parser_engine
+from scrapers.parallel_parser import count_items, get_pool, parse_document, parse_in_pool
+from scrapers.scraped_book import ScrapedBook
+from services.config import env_float
+from services.timing import StageTimer
+from services.rate_limiter import rate_limiter
+from services.metrics import record_upstream_response
 
 logger = logging.getLogger(__name__)
 
+# Per-feed-URL validators (ETag, Last-Modified, content hash) from the last
+# successfully processed fetch. Shared across scraper instances in this process.
+_feed_validators: Dict[str, Dict] = {}
+_feed_validators_lock = threading.Lock()
+
+# Only the first page of a feed is fetched conditionally, and only while that
+# page held the whole feed: with more pages, a change confined to later pages
+# would go unseen. Validators older than this are ignored all the same.
+FEED_VALIDATOR_MAX_AGE = env_float("RSS_VALIDATOR_MAX_AGE_SECONDS", 86400)
+
+RSS_BASE_URL = "https://www.goodreads.com"
+# Entries per list_rss page; the feed is walked page by page until a short page
+RSS_PAGE_SIZE = 100
+
+PROFILE_USER_ID_RE = re.compile(r"/user/show/(\d+)")
+PROFILE_USERNAME_RE = re.compile(r"/user/show/\d+-(.+)$")
+REVIEWS_COUNT_RE = re.compile(r"(\d+)\s+reviews?", re.IGNORECASE)
+RATINGS_COUNT_RE = re.compile(r"(\d+)\s+ratings?", re.IGNORECASE)
+TITLE_AUTHOR_RE = re.compile(r"^(.*?)\s+by\s+(.*)$")
+BOOK_ID_RE = re.compile(r"/book/show/(\d+)")
+
+# A start or end tag whose attribute values, if quoted, may contain ">"
+_HTML_TAG_RE = re.compile(
+    r"</?[A-Za-z][A-Za-z0-9]*(?:[ \t\n\r\f/](?:[^>\"'=]|=[ \t\n\r\f]*(?:\"[^\"]*\"|'[^']*'))*)?>"
+)
+# Markup html_to_text leaves to BeautifulSoup: comments, CDATA, declarations,
+# processing instructions and elements whose content is not plain text
+_COMPLEX_HTML_RE = re.compile(
+    r"<(?:[!?]|/?(?:script|style|textarea|title|xmp|iframe|noembed|noframes|noscript|plaintext)\b)",
+    re.IGNORECASE,
+)
+_STRAY_TAG_START_RE = re.compile(r"<[/A-Za-z]")
+# Complete character references; anything else starting like one is left to
+# BeautifulSoup, whose handling of unknown or unterminated entities differs
+_ENTITY_RE = re.compile(r"&(?:#[0-9]{1,7}|#[xX][0-9a-fA-F]{1,6}|([A-Za-z][A-Za-z0-9]*));")
+_STRAY_ENTITY_RE = re.compile(r"&[#A-Za-z]")
+
+
+def _simple_entities_only(fragment: str) -> bool:
+    for match in _ENTITY_RE.finditer(fragment):
+        name = match.group(1)
+        if name is not None and name + ";" not in html.entities.html5:
+            return False
+    return not _STRAY_ENTITY_RE.search(_ENTITY_RE.sub("", fragment))
+
+
+def html_to_text(fragment: str) -> str:
+    """
+    Fast equivalent of BeautifulSoup(fragment, "html.parser").get_text(strip=True)
+    for the simple markup found in reviews and book descriptions: strips
+    tags, unescapes entities and joins the stripped text runs. Anything
+    unusual is handed to BeautifulSoup so the output always matches.
+    """
+    if "<" not in fragment and "&" not in fragment:
+        return fragment.strip()
+    if _COMPLEX_HTML_RE.search(fragment) or ("&" in fragment and not _simple_entities_only(fragment)):
+        return BeautifulSoup(fragment, "html.parser").get_text(strip=True)
+
+    parts = []
+    for run in _HTML_TAG_RE.split(fragment):
+        if _STRAY_TAG_START_RE.search(run):
+            # Malformed or unterminated tag; let the real parser decide
+            return BeautifulSoup(fragment, "html.parser").get_text(strip=True)
+        text = html.unescape(run).strip()
+        if text:
+            parts.append(text)
+    return "".join(parts)
+
 
 class GoodreadsRSSScraper:
     """
@@ -14,13 +94,34 @@ class GoodreadsRSSScraper:
     Much faster and more reliable than Selenium-based scraping.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        timer: Optional[StageTimer] = None,
+        base_url: str = RSS_BASE_URL,
+        parser_engine: Optional[str] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        # Feed parser engine (RSS_PARSER_ENGINE unless given), see scrapers.feed_parsers
+        self.parser_engine = parser_engine
+        self.parse_entries = get_parser_engine(parser_engine)
         self.session = requests.Session()
         self.session.headers.update(
             {
                 "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
             }
         )
+        # Validators for feeds fetched by this instance, held until the caller
+        # has persisted the feed and calls commit_feed_validators()
+        self._pending_validators: Dict[str, Dict] = {}
+        # Time spent fetching and parsing, per stage
+        self.timer = timer or StageTimer()
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """GET through the pooled session, within the per-host rate limit."""
+        rate_limiter.acquire(url)
+        response = self.session.get(url, **kwargs)
+        record_upstream_response(url, response.status_code, len(response.content))
+        return response
 
     def scrape_user_profile_basic(self, profile_url: str) -> Dict:
         """
@@ -29,148 +130,410 @@ class GoodreadsRSSScraper:
         """
         try:
             logger.info(f"Fetching profile: {profile_url}")
-            response = self.session.get(profile_url)
-            response.raise_for_status()
+            with self.timer.stage("profile_fetch"):
+                response = self.get(profile_url)
+                response.raise_for_status()
 
-            soup = BeautifulSoup(response.text, "html.parser")
-
-            # Extract user ID from URL
-            user_id_match = re.search(r"/user/show/(\d+)", profile_url)
-            user_id = user_id_match.group(1) if user_id_match else None
-
-            # Extract username (either from URL or page)
-            username = user_id
-            if "-" in profile_url:
-                username_match = re.search(r"/user/show/\d+-(.+)$", profile_url)
-                if username_match:
-                    username = username_match.group(1)
-
-            user_data = {
-                "profile_url": profile_url,
-                "username": username,
-                "user_id": user_id,
-                "name": self.extract_text(soup, 'h1[itemprop="name"]'),
-            }
+            return self.parse_profile_html(profile_url, response.text)
 
-            # Try to extract stats from the page
-            stats_text = soup.get_text()
-
-            # Extract counts using regex
-            reviews_match = re.search(r"(\d+)\s+reviews?", stats_text, re.IGNORECASE)
-            if reviews_match:
-                user_data["reviews_count"] = int(
-                    reviews_match.group(1).replace(",", "")
-                )
+        except Exception as e:
+            logger.error(f"Error scraping profile: {e}")
+            return self.minimal_profile(profile_url)
+
+    def parse_profile_html(self, profile_url: str, html: str) -> Dict:
+        """Extract basic profile info from a fetched profile page."""
+        soup = BeautifulSoup(html, "html.parser")
+
+        # Extract user ID from URL
+        user_id_match = PROFILE_USER_ID_RE.search(profile_url)
+        user_id = user_id_match.group(1) if user_id_match else None
+
+        # Extract username (either from URL or page)
+        username = user_id
+        if "-" in profile_url:
+            username_match = PROFILE_USERNAME_RE.search(profile_url)
+            if username_match:
+                username = username_match.group(1)
+
+        user_data = {
+            "profile_url": profile_url,
+            "username": username,
+            "user_id": user_id,
+            "name": self.extract_text(soup, 'h1[itemprop="name"]'),
+        }
+
+        # Try to extract stats from the page
+        stats_text = soup.get_text()
+
+        # Extract counts using regex
+        reviews_match = REVIEWS_COUNT_RE.search(stats_text)
+        if reviews_match:
+            user_data["reviews_count"] = int(
+                reviews_match.group(1).replace(",", "")
+            )
 
-            ratings_match = re.search(r"(\d+)\s+ratings?", stats_text, re.IGNORECASE)
-            if ratings_match:
-                user_data["ratings_count"] = int(
-                    ratings_match.group(1).replace(",", "")
-                )
+        ratings_match = RATINGS_COUNT_RE.search(stats_text)
+        if ratings_match:
+            user_data["ratings_count"] = int(
+                ratings_match.group(1).replace(",", "")
+            )
 
-            return user_data
+        return user_data
 
-        except Exception as e:
-            logger.error(f"Error scraping profile: {e}")
-            # Return minimal data
-            user_id_match = re.search(r"/user/show/(\d+)", profile_url)
-            return {
-                "profile_url": profile_url,
-                "username": user_id_match.group(1) if user_id_match else "unknown",
-                "user_id": user_id_match.group(1) if user_id_match else None,
-            }
+    def minimal_profile(self, profile_url: str) -> Dict:
+        """Profile data derivable from the URL alone, used when the page can't be scraped."""
+        user_id_match = PROFILE_USER_ID_RE.search(profile_url)
+        username_match = PROFILE_USERNAME_RE.search(profile_url)
+        user_id = user_id_match.group(1) if user_id_match else None
+        return {
+            "profile_url": profile_url,
+            "username": username_match.group(1) if username_match else (user_id or "unknown"),
+            "user_id": user_id,
+        }
 
     def scrape_books_via_rss(
-        self, user_id: str, shelf: Optional[str] = None, per_page: int = 1000
+        self,
+        user_id: str,
+        shelf: Optional[str] = None,
+        per_page: int = RSS_PAGE_SIZE,
+        use_cache: bool = True,
     ) -> Dict:
         """
-        Scrape books using Goodreads RSS feed and return both raw RSS and parsed data.
+        Scrape a user's whole library from the paginated RSS feed and return
+        both raw RSS and parsed data: every page's batch under "rss_batches",
+        all books, and the first page's rss_metadata.
+
+        With use_cache, the first page is requested conditionally on the
+        validators of the last committed fetch if that page was the whole
+        feed; if the server answers 304 or the body hashes the same, the
+        result is flagged with "not_modified".
         """
-        books = []
-        rss_metadata = {}
+        first = self.fetch_rss_page(user_id, shelf, per_page, 1, use_cache=use_cache)
+        if first is None:
+            return self._not_modified_result(self.build_rss_url(user_id, shelf, per_page, 1))
+
+        batches = list(self.iter_rss_pages(first, user_id, shelf, per_page))
+        books = [book for batch in batches for book in batch["books"]]
+        logger.info(f"Successfully extracted {len(books)} books from {len(batches)} RSS feed page(s)")
+        return {
+            "books": books,
+            "rss_metadata": first["rss_metadata"],
+            "rss_batches": batches,
+            "not_modified": False,
+        }
+
+    def fetch_rss_page(
+        self,
+        user_id: str,
+        shelf: Optional[str] = None,
+        per_page: int = RSS_PAGE_SIZE,
+        page: int = 1,
+        use_cache: bool = False,
+    ) -> Optional[Dict]:
+        """
+        Fetch and parse one list_rss page into a batch: its books, its
+        rss_metadata (including the raw page content) and its item_count.
+
+        The feed is downloaded once and parsed from the bytes in hand. With
+        use_cache, the request is made conditional on the validators of the
+        last committed fetch of the page, and None is returned when it is
+        unchanged. The first page's validators are held until
+        commit_feed_validators(); they are only used again if that page was
+        the whole feed.
+        """
+        rss_url = self.build_rss_url(user_id, shelf, per_page, page)
+
         try:
-            # Construct RSS feed URL with pagination
-            if shelf:
-                rss_url = f"https://www.goodreads.com/review/list_rss/{user_id}?shelf={shelf}&per_page={per_page}"
-            else:
-                # Get all books
-                rss_url = f"https://www.goodreads.com/review/list_rss/{user_id}?per_page={per_page}"
+            cached = self.cached_validators(rss_url) if use_cache else {}
+            response = self._request_rss_page(rss_url, page, self.conditional_headers(cached))
+            if response.status_code == 304:
+                logger.info(f"RSS feed not modified (304): {rss_url}")
+                return None
+            response.raise_for_status()
 
-            logger.info(f"Fetching RSS feed: {rss_url}")
+            raw_rss_bytes = response.content
+            content_hash = hashlib.sha256(raw_rss_bytes).hexdigest()
+            if cached.get("content_hash") == content_hash:
+                logger.info(f"RSS feed content unchanged: {rss_url}")
+                return None
 
-            # Get raw RSS content first
-            response = self.session.get(rss_url)
-            response.raise_for_status()
-            raw_rss_content = response.text
-
-            # Parse the RSS feed
-            feed = feedparser.parse(rss_url)
-
-            if feed.bozo and feed.bozo_exception:
-                logger.warning(f"RSS feed parsing had issues: {feed.bozo_exception}")
-
-            # Extract feed metadata
-            rss_metadata = {
-                "rss_feed_url": rss_url,
-                "feed_title": getattr(feed.feed, "title", None),
-                "feed_description": getattr(feed.feed, "description", None),
-                "feed_language": getattr(feed.feed, "language", None),
-                "feed_last_build_date": getattr(feed.feed, "lastbuilddate", None),
-                "feed_ttl": getattr(feed.feed, "ttl", None),
-                "raw_rss_data": raw_rss_content,
-            }
+            # Parse the feed from the bytes in hand rather than handing the
+            # parser the URL, which would fetch it a second time
+            with self.timer.stage("parse"):
+                parsed = self.parse_rss_page(raw_rss_bytes, rss_url, shelf)
+            if page == 1:
+                self.hold_feed_validators(rss_url, response.headers, content_hash, parsed[2] < per_page)
+            return self._rss_batch(page, response, parsed)
+
+        except Exception as e:
+            logger.error(f"Error scraping RSS feed page {page}: {e}")
+            raise
 
-            for entry in feed.entries:
-                book = self.parse_rss_entry(entry, shelf)
-                if book:
-                    books.append(book)
+    def _request_rss_page(self, rss_url: str, page: int, headers: Optional[Dict] = None) -> requests.Response:
+        logger.info(f"Fetching RSS feed page {page}: {rss_url}")
+        with self.timer.stage("rss_fetch"):
+            return self.get(rss_url, headers=headers or {})
 
-            logger.info(f"Successfully extracted {len(books)} books from RSS feed")
-            return {"books": books, "rss_metadata": rss_metadata}
+    @staticmethod
+    def _rss_batch(page: int, response: requests.Response, parsed: Tuple[List[ScrapedBook], Dict, int]) -> Dict:
+        books, rss_metadata, item_count = parsed
+        rss_metadata["raw_rss_data"] = response.text
+        return {"page": page, "books": books, "rss_metadata": rss_metadata, "item_count": item_count}
 
+    def iter_rss_pages(
+        self, first: Dict, user_id: str, shelf: Optional[str] = None, per_page: int = RSS_PAGE_SIZE
+    ) -> Iterator[Dict]:
+        """
+        Yield the batch of an already fetched page, then fetch and yield each
+        following page in turn until a short (last) page. Empty pages are not
+        yielded.
+
+        When the RSS_PARSE_WORKERS pool is enabled, each following page is
+        parsed in a worker process while the next one downloads, so at most
+        two pages are held at a time.
+        """
+        if first["item_count"]:
+            yield first
+        if first["item_count"] < per_page:
+            logger.info(f"Reached last RSS feed page ({first['page']}) for user {user_id}")
+            return
+
+        pool = get_pool()
+        if pool is not None:
+            yield from self._iter_rss_pages_in_pool(pool, first["page"] + 1, user_id, shelf, per_page)
+            return
+
+        batch = first
+        while batch["item_count"] >= per_page:
+            batch = self.fetch_rss_page(user_id, shelf, per_page, batch["page"] + 1)
+            if batch["item_count"]:
+                yield batch
+        logger.info(f"Reached last RSS feed page ({batch['page']}) for user {user_id}")
+
+    def _iter_rss_pages_in_pool(
+        self, pool, page: int, user_id: str, shelf: Optional[str], per_page: int
+    ) -> Iterator[Dict]:
+        """
+        iter_rss_pages from `page` on, with parsing in the process pool. A
+        page's items are counted without parsing it to decide whether the
+        next page is needed, so the next download starts while it parses.
+        """
+        in_flight = self._submit_rss_page(pool, page, user_id, shelf, per_page)
+        while in_flight is not None:
+            page, response, future = in_flight
+            in_flight = None
+            if count_items(response.content) >= per_page:
+                in_flight = self._submit_rss_page(pool, page + 1, user_id, shelf, per_page)
+
+            rss_url = self.build_rss_url(user_id, shelf, per_page, page)
+            with self.timer.stage("parse"):
+                try:
+                    parsed = future.result()
+                except Exception as e:
+                    logger.warning(f"Parsing RSS feed page in the pool failed ({e}), parsing in-process: {rss_url}")
+                    parsed = self.parse_rss_page(response.content, rss_url, shelf, parallel=False)
+            batch = self._rss_batch(page, response, parsed)
+            del response, future
+
+            if batch["item_count"]:
+                yield batch
+            if batch["item_count"] < per_page:
+                if in_flight is not None:
+                    in_flight[2].cancel()
+                logger.info(f"Reached last RSS feed page ({page}) for user {user_id}")
+                return
+            if in_flight is None:
+                # "<item" inside text threw the count off; the page was full after all
+                in_flight = self._submit_rss_page(pool, page + 1, user_id, shelf, per_page)
+
+    def _submit_rss_page(self, pool, page: int, user_id: str, shelf: Optional[str], per_page: int):
+        """Fetch one list_rss page and start parsing it in the pool"""
+        rss_url = self.build_rss_url(user_id, shelf, per_page, page)
+        try:
+            response = self._request_rss_page(rss_url, page)
+            response.raise_for_status()
         except Exception as e:
-            logger.error(f"Error scraping RSS feed: {e}")
+            logger.error(f"Error scraping RSS feed page {page}: {e}")
             raise
+        future = pool.submit(parse_document, response.content, rss_url, shelf, self.parser_engine)
+        return page, response, future
+
+    def iter_books_via_rss(
+        self, user_id: str, shelf: Optional[str] = None, per_page: int = RSS_PAGE_SIZE
+    ) -> Iterator[Dict]:
+        """
+        Walk the paginated list_rss feed in order, yielding one batch per page.
+
+        Each page is parsed incrementally and released before the next one is
+        requested, so memory stays bounded by the page size rather than the
+        size of the library. Every batch carries the page's books and its own
+        rss_metadata (including the raw page content).
+        """
+        yield from self.iter_rss_pages(self.fetch_rss_page(user_id, shelf, per_page, 1), user_id, shelf, per_page)
+
+    def parse_rss_page(
+        self,
+        content: bytes,
+        rss_url: str,
+        shelf: Optional[str] = None,
+        parallel: bool = True,
+    ) -> Tuple[List[ScrapedBook], Dict, int]:
+        """
+        Parse one list_rss document with the configured engine. Returns the
+        parsed books, the rss_metadata (without raw content) and the number of
+        items seen. Documents the etree engine rejects as malformed XML are
+        re-parsed with the more lenient feedparser.
+
+        With parallel, a document of at least RSS_PARSE_PARALLEL_MIN_ITEMS items
+        is split across the RSS_PARSE_WORKERS process pool when it is enabled.
+        Paged scrapes parse each page in the pool instead, see iter_rss_pages.
+        """
+        if parallel:
+            result = parse_in_pool(content, rss_url, shelf, self.parser_engine)
+            if result is not None:
+                return result
+
+        try:
+            return self._parse_entries(self.parse_entries, content, rss_url, shelf)
+        except ET.ParseError as e:
+            logger.warning(f"RSS feed is not well-formed XML ({e}), parsing with feedparser: {rss_url}")
+            return self._parse_entries(get_parser_engine("feedparser"), content, rss_url, shelf)
+
+    def _parse_entries(
+        self, parse_entries, content: bytes, rss_url: str, shelf: Optional[str]
+    ) -> Tuple[List[ScrapedBook], Dict, int]:
+        rss_metadata = {"rss_feed_url": rss_url}
+        rss_metadata.update(dict.fromkeys(CHANNEL_FIELDS.values()))
+        books = []
+        item_count = 0
+        for entry in parse_entries(content, rss_metadata):
+            item_count += 1
+            book = self.parse_rss_entry(entry, shelf)
+            if book:
+                books.append(book)
+        return books, rss_metadata, item_count
+
+    def build_rss_url(
+        self,
+        user_id: str,
+        shelf: Optional[str] = None,
+        per_page: int = RSS_PAGE_SIZE,
+        page: Optional[int] = None,
+    ) -> str:
+        """Construct the list_rss URL for a user, optionally for a single shelf and page."""
+        rss_url = f"{self.base_url}/review/list_rss/{user_id}?"
+        if shelf:
+            rss_url += f"shelf={shelf}&"
+        rss_url += f"per_page={per_page}"
+        if page:
+            rss_url += f"&page={page}"
+        return rss_url
+
+    def _not_modified_result(self, rss_url: str) -> Dict:
+        return {
+            "books": [],
+            "rss_metadata": {"rss_feed_url": rss_url},
+            "not_modified": True,
+        }
+
+    @staticmethod
+    def cached_validators(rss_url: str) -> Dict:
+        """
+        Validators of the last committed fetch of a feed URL, if that fetch
+        was the whole feed and isn't too old; an unchanged page then means an
+        unchanged feed.
+        """
+        with _feed_validators_lock:
+            cached = dict(_feed_validators.get(rss_url, {}))
+        if not cached.get("whole_feed") or time.monotonic() - cached["committed_at"] > FEED_VALIDATOR_MAX_AGE:
+            return {}
+        return cached
+
+    @staticmethod
+    def conditional_headers(cached: Dict) -> Dict:
+        """Request headers making a fetch conditional on cached validators"""
+        headers = {}
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+        return headers
+
+    def hold_feed_validators(self, rss_url: str, response_headers, content_hash: str, whole_feed: bool):
+        """
+        Hold a fetched page's validators until commit_feed_validators().
+        whole_feed says whether the page was the feed's only one.
+        """
+        self._pending_validators[rss_url] = {
+            "etag": response_headers.get("ETag"),
+            "last_modified": response_headers.get("Last-Modified"),
+            "content_hash": content_hash,
+            "whole_feed": whole_feed,
+        }
+
+    def commit_feed_validators(self):
+        """
+        Remember the validators of the feeds fetched by this scraper so the next
+        fetch of the same URL can be short-circuited. Call only once the scraped
+        data has been persisted.
+        """
+        committed_at = time.monotonic()
+        with _feed_validators_lock:
+            for rss_url, validators in self._pending_validators.items():
+                _feed_validators[rss_url] = {**validators, "committed_at": committed_at}
+        self._pending_validators = {}
+
+    @staticmethod
+    def forget_feed_validators(rss_url: Optional[str] = None):
+        """Drop cached validators for one feed URL, or for all feeds."""
+        with _feed_validators_lock:
+            if rss_url is None:
+                _feed_validators.clear()
+            else:
+                _feed_validators.pop(rss_url, None)
 
-    def parse_rss_entry(self, entry, default_shelf: Optional[str] = None) -> Dict:
+    def parse_rss_entry(self, entry, default_shelf: Optional[str] = None) -> ScrapedBook:
         """Parse a single RSS feed entry into book data with all available RSS fields."""
-        book = {}
+        book = ScrapedBook()
 
         # RSS item metadata
         if hasattr(entry, "guid"):
-            book["rss_guid"] = entry.guid
+            book.rss_guid = entry.guid
 
-        if hasattr(entry, "pubdate"):
-            book["pub_date"] = entry.pubdate
+        # feedparser exposes <pubDate> as "published"
+        if hasattr(entry, "published"):
+            book.pub_date = entry.published
+        elif hasattr(entry, "pubdate"):
+            book.pub_date = entry.pubdate
 
         if hasattr(entry, "link"):
-            book["review_url"] = entry.link
+            book.review_url = entry.link
 
         # Extract book title and author from title field
         if hasattr(entry, "title"):
-            title_match = re.match(r"^(.*?)\s+by\s+(.*)$", entry.title)
+            title_match = TITLE_AUTHOR_RE.match(entry.title)
             if title_match:
-                book["title"] = title_match.group(1).strip()
-                book["author"] = title_match.group(2).strip()
+                book.title = title_match.group(1).strip()
+                book.author = title_match.group(2).strip()
             else:
-                book["title"] = entry.title
+                book.title = entry.title
 
         # Extract book ID from multiple possible sources
         if hasattr(entry, "book_id"):
-            book["goodreads_id"] = entry.book_id
+            book.goodreads_id = entry.book_id
         elif hasattr(entry, "link"):
             # Try to extract from review link
-            id_match = re.search(r"/book/show/(\d+)", entry.link)
+            id_match = BOOK_ID_RE.search(entry.link)
             if id_match:
-                book["goodreads_id"] = id_match.group(1)
+                book.goodreads_id = id_match.group(1)
 
         # Author name from RSS field
         if hasattr(entry, "author_name"):
-            book["author"] = entry.author_name
+            book.author = entry.author_name
 
         # Extract ISBN
         if hasattr(entry, "isbn"):
-            book["isbn"] = entry.isbn
+            book.isbn = entry.isbn
 
         # Extract user rating
         if hasattr(entry, "user_rating"):
@@ -180,100 +543,100 @@ class GoodreadsRSSScraper:
                     if entry.user_rating and entry.user_rating != "0"
                     else None
                 )
-                book["user_rating"] = rating
+                book.user_rating = rating
             except (ValueError, TypeError):
                 pass
 
         # Extract average rating
         if hasattr(entry, "average_rating"):
             try:
-                book["average_rating"] = float(entry.average_rating)
+                book.average_rating = float(entry.average_rating)
             except (ValueError, TypeError):
                 pass
 
         # Extract all date fields
         if hasattr(entry, "user_date_added"):
-            book["date_added"] = entry.user_date_added
+            book.date_added = entry.user_date_added
 
         if hasattr(entry, "user_date_created"):
-            book["date_created"] = entry.user_date_created
+            book.date_created = entry.user_date_created
 
         if hasattr(entry, "user_read_at"):
             # Only set if not empty
             if entry.user_read_at and entry.user_read_at.strip():
-                book["date_finished"] = entry.user_read_at
+                book.date_finished = entry.user_read_at
 
         # Extract review
         if hasattr(entry, "user_review"):
             if entry.user_review and entry.user_review.strip():
-                soup = BeautifulSoup(entry.user_review, "html.parser")
-                book["review"] = soup.get_text(strip=True)
+                book.review = html_to_text(entry.user_review)
 
         # Extract shelves and determine status
         if hasattr(entry, "user_shelves"):
             if entry.user_shelves and entry.user_shelves.strip():
-                book["shelves"] = [
+                book.shelves = [
                     s.strip() for s in entry.user_shelves.split(",") if s.strip()
                 ]
             else:
-                book["shelves"] = []
+                book.shelves = []
 
             # Determine primary status from shelves
-            if "currently-reading" in book.get("shelves", []):
-                book["status"] = "currently-reading"
-            elif "to-read" in book.get("shelves", []):
-                book["status"] = "to-read"
-            elif "read" in book.get("shelves", []):
-                book["status"] = "read"
+            if "currently-reading" in book.shelves:
+                book.status = "currently-reading"
+            elif "to-read" in book.shelves:
+                book.status = "to-read"
+            elif "read" in book.shelves:
+                book.status = "read"
             else:
                 # Use first exclusive shelf or default to 'read' if no user_read_at, else 'to-read'
-                if book.get("shelves"):
-                    book["status"] = book["shelves"][0]
+                if book.shelves:
+                    book.status = book.shelves[0]
                 elif book.get("date_finished"):
-                    book["status"] = "read"
+                    book.status = "read"
                 else:
-                    book["status"] = default_shelf or "to-read"
+                    book.status = default_shelf or "to-read"
         else:
             # Default status logic
             if book.get("date_finished"):
-                book["status"] = "read"
+                book.status = "read"
             else:
-                book["status"] = default_shelf or "to-read"
+                book.status = default_shelf or "to-read"
 
         # Extract book metadata
         if hasattr(entry, "book_description"):
             if entry.book_description and entry.book_description.strip():
-                soup = BeautifulSoup(entry.book_description, "html.parser")
-                book["description"] = soup.get_text(strip=True)
+                book.description = html_to_text(entry.book_description)
 
         if hasattr(entry, "book_published"):
-            book["publication_year"] = entry.book_published
+            book.publication_year = entry.book_published
 
         # Extract all image URLs
         if hasattr(entry, "book_image_url"):
-            book["image_url"] = entry.book_image_url
+            book.image_url = entry.book_image_url
 
         if hasattr(entry, "book_small_image_url"):
-            book["small_image_url"] = entry.book_small_image_url
+            book.small_image_url = entry.book_small_image_url
 
         if hasattr(entry, "book_medium_image_url"):
-            book["medium_image_url"] = entry.book_medium_image_url
+            book.medium_image_url = entry.book_medium_image_url
 
         if hasattr(entry, "book_large_image_url"):
-            book["large_image_url"] = entry.book_large_image_url
+            book.large_image_url = entry.book_large_image_url
 
         # Extract page count
         if hasattr(entry, "num_pages"):
             try:
-                book["pages"] = int(entry.num_pages)
+                book.pages = int(entry.num_pages)
             except (ValueError, TypeError):
                 pass
 
         return book
 
-    def scrape_full_user_data(self, profile_url: str) -> Dict:
+    def scrape_full_user_data(self, profile_url: str, use_cache: bool = True) -> Dict:
         """
         Scrape complete user data using only RSS feeds and HTTP requests.
+        If the feed is unchanged since the last committed fetch, the returned
+        data has "not_modified" set and carries no books.
         """
         try:
             # Get basic profile info
@@ -283,26 +646,17 @@ class GoodreadsRSSScraper:
                 raise ValueError("Could not extract user ID from profile URL")
 
             # Scrape all books via RSS (returns both books and RSS metadata)
-            rss_result = self.scrape_books_via_rss(user_data["user_id"])
+            rss_result = self.scrape_books_via_rss(
+                user_data["user_id"], use_cache=use_cache
+            )
+            user_data["not_modified"] = rss_result["not_modified"]
             all_books = rss_result["books"]
             rss_metadata = rss_result["rss_metadata"]
 
-            # Add RSS metadata to user data
+            # Add RSS metadata to user data; each page is saved as its own batch
             user_data.update(rss_metadata)
-
-            # Organize books by status
-            books_by_status = {"read": [], "currently-reading": [], "to-read": []}
-
-            for book in all_books:
-                status = book.get("status", "read")
-                if status in books_by_status:
-                    books_by_status[status].append(book)
-
-            user_data["books"] = all_books
-            user_data["total_books"] = len(all_books)
-            user_data["books_read"] = len(books_by_status["read"])
-            user_data["books_reading"] = len(books_by_status["currently-reading"])
-            user_data["books_to_read"] = len(books_by_status["to-read"])
+            user_data["rss_batches"] = rss_result.get("rss_batches", [])
+            self.add_books_summary(user_data, all_books)
 
             logger.info(
                 f"Successfully scraped {len(all_books)} books for user {user_data['username']}"
@@ -313,6 +667,21 @@ class GoodreadsRSSScraper:
             logger.error(f"Error scraping user data: {e}")
             raise
 
+    def add_books_summary(self, user_data: Dict, all_books: List[ScrapedBook]):
+        """Attach the books to user_data along with per-status counts."""
+        books_by_status = {"read": [], "currently-reading": [], "to-read": []}
+
+        for book in all_books:
+            status = book.get("status", "read")
+            if status in books_by_status:
+                books_by_status[status].append(book)
+
+        user_data["books"] = all_books
+        user_data["total_books"] = len(all_books)
+        user_data["books_read"] = len(books_by_status["read"])
+        user_data["books_reading"] = len(books_by_status["currently-reading"])
+        user_data["books_to_read"] = len(books_by_status["to-read"])
+
     def extract_text(self, soup, selector: str) -> Optional[str]:
         """Helper to extract text from BeautifulSoup element."""
         elem = soup.select_one(selector)
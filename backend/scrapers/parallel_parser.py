@@ -0,0 +1,128 @@
+import multiprocessing
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import logging
+from scrapers.scraped_book import ScrapedBook
+from services.config import env_int
+
+logger = logging.getLogger(__name__)
+
+# Worker processes used to parse feed pages; 0 or 1 keeps parsing in-process
+PARSE_WORKERS = env_int("RSS_PARSE_WORKERS", 0)
+# A single document with fewer items than this is parsed in one piece rather
+# than split across the pool, where the cost of shipping chunks and results
+# between processes isn't worth it
+PARALLEL_MIN_ITEMS = env_int("RSS_PARSE_PARALLEL_MIN_ITEMS", 2000)
+
+_ITEM_START_RE = re.compile(rb"<item[\s>]")
+_ITEM_END = b"</item>"
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+# Per worker process: scrapers keyed by parser engine, built on first use
+_worker_scrapers: Dict[Optional[str], object] = {}
+
+
+def count_items(content: bytes) -> int:
+    """Number of <item> start tags in a list_rss document, without parsing it."""
+    return sum(1 for _ in _ITEM_START_RE.finditer(content))
+
+
+def split_feed(
+    content: bytes, parts: int, min_items: int = PARALLEL_MIN_ITEMS
+) -> Optional[Tuple[List[bytes], int]]:
+    """
+    Split a list_rss document into up to `parts` standalone documents, each
+    holding a consecutive run of the <item>s between copies of the channel
+    header and trailer. Returns the documents and the number of items found,
+    or None if the feed has fewer than min_items.
+    """
+    starts = [match.start() for match in _ITEM_START_RE.finditer(content)]
+    if len(starts) < max(min_items, 2) or parts < 2:
+        return None
+
+    last_end = content.rfind(_ITEM_END)
+    if last_end < starts[-1]:
+        return None
+    last_end += len(_ITEM_END)
+    header = content[:starts[0]]
+    trailer = content[last_end:]
+
+    per_part = -(-len(starts) // parts)
+    bounds = starts[::per_part] + [last_end]
+    documents = [header + content[begin:end] + trailer for begin, end in zip(bounds, bounds[1:])]
+    return documents, len(starts)
+
+
+def get_pool() -> Optional[ProcessPoolExecutor]:
+    """The shared parse pool, started on first use, or None if disabled."""
+    global _pool
+    if PARSE_WORKERS < 2:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            # spawn rather than fork: the API process runs threads
+            _pool = ProcessPoolExecutor(
+                max_workers=PARSE_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info(f"Started RSS parse pool with {PARSE_WORKERS} workers")
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+def parse_document(
+    document: bytes, rss_url: str, shelf: Optional[str], parser_engine: Optional[str]
+) -> Tuple[List[ScrapedBook], Dict, int]:
+    """Runs in a worker process: parse one feed page or one chunk of a split feed."""
+    scraper = _worker_scrapers.get(parser_engine)
+    if scraper is None:
+        from scrapers.goodreads_rss_scraper import GoodreadsRSSScraper
+
+        scraper = _worker_scrapers[parser_engine] = GoodreadsRSSScraper(parser_engine=parser_engine)
+    return scraper.parse_rss_page(document, rss_url, shelf, parallel=False)
+
+
+def parse_in_pool(
+    content: bytes, rss_url: str, shelf: Optional[str], parser_engine: Optional[str]
+) -> Optional[Tuple[List[ScrapedBook], Dict, int]]:
+    """
+    Parse a large feed across the process pool, merging the chunks' books in
+    feed order. Returns None when the feed should be parsed in-process: the
+    pool is disabled, the feed is below PARALLEL_MIN_ITEMS, or a worker failed.
+    """
+    pool = get_pool()
+    if pool is None:
+        return None
+    split = split_feed(content, PARSE_WORKERS, PARALLEL_MIN_ITEMS)
+    if split is None:
+        return None
+    documents, expected_items = split
+
+    try:
+        futures = [pool.submit(parse_document, document, rss_url, shelf, parser_engine) for document in documents]
+        results = [future.result() for future in futures]
+    except Exception as e:
+        logger.warning(f"Parallel RSS parse failed ({e}), parsing in-process: {rss_url}")
+        return None
+
+    books = []
+    item_count = 0
+    for chunk_books, _, chunk_items in results:
+        books.extend(chunk_books)
+        item_count += chunk_items
+    if item_count != expected_items:
+        # An "<item" inside text content threw the split off
+        logger.warning(f"Parallel RSS parse found {item_count} of {expected_items} items, parsing in-process: {rss_url}")
+        return None
+    # Every chunk carries the full channel header and trailer
+    return books, results[0][1], item_count
@@ -0,0 +1,129 @@
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+import hashlib
+import json
+from typing import Dict, List, Optional, Tuple
+
+
+def feed_timestamp(value: Optional[str]) -> Optional[str]:
+    """
+    An RFC 822 feed date as an ISO 8601 UTC timestamp, which sorts the same
+    as text and as a timestamp; None if it is empty or unparseable
+    """
+    if not value or not value.strip():
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        # "-0000" means UTC with no zone given
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat()
+
+
+class ScrapedBook:
+    """
+    One parsed list_rss entry. Fields are fixed slots rather than a per-book
+    dict, and a field the feed didn't provide is left unset, which keeps
+    to_dict() (and with it the content hash) exactly what parse_rss_entry
+    used to return as a plain dict.
+    """
+
+    __slots__ = (
+        "rss_guid",
+        "pub_date",
+        "review_url",
+        "title",
+        "author",
+        "goodreads_id",
+        "isbn",
+        "user_rating",
+        "average_rating",
+        "date_added",
+        "date_created",
+        "date_finished",
+        "review",
+        "shelves",
+        "status",
+        "description",
+        "publication_year",
+        "image_url",
+        "small_image_url",
+        "medium_image_url",
+        "large_image_url",
+        "pages",
+    )
+
+    def __init__(self, **fields):
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+    def get(self, name: str, default=None):
+        """Field value, or default if the feed didn't provide it"""
+        return getattr(self, name, default)
+
+    def to_dict(self) -> Dict:
+        """The fields that are set"""
+        fields = {}
+        for name in self.__slots__:
+            try:
+                fields[name] = getattr(self, name)
+            except AttributeError:
+                pass
+        return fields
+
+    def content_hash(self) -> str:
+        """Fingerprint of everything scraped for the book, used to detect changes"""
+        payload = json.dumps(self.to_dict(), sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def to_records(
+        self, book_id: str, user_book_id: str, user_id: str, content_hash: Optional[str] = None
+    ) -> Tuple[Dict, Dict]:
+        """Build the books row and the user_books row for this entry in one pass"""
+        get = self.get
+        shelves: List[str] = get("shelves")
+        book_record = {
+            "id": book_id,
+            "goodreads_id": get("goodreads_id"),
+            "title": get("title"),
+            "author": get("author"),
+            "isbn": get("isbn"),
+            "isbn13": None,
+            "average_rating": get("average_rating"),
+            "ratings_count": 0,
+            "publication_year": get("publication_year"),
+            "pages": get("pages"),
+            "description": get("description"),
+            "image_url": get("image_url"),
+            "small_image_url": get("small_image_url"),
+            "medium_image_url": get("medium_image_url"),
+            "large_image_url": get("large_image_url"),
+        }
+        user_book_record = {
+            "id": user_book_id,
+            "user_id": user_id,
+            "book_id": str(book_id),
+            "status": get("status", "read"),
+            "rating": get("user_rating"),
+            "review": get("review"),
+            "review_url": get("review_url"),
+            "rss_guid": get("rss_guid"),
+            "date_added": feed_timestamp(get("date_added")),
+            "date_created": feed_timestamp(get("date_created")),
+            "date_started": None,
+            "date_finished": feed_timestamp(get("date_finished")),
+            "shelves": ",".join(shelves) if shelves else None,
+            "pub_date": feed_timestamp(get("pub_date")),
+            "content_hash": content_hash or self.content_hash(),
+        }
+        return book_record, user_book_record
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ScrapedBook):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"ScrapedBook({self.to_dict()!r})"
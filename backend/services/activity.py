@@ -0,0 +1,41 @@
+from collections import OrderedDict
+from typing import List, Optional
+import threading
+import time
+from services.config import env_int
+
+
+class ReadActivity:
+    """
+    When each username's library was last read, most recent last. Only the
+    max_users most recently read usernames are remembered.
+    """
+
+    def __init__(self, max_users: int):
+        self.max_users = max_users
+        self._last_read: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def touch(self, username: str):
+        with self._lock:
+            self._last_read[username] = time.time()
+            self._last_read.move_to_end(username)
+            while len(self._last_read) > self.max_users:
+                self._last_read.popitem(last=False)
+
+    def last_read(self, username: str) -> Optional[float]:
+        with self._lock:
+            return self._last_read.get(username)
+
+    def read_since(self, since: float) -> List[str]:
+        """Usernames read at or after the given time, most recent first"""
+        recent = []
+        with self._lock:
+            for username in reversed(self._last_read):
+                if self._last_read[username] < since:
+                    break
+                recent.append(username)
+        return recent
+
+
+read_activity = ReadActivity(max_users=env_int('READ_ACTIVITY_MAX_USERS', 10000))
@@ -0,0 +1,118 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import threading
+import time
+from services.config import env_float, env_int
+from services.metrics import cache_lookups
+from services.single_flight import SingleFlight
+
+
+class LRUCache:
+    """
+    Thread-safe in-process cache with least-recently-used eviction once
+    max_size entries are held, and a per-entry time to live.
+
+    Keys are tuples whose second element is the username they belong to, so
+    everything cached for a user can be dropped when that user is re-scraped.
+    Dropping a user also bumps their generation: a load that read the user's
+    data before then passes the generation it started at to set(), which
+    then doesn't cache what may be pre-scrape data.
+    """
+
+    def __init__(self, max_size: int, ttl: float, name: str = 'lru'):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Per username, how many times their entries were invalidated
+        self._generations: Dict[str, int] = {}
+        # Concurrent misses on the same key share one load
+        self.loads = SingleFlight(f"{name}_load")
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return (True, value) on a fresh hit, (False, None) otherwise"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                found = False
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                found = True
+        cache_lookups.labels(cache=self.name, result='hit' if found else 'miss').inc()
+        return (True, entry[1]) if found else (False, None)
+
+    def generation(self, username: str) -> int:
+        with self._lock:
+            return self._generations.get(username, 0)
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None):
+        """
+        Cache a value. With generation, the value is dropped if the key's user
+        has been invalidated since that generation was read.
+        """
+        with self._lock:
+            if generation is not None and self._generations.get(key[1], 0) != generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Read-through lookup: call loader on a miss and cache what it returns.
+        Callers missing on a key while its load runs wait for that load.
+        """
+        found, value = self.get(key)
+        if found:
+            return value
+
+        def load():
+            generation = self.generation(key[1]) if len(key) > 1 else None
+            loaded = loader()
+            self.set(key, loaded, generation)
+            return loaded
+
+        value, _ = self.loads.do(key, load)
+        return value
+
+    def invalidate_user(self, username: str):
+        """Drop every entry cached for a username, and any load of it in flight"""
+        with self._lock:
+            self._generations[username] = self._generations.get(username, 0) + 1
+            for key in [key for key in self._entries if len(key) > 1 and key[1] == username]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+# Library reads only change when a scrape writes the user, which invalidates them
+library_cache = LRUCache(
+    name='library',
+    max_size=env_int('LIBRARY_CACHE_SIZE', 512),
+    ttl=env_float('LIBRARY_CACHE_TTL_SECONDS', 300),
+)
@@ -0,0 +1,22 @@
+import os
+from typing import Optional
+from dotenv import load_dotenv
+
+# The one place .env is read; every module gets its settings through here
+load_dotenv()
+
+
+def env_str(name: str, default: Optional[str] = None) -> Optional[str]:
+    return os.getenv(name, default)
+
+
+def env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, str(default)))
+
+
+def env_bool(name: str, default: bool = False) -> bool:
+    return os.getenv(name, "true" if default else "false").lower() == "true"
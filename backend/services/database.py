@@ -1,37 +1,160 @@
 from supabase import create_client, Client
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.ext.declarative import declarative_base
-import os
-from dotenv import load_dotenv
+import json
+import base64
+import threading
+import uuid
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import logging
-
-load_dotenv()
+from services.cache import library_cache
+from services.config import env_int, env_str
+from services.lifecycle import LazyService
+from services.metrics import cache_lookups, supabase_requests
+from services.rss_archive import content_hash, compress_payload, decompress_payload
+from models import Base, Book, UserBook
 
 logger = logging.getLogger(__name__)
 
-Base = declarative_base()
+# Maximum number of values in a single `in` filter, which keeps the
+# PostgREST query string well under URL length limits
+GOODREADS_ID_CHUNK_SIZE = 200
+
+# Rows per request when paging through a table; PostgREST caps responses
+# at 1000 rows by default
+PAGE_SIZE = 1000
+
+# Rows fetched per request when streaming a library to a client
+STREAM_CHUNK_SIZE = 500
+
+# Archived RSS payload hashes remembered per process before the set is reset
+KNOWN_PAYLOAD_LIMIT = 10000
+
+USER_BOOK_FIELDS = frozenset(UserBook.__table__.columns.keys())
+BOOK_FIELDS = frozenset(Book.__table__.columns.keys())
+# Always selected so rows can be identified and paginated
+USER_BOOK_KEY_FIELDS = ('id', 'date_added')
+
+
+def resolve_user_book_fields(fields: Optional[List[str]] = None) -> Tuple[List[str], List[str]]:
+    """
+    Split a field projection into user_books columns and embedded book
+    columns. Plain names refer to user_books columns, falling back to the
+    book's columns; "books.<name>" always means the book column. With no
+    fields, every column of both is returned. Raises ValueError for an
+    unknown field.
+    """
+    if not fields:
+        return list(UserBook.__table__.columns.keys()), list(Book.__table__.columns.keys())
+
+    user_book_columns = list(USER_BOOK_KEY_FIELDS)
+    book_columns = []
+    for field in fields:
+        field = field.strip()
+        if field.startswith('books.') and field[len('books.'):] in BOOK_FIELDS:
+            column, columns = field[len('books.'):], book_columns
+        elif field in USER_BOOK_FIELDS:
+            column, columns = field, user_book_columns
+        elif field in BOOK_FIELDS:
+            column, columns = field, book_columns
+        else:
+            raise ValueError(f"Unknown field: {field}")
+        if column not in columns:
+            columns.append(column)
+    return user_book_columns, book_columns
+
+
+def build_user_books_select(fields: Optional[List[str]] = None) -> str:
+    """Build the PostgREST user_books select clause for a field projection"""
+    if not fields:
+        return "*, books(*)"
+
+    user_book_columns, book_columns = resolve_user_book_fields(fields)
+    select = ", ".join(user_book_columns)
+    if book_columns:
+        select += f", books({', '.join(book_columns)})"
+    return select
+
+
+def encode_cursor(row: Dict) -> str:
+    """Opaque cursor pointing just past a row in (date_added, id) descending order"""
+    payload = json.dumps([row.get('date_added'), row['id']]).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii')
+
+
+def decode_cursor(cursor: str):
+    """
+    Decode a cursor into its (date_added, id). The values end up in query
+    filters, so anything but a null or ISO timestamp date_added and a UUID id
+    raises ValueError.
+    """
+    try:
+        date_added, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        if date_added is not None:
+            if not isinstance(date_added, str):
+                raise TypeError("date_added is not a string")
+            datetime.fromisoformat(date_added)
+        if not isinstance(row_id, str):
+            raise TypeError("id is not a string")
+        return date_added, str(uuid.UUID(row_id))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def engine_options(database_url: str) -> Dict:
+    """Connection pool settings for create_engine; SQLite manages its own"""
+    if database_url.startswith('sqlite'):
+        return {}
+    return {
+        'pool_size': env_int('DATABASE_POOL_SIZE', 5),
+        'max_overflow': env_int('DATABASE_MAX_OVERFLOW', 10),
+        'pool_recycle': env_int('DATABASE_POOL_RECYCLE_SECONDS', 1800),
+        'pool_pre_ping': True,
+    }
+
+def _count_supabase_response(response):
+    # PostgREST paths end in the table name: /rest/v1/<table>
+    supabase_requests.labels(
+        method=response.request.method,
+        table=response.request.url.path.rsplit('/', 1)[-1],
+        status=str(response.status_code),
+    ).inc()
 
 class DatabaseService:
+    """Storage backend that talks to Supabase over its REST API"""
+
+    # Whether this backend needs the Supabase client
+    uses_supabase = True
+
     def __init__(self):
-        self.supabase_url = os.getenv('SUPABASE_URL')
-        self.supabase_key = os.getenv('SUPABASE_ANON_KEY')
-        self.database_url = os.getenv('DATABASE_URL')
+        self.supabase_url = env_str('SUPABASE_URL')
+        self.supabase_key = env_str('SUPABASE_ANON_KEY')
+        self.database_url = env_str('DATABASE_URL')
 
-        if not all([self.supabase_url, self.supabase_key]):
+        if not self.uses_supabase:
+            self.supabase = None
+        elif not all([self.supabase_url, self.supabase_key]):
             logger.warning("Supabase credentials not found. Database operations will be limited.")
             self.supabase = None
         else:
             self.supabase: Client = create_client(self.supabase_url, self.supabase_key)
+            self.supabase.postgrest.session.event_hooks['response'].append(_count_supabase_response)
 
         if self.database_url:
-            self.engine = create_engine(self.database_url)
+            self.engine = create_engine(self.database_url, **engine_options(self.database_url))
             self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
         else:
             logger.warning("Database URL not found. SQLAlchemy operations will be limited.")
             self.engine = None
             self.SessionLocal = None
 
+        # goodreads_id -> book id; book ids never change once assigned
+        self._book_id_cache: Dict[str, str] = {}
+        self._book_id_cache_lock = threading.Lock()
+        # Content hashes of RSS payloads known to be archived already
+        self._known_payload_hashes = set()
+
     def get_session(self) -> Session:
         if self.SessionLocal:
             return self.SessionLocal()
@@ -43,6 +166,12 @@ class DatabaseService:
         else:
             logger.warning("Cannot create tables: Database engine not configured")
 
+    def ping(self):
+        """Make one cheap round trip to the backend; raises if it isn't reachable"""
+        if not self.supabase:
+            raise RuntimeError("Supabase client not configured")
+        self.supabase.table('goodreads_users').select('id').limit(1).execute()
+
     def save_user_data(self, user_data: dict):
         try:
             if self.supabase:
@@ -56,14 +185,35 @@ class DatabaseService:
             raise
 
     def save_books(self, books: list):
+        """
+        Upsert books and return the stored rows. Books with a goodreads_id are
+        matched on it rather than on id, so concurrent scrapes inserting the
+        same new book share one row; the id they get is the stored row's, so
+        callers must take ids from the returned rows.
+        """
         try:
             if self.supabase:
-                # Use ignore_duplicates=True for conflict resolution
-                response = self.supabase.table('books').upsert(
-                    books,
-                    ignore_duplicates=False  # This will update existing records
-                ).execute()
-                return response.data
+                # Without an id the column default applies to new rows, and
+                # existing rows keep theirs
+                by_goodreads_id = list({
+                    book['goodreads_id']: {key: value for key, value in book.items() if key != 'id'}
+                    for book in books if book.get('goodreads_id')
+                }.values())
+                by_id = [book for book in books if not book.get('goodreads_id')]
+
+                saved = []
+                if by_goodreads_id:
+                    response = self.supabase.table('books').upsert(
+                        by_goodreads_id,
+                        on_conflict='goodreads_id',
+                        ignore_duplicates=False  # This will update existing records
+                    ).execute()
+                    saved.extend(response.data)
+                if by_id:
+                    response = self.supabase.table('books').upsert(by_id, ignore_duplicates=False).execute()
+                    saved.extend(response.data or by_id)
+                self._remember_book_ids(saved)
+                return saved
             else:
                 logger.warning("Supabase client not configured")
                 return None
@@ -98,10 +248,25 @@ class DatabaseService:
             logger.error(f"Error fetching user: {e}")
             raise
 
-    def get_user_books(self, user_id: str):
+    def get_user_by_goodreads_id(self, goodreads_id: str):
+        """The stored user with a numeric Goodreads user id, or None"""
+        try:
+            if self.supabase:
+                response = self.supabase.table('goodreads_users').select("*").eq('goodreads_id', goodreads_id).execute()
+                return response.data[0] if response.data else None
+            else:
+                logger.warning("Supabase client not configured")
+                return None
+        except Exception as e:
+            logger.error(f"Error fetching user: {e}")
+            raise
+
+    def get_user_books(self, user_id: str, fields: Optional[List[str]] = None):
         try:
             if self.supabase:
-                response = self.supabase.table('user_books').select("*, books(*)").eq('user_id', user_id).execute()
+                response = self.supabase.table('user_books').select(
+                    build_user_books_select(fields)
+                ).eq('user_id', user_id).execute()
                 return response.data
             else:
                 logger.warning("Supabase client not configured")
@@ -110,6 +275,73 @@ class DatabaseService:
             logger.error(f"Error fetching user books: {e}")
             raise
 
+    def get_user_books_page(
+        self,
+        user_id: str,
+        limit: int,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        status: Optional[str] = None,
+    ) -> Dict:
+        """
+        Fetch one page of a user's books, optionally on one status shelf,
+        newest date_added first (id breaks ties). The cursor is a position in that order rather than an offset,
+        so pages stay consistent while a re-scrape inserts or removes rows.
+        Returns the rows and the cursor for the next page, if any.
+        """
+        try:
+            if self.supabase:
+                query = self.supabase.table('user_books').select(
+                    build_user_books_select(fields)
+                ).eq('user_id', user_id)
+                if status:
+                    query = query.eq('status', status)
+                if cursor:
+                    query = self._after_cursor(query, cursor)
+                # Fetch one extra row to learn whether another page follows
+                response = query.order('date_added', desc=True).order('id', desc=True).limit(limit + 1).execute()
+
+                rows = response.data[:limit]
+                next_cursor = encode_cursor(rows[-1]) if len(response.data) > limit else None
+                return {'books': rows, 'next_cursor': next_cursor}
+            else:
+                logger.warning("Supabase client not configured")
+                return {'books': [], 'next_cursor': None}
+        except Exception as e:
+            logger.error(f"Error fetching user books page: {e}")
+            raise
+
+    def iter_user_books(
+        self,
+        user_id: str,
+        fields: Optional[List[str]] = None,
+        status: Optional[str] = None,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+    ) -> Iterator[Dict]:
+        """
+        Yield all of a user's books (optionally on one status shelf), fetching
+        them from the database chunk_size rows at a time.
+        """
+        cursor = None
+        while True:
+            page = self.get_user_books_page(user_id, chunk_size, cursor=cursor, fields=fields, status=status)
+            yield from page['books']
+            cursor = page['next_cursor']
+            if not cursor:
+                return
+
+    def _after_cursor(self, query, cursor: str):
+        """
+        Restrict a (date_added desc, id desc) query to rows after the cursor.
+        Postgres sorts NULL date_added first in descending order.
+        """
+        date_added, row_id = decode_cursor(cursor)
+        if date_added is None:
+            return query.or_(f'and(date_added.is.null,id.lt."{row_id}"),date_added.not.is.null')
+        return query.or_(
+            f'date_added.lt."{date_added}",and(date_added.eq."{date_added}",id.lt."{row_id}")'
+        )
+
     def get_user_books_by_status(self, user_id: str, status: str):
         try:
             if self.supabase:
@@ -122,56 +354,283 @@ class DatabaseService:
             logger.error(f"Error fetching user books by status: {e}")
             raise
 
+    def get_books_by_status(self, username: str, status: str):
+        """
+        Fetch a user's books on one status shelf in a single round trip, by
+        filtering user_books on the username of the embedded goodreads_users row.
+        Reads through the library cache; concurrent misses share one query.
+        """
+        return library_cache.get_or_load(
+            ('status', username, status), lambda: self._load_books_by_status(username, status)
+        )
+
+    def _load_books_by_status(self, username: str, status: str):
+        try:
+            if self.supabase:
+                # goodreads_users!inner() joins without returning user columns
+                response = self.supabase.table('user_books').select(
+                    "*, books(*), goodreads_users!inner()"
+                ).eq('goodreads_users.username', username).eq('status', status).execute()
+                return response.data
+            else:
+                logger.warning("Supabase client not configured")
+                return []
+        except Exception as e:
+            logger.error(f"Error fetching {status} books: {e}")
+            raise
+
     def get_currently_reading_books(self, username: str):
+        return self.get_books_by_status(username, 'currently-reading')
+
+    def get_read_books(self, username: str):
+        return self.get_books_by_status(username, 'read')
+
+    def get_book_by_goodreads_id(self, goodreads_id: str):
         try:
             if self.supabase:
-                # First get the user
-                user_response = self.supabase.table('goodreads_users').select('id').eq('username', username).execute()
-                if not user_response.data:
-                    return []
+                response = self.supabase.table('books').select("*").eq('goodreads_id', goodreads_id).execute()
+                return response.data[0] if response.data else None
+            else:
+                logger.warning("Supabase client not configured")
+                return None
+        except Exception as e:
+            logger.error(f"Error fetching book by goodreads_id: {e}")
+            raise
 
-                user_id = user_response.data[0]['id']
+    def get_book_ids_by_goodreads_ids(self, goodreads_ids: Iterable[str]) -> Dict[str, str]:
+        """
+        Resolve many goodreads_ids to existing book ids at once.
+        Ids not in the process-local cache are looked up with chunked `in`
+        queries; ids with no stored book are absent from the result.
+        """
+        resolved, missing = self._cached_book_ids(goodreads_ids)
 
-                # Get currently reading books
-                response = self.supabase.table('user_books').select("*, books(*)").eq('user_id', user_id).eq('status', 'currently-reading').execute()
-                return response.data
+        try:
+            if missing and self.supabase:
+                for start in range(0, len(missing), GOODREADS_ID_CHUNK_SIZE):
+                    chunk = missing[start:start + GOODREADS_ID_CHUNK_SIZE]
+                    response = self.supabase.table('books').select('id, goodreads_id').in_('goodreads_id', chunk).execute()
+                    self._remember_book_ids(response.data)
+                    for row in response.data:
+                        resolved[row['goodreads_id']] = row['id']
+            elif missing:
+                logger.warning("Supabase client not configured")
+            return resolved
+        except Exception as e:
+            logger.error(f"Error resolving book ids: {e}")
+            raise
+
+    def _cached_book_ids(self, goodreads_ids: Iterable[str]) -> Tuple[Dict[str, str], List[str]]:
+        """Split goodreads_ids into those with a cached book id and the (sorted) rest"""
+        wanted = {gid for gid in goodreads_ids if gid}
+        with self._book_id_cache_lock:
+            resolved = {gid: self._book_id_cache[gid] for gid in wanted if gid in self._book_id_cache}
+        missing = sorted(wanted - resolved.keys())
+        cache_lookups.labels(cache='book_id', result='hit').inc(len(resolved))
+        cache_lookups.labels(cache='book_id', result='miss').inc(len(missing))
+        return resolved, missing
+
+    def _remember_book_ids(self, rows: list):
+        with self._book_id_cache_lock:
+            for row in rows:
+                if row.get('goodreads_id') and row.get('id'):
+                    self._book_id_cache[row['goodreads_id']] = row['id']
+
+    def get_user_book_index(self, user_id: str) -> List[Dict]:
+        """
+        Fetch the compact sync state of every stored user_book for a user:
+        id, book_id, rss_guid and content_hash, paging past the row limit.
+        """
+        try:
+            if self.supabase:
+                rows = []
+                start = 0
+                while True:
+                    response = self.supabase.table('user_books').select(
+                        'id, book_id, rss_guid, content_hash'
+                    ).eq('user_id', user_id).order('id').range(start, start + PAGE_SIZE - 1).execute()
+                    rows.extend(response.data)
+                    if len(response.data) < PAGE_SIZE:
+                        return rows
+                    start += PAGE_SIZE
             else:
                 logger.warning("Supabase client not configured")
                 return []
         except Exception as e:
-            logger.error(f"Error fetching currently reading books: {e}")
+            logger.error(f"Error fetching user book index: {e}")
             raise
 
-    def get_read_books(self, username: str):
+    def get_refresh_candidates(self) -> List[Dict]:
+        """
+        List every stored user with what the refresh scheduler needs: id,
+        username, profile_url, scraped_at and the smallest feed_ttl (minutes)
+        of their stored feeds, paging past the row limit.
+        """
         try:
             if self.supabase:
-                # First get the user
-                user_response = self.supabase.table('goodreads_users').select('id').eq('username', username).execute()
-                if not user_response.data:
-                    return []
+                users = self._select_all_pages(
+                    lambda: self.supabase.table('goodreads_users').select('id, username, profile_url, scraped_at')
+                )
+                feeds = self._select_all_pages(
+                    lambda: self.supabase.table('rss_feeds').select('id, user_id, feed_ttl').not_.is_('feed_ttl', 'null')
+                )
+                ttls: Dict[str, int] = {}
+                for feed in feeds:
+                    # Stored as parsed from the feed, which may be text
+                    ttl = int(feed['feed_ttl'])
+                    ttls[feed['user_id']] = min(ttl, ttls.get(feed['user_id'], ttl))
+                return [{**user, 'feed_ttl': ttls.get(user['id'])} for user in users]
+            else:
+                logger.warning("Supabase client not configured")
+                return []
+        except Exception as e:
+            logger.error(f"Error fetching refresh candidates: {e}")
+            raise
 
-                user_id = user_response.data[0]['id']
+    def _select_all_pages(self, build_query) -> List[Dict]:
+        """Run the query built by build_query one PAGE_SIZE range at a time, in id order"""
+        rows = []
+        start = 0
+        while True:
+            response = build_query().order('id').range(start, start + PAGE_SIZE - 1).execute()
+            rows.extend(response.data)
+            if len(response.data) < PAGE_SIZE:
+                return rows
+            start += PAGE_SIZE
+
+    def delete_user_books(self, user_book_ids: List[str]):
+        """Delete user_books rows by id, in chunks"""
+        try:
+            if self.supabase:
+                for start in range(0, len(user_book_ids), GOODREADS_ID_CHUNK_SIZE):
+                    chunk = user_book_ids[start:start + GOODREADS_ID_CHUNK_SIZE]
+                    self.supabase.table('user_books').delete().in_('id', chunk).execute()
+                return True
+            else:
+                logger.warning("Supabase client not configured")
+                return False
+        except Exception as e:
+            logger.error(f"Error deleting user books: {e}")
+            raise
 
-                # Get read books
-                response = self.supabase.table('user_books').select("*, books(*)").eq('user_id', user_id).eq('status', 'read').execute()
+    def delete_rss_feeds_except(self, user_id: str, keep_ids: List[str]):
+        """Delete a user's stored RSS feeds other than the given ones"""
+        try:
+            if self.supabase:
+                query = self.supabase.table('rss_feeds').delete().eq('user_id', user_id)
+                if keep_ids:
+                    query = query.not_.in_('id', keep_ids)
+                query.execute()
+                return True
+            else:
+                logger.warning("Supabase client not configured")
+                return False
+        except Exception as e:
+            logger.error(f"Error deleting RSS feeds: {e}")
+            raise
+
+    def save_rss_payload(self, raw_content: str) -> str:
+        """
+        Archive raw RSS content compressed and keyed by its hash, storing each
+        distinct payload only once. Returns the content hash to reference it by.
+        """
+        digest = content_hash(raw_content)
+        if self._payload_known(digest):
+            return digest
+
+        try:
+            if self.supabase:
+                existing = self.supabase.table('rss_payloads').select('content_hash').eq('content_hash', digest).execute()
+                if not existing.data:
+                    self.supabase.table('rss_payloads').upsert(
+                        compress_payload(raw_content),
+                        on_conflict='content_hash',
+                        ignore_duplicates=True
+                    ).execute()
+                self._remember_payload_hash(digest)
+                return digest
+            else:
+                logger.warning("Supabase client not configured")
+                return digest
+        except Exception as e:
+            logger.error(f"Error archiving RSS payload: {e}")
+            raise
+
+    def _payload_known(self, digest: str) -> bool:
+        known = digest in self._known_payload_hashes
+        cache_lookups.labels(cache='rss_payload', result='hit' if known else 'miss').inc()
+        return known
+
+    def _remember_payload_hash(self, digest: str):
+        if len(self._known_payload_hashes) >= KNOWN_PAYLOAD_LIMIT:
+            self._known_payload_hashes.clear()
+        self._known_payload_hashes.add(digest)
+
+    def save_archived_rss_feed(self, rss_feed_data: dict, raw_content: str) -> str:
+        """
+        Archive a feed's raw content and save the feed referencing it, returning
+        the content hash. A payload remembered as archived may have been deleted
+        since (migrate_rss_archive.py --prune-orphans), failing the feed's
+        foreign key; the hash is then forgotten, the payload archived again and
+        the feed saved once more.
+        """
+        remembered = content_hash(raw_content) in self._known_payload_hashes
+        digest = self.save_rss_payload(raw_content)
+        rss_feed_data = {**rss_feed_data, 'content_hash': digest}
+        try:
+            self.save_rss_feed(rss_feed_data)
+        except Exception:
+            if not remembered:
+                raise
+            logger.warning(f"Saving RSS feed failed, archiving its payload {digest} again")
+            self._known_payload_hashes.discard(digest)
+            self.save_rss_payload(raw_content)
+            self.save_rss_feed(rss_feed_data)
+        return digest
+
+    def get_rss_feeds(self, user_id: str):
+        """List a user's stored RSS feeds without their (potentially large) content"""
+        try:
+            if self.supabase:
+                response = self.supabase.table('rss_feeds').select(
+                    'id, user_id, feed_url, feed_title, feed_description, feed_language, '
+                    'feed_last_build_date, feed_ttl, content_hash, scraped_at'
+                ).eq('user_id', user_id).execute()
                 return response.data
             else:
                 logger.warning("Supabase client not configured")
                 return []
         except Exception as e:
-            logger.error(f"Error fetching read books: {e}")
+            logger.error(f"Error fetching RSS feeds: {e}")
             raise
 
-    def get_book_by_goodreads_id(self, goodreads_id: str):
+    def get_rss_feed_content(self, feed_id: str) -> Optional[str]:
+        """Load and decompress the raw content of one stored RSS feed"""
         try:
             if self.supabase:
-                response = self.supabase.table('books').select("*").eq('goodreads_id', goodreads_id).execute()
-                return response.data[0] if response.data else None
+                feed_response = self.supabase.table('rss_feeds').select(
+                    'content_hash, raw_rss_content'
+                ).eq('id', feed_id).execute()
+                if not feed_response.data:
+                    return None
+
+                feed = feed_response.data[0]
+                if not feed.get('content_hash'):
+                    # Not yet moved to the archive
+                    return feed.get('raw_rss_content')
+
+                payload_response = self.supabase.table('rss_payloads').select(
+                    'encoding, compressed_content'
+                ).eq('content_hash', feed['content_hash']).execute()
+                if not payload_response.data:
+                    return None
+                payload = payload_response.data[0]
+                return decompress_payload(payload['encoding'], payload['compressed_content'])
             else:
                 logger.warning("Supabase client not configured")
                 return None
         except Exception as e:
-            logger.error(f"Error fetching book by goodreads_id: {e}")
+            logger.error(f"Error fetching RSS feed content: {e}")
             raise
 
     def save_rss_feed(self, rss_feed_data: dict):
@@ -221,4 +680,20 @@ class DatabaseService:
             logger.error(f"Error deleting user data: {e}")
             raise
 
-database_service = DatabaseService()
\ No newline at end of file
+
+def create_database_service() -> DatabaseService:
+    """
+    Build the storage backend selected by STORAGE_BACKEND: "supabase" (the
+    default, REST API) or "sql" (direct pooled connection to DATABASE_URL).
+    """
+    backend = env_str('STORAGE_BACKEND', 'supabase').lower()
+    if backend == 'sql':
+        from services.sql_database import SQLDatabaseService
+        return SQLDatabaseService()
+    if backend != 'supabase':
+        raise ValueError(f"Unknown STORAGE_BACKEND '{backend}' (expected 'supabase' or 'sql')")
+    return DatabaseService()
+
+
+# Built on first use; call get_database_service() (or inject it with Depends)
+get_database_service = LazyService('database', create_database_service)
@@ -0,0 +1,244 @@
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set
+import enum
+import logging
+import threading
+import uuid
+from services.config import env_int
+from services.lifecycle import LazyService
+from services.profiling import run_profiled
+from services.metrics import coalesced_calls
+from services.scraping_service import ScrapingService, get_scraping_service, profile_key
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs kept around for status lookups before the oldest are dropped
+MAX_FINISHED_JOBS = 500
+
+
+class JobState(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    RETRYING = "retrying"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class Job:
+    """A unit of background work and its progress, as reported by the job endpoints."""
+
+    def __init__(self, kind: str, params: Dict, profile_mode: Optional[str] = None):
+        self.id = str(uuid.uuid4())
+        self.kind = kind
+        self.params = params
+        # Profiler to run each attempt under, and the latest attempt's profile
+        self.profile_mode = profile_mode
+        self.profile_id: Optional[str] = None
+        self.state = JobState.QUEUED
+        self.attempts = 0
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.timings: Dict[str, float] = {}
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self.state in (JobState.SUCCEEDED, JobState.FAILED)
+
+    def to_dict(self) -> Dict:
+        return {
+            'job_id': self.id,
+            'kind': self.kind,
+            'params': self.params,
+            'state': self.state.value,
+            'attempts': self.attempts,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'timings': self.timings,
+            'result': self.result,
+            'error': self.error,
+            'profile_id': self.profile_id,
+        }
+
+
+class JobService:
+    """
+    Runs scrape jobs on a bounded thread pool, off the API event loop.
+
+    Jobs whose result is unsuccessful and marked retryable are retried with
+    exponential backoff, up to max_attempts in total. A job waiting out its
+    backoff doesn't hold a worker: its next attempt is queued when a timer
+    fires.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        retry_backoff: float = 2.0,
+        scraping_service: Optional[ScrapingService] = None,
+    ):
+        self.max_workers = max_workers or env_int('SCRAPE_WORKERS', 2)
+        self.max_attempts = max_attempts or env_int('SCRAPE_MAX_ATTEMPTS', 3)
+        self.retry_backoff = retry_backoff
+        self._scraping_service = scraping_service
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix='scrape-job'
+        )
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Unfinished scrape job per profile, so repeated requests share it
+        self._active_scrapes: Dict[str, Job] = {}
+        self._scrape_lock = threading.Lock()
+        # Timers that will queue the next attempt of jobs waiting to retry
+        self._retry_timers: Set[threading.Timer] = set()
+
+    @property
+    def scraping_service(self) -> ScrapingService:
+        # Resolved when the first job runs, not when the job service is built
+        return self._scraping_service or get_scraping_service()
+
+    def submit_scrape(
+        self,
+        profile_url: str,
+        streaming: bool = False,
+        incremental: bool = True,
+        profile_mode: Optional[str] = None,
+    ) -> Job:
+        """
+        Queue a scrape of one profile and return its job immediately. While a
+        scrape job for the same profile is queued or running, that job is
+        returned instead of queueing another.
+        """
+        key = profile_key(profile_url)
+        with self._scrape_lock:
+            self._active_scrapes = {k: job for k, job in self._active_scrapes.items() if not job.done}
+            job = self._active_scrapes.get(key)
+            if job:
+                coalesced_calls.labels(kind='scrape_job').inc()
+                logger.info(f"Scrape of {profile_url} joins job {job.id}")
+                return job
+
+            params = {'profile_url': profile_url, 'streaming': streaming, 'incremental': incremental}
+            job = self._active_scrapes[key] = self.submit(
+                'scrape',
+                params,
+                lambda: self.scraping_service.scrape_and_save_user(
+                    profile_url, streaming=streaming, incremental=incremental
+                ),
+                profile_mode=profile_mode,
+            )
+            return job
+
+    def submit_batch_scrape(
+        self,
+        profile_urls: List[str],
+        max_parallel: int = 4,
+        streaming: bool = False,
+        incremental: bool = True,
+    ) -> Job:
+        """Queue a scrape of many profiles as a single job"""
+        params = {
+            'profile_urls': profile_urls,
+            'max_parallel': max_parallel,
+            'streaming': streaming,
+            'incremental': incremental,
+        }
+        return self.submit(
+            'batch_scrape',
+            params,
+            lambda: self.scraping_service.scrape_many(
+                profile_urls, max_parallel=max_parallel, streaming=streaming, incremental=incremental
+            ),
+        )
+
+    def submit(
+        self, kind: str, params: Dict, work: Callable[[], Dict], profile_mode: Optional[str] = None
+    ) -> Job:
+        """
+        Queue work returning a result dict with at least a 'success' key.
+        With profile_mode, each attempt runs under that profiler.
+        """
+        job = Job(kind, params, profile_mode)
+        with self._lock:
+            self.jobs[job.id] = job
+            self._prune()
+        self.executor.submit(self._run, job, work)
+        logger.info(f"Queued {kind} job {job.id}")
+        return job
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def shutdown(self, wait: bool = False):
+        with self._lock:
+            timers, self._retry_timers = self._retry_timers, set()
+        for timer in timers:
+            timer.cancel()
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _run(self, job: Job, work: Callable[[], Dict]):
+        """Run one attempt of a job, scheduling the next one if it should be retried"""
+        if job.started_at is None:
+            job.started_at = datetime.utcnow()
+        job.attempts += 1
+        job.state = JobState.RUNNING
+        try:
+            if job.profile_mode:
+                result, job.profile_id = run_profiled(work, job.profile_mode, f"{job.kind} job {job.id}")
+            else:
+                result = work()
+        except Exception as e:
+            logger.error(f"Job {job.id} raised: {e}")
+            result = {'success': False, 'error': str(e), 'retryable': True}
+
+        job.result = result
+        job.timings = result.get('timings', {})
+        if result.get('success'):
+            job.error = None
+            job.finished_at = datetime.utcnow()
+            job.state = JobState.SUCCEEDED
+            return
+
+        job.error = result.get('error') or result.get('message')
+        if not result.get('retryable', True) or job.attempts >= self.max_attempts:
+            logger.error(f"Job {job.id} failed after {job.attempts} attempt(s): {job.error}")
+            job.finished_at = datetime.utcnow()
+            job.state = JobState.FAILED
+            return
+
+        delay = self.retry_backoff * 2 ** (job.attempts - 1)
+        job.state = JobState.RETRYING
+        logger.warning(f"Job {job.id} attempt {job.attempts} failed, retrying in {delay}s")
+        self._schedule_retry(job, work, delay)
+
+    def _schedule_retry(self, job: Job, work: Callable[[], Dict], delay: float):
+        def resubmit():
+            with self._lock:
+                self._retry_timers.discard(timer)
+            try:
+                self.executor.submit(self._run, job, work)
+            except RuntimeError:
+                # The pool was shut down while the job waited
+                job.finished_at = datetime.utcnow()
+                job.state = JobState.FAILED
+
+        timer = threading.Timer(delay, resubmit)
+        timer.daemon = True
+        with self._lock:
+            self._retry_timers.add(timer)
+        timer.start()
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job_id]
+
+
+get_job_service = LazyService('jobs', JobService)
@@ -0,0 +1,47 @@
+import threading
+import time
+import logging
+from typing import Callable, Dict, Generic, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Service name -> seconds its construction took, in build order
+build_timings: Dict[str, float] = {}
+
+
+class LazyService(Generic[T]):
+    """
+    A service built on first use rather than at import, so importing a
+    module (or booting a worker) doesn't open clients or connection pools.
+    Calling it returns the instance, which makes it usable directly as a
+    FastAPI dependency: Depends(get_database_service).
+    """
+
+    def __init__(self, name: str, factory: Callable[[], T]):
+        self.name = name
+        self.factory = factory
+        self._instance: Optional[T] = None
+        self._lock = threading.Lock()
+
+    def __call__(self) -> T:
+        instance = self._instance
+        if instance is not None:
+            return instance
+        with self._lock:
+            if self._instance is None:
+                started = time.perf_counter()
+                self._instance = self.factory()
+                build_timings[self.name] = round(time.perf_counter() - started, 4)
+                logger.info(f"Initialized {self.name} service in {build_timings[self.name]:.3f}s")
+            return self._instance
+
+    @property
+    def initialized(self) -> bool:
+        return self._instance is not None
+
+    def set(self, instance: Optional[T]):
+        """Use the given instance instead of building one; None drops the current one"""
+        with self._lock:
+            self._instance = instance
@@ -0,0 +1,87 @@
+from urllib.parse import urlsplit
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest
+
+# Upper bounds, in seconds, of the latency histogram buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+# The app's own metrics, kept apart from prometheus_client's default
+# process and platform collectors
+registry = CollectorRegistry()
+
+
+def render() -> bytes:
+    """Every metric in the Prometheus text exposition format"""
+    return generate_latest(registry)
+
+
+http_request_duration = Histogram(
+    "cozybookshelf_http_request_duration_seconds",
+    "API request latency by route template",
+    ("method", "route", "status"),
+    buckets=DEFAULT_BUCKETS,
+    registry=registry,
+)
+scrape_duration = Histogram(
+    "cozybookshelf_scrape_duration_seconds",
+    "Time to scrape and save one profile",
+    ("outcome",),
+    buckets=DEFAULT_BUCKETS,
+    registry=registry,
+)
+scrape_stage_duration = Histogram(
+    "cozybookshelf_scrape_stage_duration_seconds",
+    "Time spent in each stage of a scrape, per occurrence",
+    ("stage",),
+    buckets=DEFAULT_BUCKETS,
+    registry=registry,
+)
+upstream_requests = Counter(
+    "cozybookshelf_upstream_requests_total",
+    "Requests made to Goodreads, by host and response status",
+    ("host", "status"),
+    registry=registry,
+)
+upstream_bytes = Counter(
+    "cozybookshelf_upstream_bytes_total",
+    "Response body bytes fetched from Goodreads",
+    ("host",),
+    registry=registry,
+)
+supabase_requests = Counter(
+    "cozybookshelf_supabase_requests_total",
+    "Supabase REST calls, by method, table and response status",
+    ("method", "table", "status"),
+    registry=registry,
+)
+sql_statements = Counter(
+    "cozybookshelf_sql_statements_total",
+    "Statements executed by the sql storage backend, by verb",
+    ("verb",),
+    registry=registry,
+)
+coalesced_calls = Counter(
+    "cozybookshelf_coalesced_calls_total",
+    "Calls that shared another caller's in-flight scrape or load instead of running their own, by kind",
+    ("kind",),
+    registry=registry,
+)
+scheduled_refreshes = Counter(
+    "cozybookshelf_scheduled_refreshes_total",
+    "Library refreshes run by the refresh scheduler, by outcome",
+    ("outcome",),
+    registry=registry,
+)
+cache_lookups = Counter(
+    "cozybookshelf_cache_lookups_total",
+    "Lookups in the in-process caches, by cache and hit or miss",
+    ("cache", "result"),
+    registry=registry,
+)
+
+
+def record_upstream_response(url: str, status_code: int, body_bytes: int):
+    host = urlsplit(url).netloc
+    upstream_requests.labels(host=host, status=str(status_code)).inc()
+    upstream_bytes.labels(host=host).inc(body_bytes)
@@ -0,0 +1,221 @@
+import cProfile
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+import logging
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+from services.config import env_int, env_str
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# "cprofile" traces every call and is saved as pstats; "sample" records the
+# profiled thread's stack every SAMPLE_INTERVAL and is saved for speedscope
+PROFILE_MODES = ("cprofile", "sample")
+PROFILE_FILES = {"cprofile": "pstats", "sample": "speedscope.json"}
+
+PROFILE_DIR = env_str("PROFILE_DIR") or os.path.join(tempfile.gettempdir(), "cozybookshelf-profiles")
+# Oldest profiles are deleted once more than this many are stored
+MAX_STORED_PROFILES = env_int("PROFILE_MAX_STORED", 50)
+SAMPLE_INTERVAL = 0.001
+
+
+
+def parse_profile_mode(value: Optional[str]) -> Optional[str]:
+    """Mode named by a profiling flag: a mode name, or any other true-ish value for cprofile"""
+    if not value:
+        return None
+    value = value.strip().lower()
+    if value in PROFILE_MODES:
+        return value
+    if value in ("0", "false", "no", "off"):
+        return None
+    return "cprofile"
+
+
+class SamplingProfiler:
+    """
+    Records one thread's Python stack from a background thread at a fixed
+    interval. The profiled code runs unmodified; resolution is bounded by the
+    interpreter's switch interval (5ms by default).
+    """
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: List[Tuple[Tuple[str, str, int], ...]] = []
+        self.weights: List[float] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            if frame is None:
+                return
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            stack.reverse()
+            self.samples.append(tuple(stack))
+            self.weights.append(now - last)
+            last = now
+
+    def speedscope(self, name: str) -> Dict:
+        """The samples in speedscope's file format (https://www.speedscope.app)"""
+        frames: List[Dict] = []
+        frame_index: Dict[Tuple[str, str, int], int] = {}
+        samples = []
+        for stack in self.samples:
+            indexes = []
+            for frame in stack:
+                index = frame_index.get(frame)
+                if index is None:
+                    index = frame_index[frame] = len(frames)
+                    frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                indexes.append(index)
+            samples.append(indexes)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "cozybookshelf",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(self.weights),
+                "samples": samples,
+                "weights": self.weights,
+            }],
+        }
+
+
+def profile_path(profile_id: str, mode: str) -> str:
+    return os.path.join(PROFILE_DIR, f"{profile_id}.{PROFILE_FILES[mode]}")
+
+
+def find_profile(profile_id: str) -> Optional[Tuple[str, str]]:
+    """(mode, path) of a stored profile, or None"""
+    try:
+        profile_id = uuid.UUID(hex=profile_id).hex
+    except ValueError:
+        return None
+    for mode in PROFILE_MODES:
+        path = profile_path(profile_id, mode)
+        if os.path.exists(path):
+            return mode, path
+    return None
+
+
+def _prune_profiles():
+    try:
+        paths = [os.path.join(PROFILE_DIR, name) for name in os.listdir(PROFILE_DIR)]
+    except FileNotFoundError:
+        return
+    paths.sort(key=os.path.getmtime)
+    for path in paths[:max(0, len(paths) - MAX_STORED_PROFILES)]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _store_profile(profiler, mode: str, path: str, name: str):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    if mode == "sample":
+        with open(path, "w") as f:
+            json.dump(profiler.speedscope(name), f)
+    else:
+        profiler.dump_stats(path)
+    _prune_profiles()
+
+
+class RunningProfile:
+    """A started profiler and the id its result will be stored under"""
+
+    def __init__(self, mode: str, name: str, profiler):
+        self.mode = mode
+        self.name = name
+        self.profiler = profiler
+        self.id = uuid.uuid4().hex
+
+    def stop(self):
+        if self.mode == "sample":
+            self.profiler.stop()
+        else:
+            self.profiler.disable()
+
+    def store(self):
+        """Write the stopped profile to PROFILE_DIR; blocking file I/O"""
+        path = profile_path(self.id, self.mode)
+        try:
+            _store_profile(self.profiler, self.mode, path, self.name)
+            logger.info(f"Stored {self.mode} profile of {self.name}: {path}")
+        except Exception as e:
+            logger.error(f"Error storing profile of {self.name}: {e}")
+
+
+def start_profile(mode: str, name: str) -> Optional[RunningProfile]:
+    """
+    Start profiling the current thread, or return None if the profiler could
+    not start (from Python 3.12 only one cProfile can run per process).
+    """
+    if mode == "sample":
+        profiler = SamplingProfiler(threading.get_ident())
+        profiler.start()
+    else:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:
+            logger.warning(f"Profile of {name} skipped: {e}")
+            return None
+    return RunningProfile(mode, name, profiler)
+
+
+@contextmanager
+def profiled(mode: str, name: str) -> Iterator[Dict]:
+    """
+    Profile the current thread for the duration of the block and store the
+    result on exit, also when the block raises. The yielded dict holds the
+    id the profile will be stored under, or is empty if the profiler could
+    not start.
+    """
+    info: Dict[str, str] = {}
+    profile = start_profile(mode, name)
+    if profile is None:
+        yield info
+        return
+
+    info["profile_id"] = profile.id
+    try:
+        yield info
+    finally:
+        profile.stop()
+        profile.store()
+
+
+def run_profiled(work: Callable[[], T], mode: str, name: str) -> Tuple[T, Optional[str]]:
+    """Call work under the profiler; returns its result and the stored profile's id"""
+    with profiled(mode, name) as info:
+        result = work()
+    return result, info.get("profile_id")
@@ -0,0 +1,75 @@
+from typing import Callable, Dict
+from urllib.parse import urlsplit
+import asyncio
+import threading
+import time
+from services.config import env_float
+
+
+class TokenBucket:
+    """
+    Token bucket allowing `rate` requests per second with bursts of up to
+    `capacity`. Callers reserve a token and then wait out any deficit, so
+    concurrent callers are served in arrival order without busy-waiting.
+    clock is the monotonic time source refills are measured with.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1) -> float:
+        """Take tokens from the bucket and return how long to wait before using them"""
+        with self._lock:
+            now = self.clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= tokens
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def acquire(self, tokens: float = 1):
+        delay = self.reserve(tokens)
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self, tokens: float = 1):
+        delay = self.reserve(tokens)
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class HostRateLimiter:
+    """One token bucket per upstream host, shared by every scraper in the process."""
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket_for(self, url: str) -> TokenBucket:
+        host = urlsplit(url).netloc
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.rate, self.capacity, self.clock)
+            return bucket
+
+    def acquire(self, url: str):
+        self.bucket_for(url).acquire()
+
+    async def acquire_async(self, url: str):
+        await self.bucket_for(url).acquire_async()
+
+
+rate_limiter = HostRateLimiter(
+    rate=env_float('UPSTREAM_REQUESTS_PER_SECOND', 2),
+    capacity=env_float('UPSTREAM_REQUEST_BURST', 5),
+)
@@ -0,0 +1,267 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+import heapq
+import logging
+import random
+import threading
+import time
+from services.activity import read_activity
+from services.config import env_bool, env_float
+from services.database import DatabaseService
+from services.lifecycle import LazyService
+from services.metrics import scheduled_refreshes
+from services.rate_limiter import TokenBucket
+from services.scraping_service import ScrapingService, get_scraping_service
+
+logger = logging.getLogger(__name__)
+
+# Off unless enabled: refreshes scrape Goodreads, within a budget that is per process
+REFRESH_ENABLED = env_bool('REFRESH_ENABLED', False)
+
+# Longest the scheduler sleeps before checking for newly read users
+POLL_SECONDS = 30.0
+
+
+class RefreshEntry:
+    """One user's place in the refresh queue"""
+
+    def __init__(
+        self, username: str, profile_url: str, scraped_at: Optional[float], feed_ttl: Optional[int],
+        not_before: float = 0.0
+    ):
+        self.username = username
+        self.profile_url = profile_url
+        # Unix time of the last successful scrape, None if never scraped
+        self.scraped_at = scraped_at
+        # Smallest TTL, in minutes, of the user's stored feeds
+        self.feed_ttl = feed_ttl
+        # Not refreshed again before this time, after a failed refresh
+        self.not_before = not_before
+        # Fraction of the interval added to the due time, drawn once per scheduling
+        self.jitter = 0.0
+        self.due = 0.0
+
+
+def _timestamp(value) -> Optional[float]:
+    """Unix time of a stored timestamp; naive values are UTC, as they are written"""
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class RefreshScheduler:
+    """
+    Re-scrapes stored users in the background, most overdue first.
+
+    A user is due once their last scrape is older than their refresh
+    interval: active_interval for users whose library was read within
+    active_window, idle_interval for everyone else, and never less than the
+    TTL their feed advertises. Each due time is pushed back by a random
+    fraction (jitter) of the interval, so users scraped together don't come
+    due together. Reads move a user forward in the queue straight away.
+
+    Refreshes run one at a time on the scheduler's thread and draw from a
+    budget of budget_per_hour, so load on Goodreads and the database stays
+    flat however many users come due at once. The budget is per process:
+    every API instance runs its own scheduler over the same users, so N
+    instances make up to N times budget_per_hour refreshes between them.
+    Refreshes are conditional requests, so an unchanged feed costs one page
+    fetch and no writes. The user list is reloaded from the database every
+    reload_interval to pick up new and manually scraped users.
+    """
+
+    def __init__(
+        self,
+        scraping_service: Optional[ScrapingService] = None,
+        db: Optional[DatabaseService] = None,
+        budget_per_hour: Optional[float] = None,
+        active_interval: Optional[float] = None,
+        idle_interval: Optional[float] = None,
+        active_window: Optional[float] = None,
+        jitter: Optional[float] = None,
+        reload_interval: Optional[float] = None,
+    ):
+        self._scraping_service = scraping_service
+        self._db = db
+        self.budget_per_hour = budget_per_hour or env_float('REFRESH_BUDGET_PER_HOUR', 60)
+        self.active_interval = active_interval or env_float('REFRESH_ACTIVE_INTERVAL_SECONDS', 3600)
+        self.idle_interval = idle_interval or env_float('REFRESH_IDLE_INTERVAL_SECONDS', 86400)
+        self.active_window = active_window or env_float('REFRESH_ACTIVE_WINDOW_SECONDS', 86400)
+        self.jitter = jitter if jitter is not None else env_float('REFRESH_JITTER', 0.1)
+        self.reload_interval = reload_interval or env_float('REFRESH_RELOAD_SECONDS', 900)
+        # One refresh at a time, spaced evenly at the budgeted rate
+        self.budget = TokenBucket(rate=self.budget_per_hour / 3600, capacity=1)
+
+        self.entries: Dict[str, RefreshEntry] = {}
+        self._queue: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._next_reload = 0.0
+        self._activity_checked = time.time()
+        self.refreshes = 0
+        self.failures = 0
+
+    @property
+    def scraping_service(self) -> ScrapingService:
+        return self._scraping_service or get_scraping_service()
+
+    @property
+    def db(self) -> DatabaseService:
+        return self._db or self.scraping_service.db
+
+    def start(self):
+        if self._thread:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='refresh-scheduler', daemon=True)
+        self._thread.start()
+        logger.info(f"Refresh scheduler started, budget {self.budget_per_hour:g} refreshes/hour")
+
+    def stop(self, timeout: float = 5.0):
+        """Stop scheduling; a refresh in progress is left to finish on its own"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def reload(self):
+        """Rebuild the queue from the users stored in the database"""
+        candidates = self.db.get_refresh_candidates()
+        now = time.time()
+        with self._lock:
+            previous = self.entries
+            self.entries = {}
+            for candidate in candidates:
+                scraped_at = _timestamp(candidate.get('scraped_at'))
+                known = previous.get(candidate['username'])
+                if known and known.scraped_at and (scraped_at is None or known.scraped_at > scraped_at):
+                    # Refreshes that found the feed unchanged don't write scraped_at
+                    scraped_at = known.scraped_at
+                self.entries[candidate['username']] = RefreshEntry(
+                    username=candidate['username'],
+                    profile_url=candidate['profile_url'],
+                    scraped_at=scraped_at,
+                    feed_ttl=int(candidate['feed_ttl']) if candidate.get('feed_ttl') is not None else None,
+                    not_before=known.not_before if known else 0.0,
+                )
+            self._queue = []
+            for entry in self.entries.values():
+                self._schedule(entry, now)
+        self._next_reload = now + self.reload_interval
+        logger.info(f"Refresh queue reloaded with {len(self.entries)} users")
+
+    def interval(self, entry: RefreshEntry, now: float) -> float:
+        last_read = read_activity.last_read(entry.username)
+        active = last_read is not None and now - last_read <= self.active_window
+        interval = self.active_interval if active else self.idle_interval
+        return max(interval, (entry.feed_ttl or 0) * 60)
+
+    def _due(self, entry: RefreshEntry, now: float) -> float:
+        interval = self.interval(entry, now)
+        return max((entry.scraped_at or 0.0) + interval * (1 + entry.jitter), entry.not_before)
+
+    def _schedule(self, entry: RefreshEntry, now: float):
+        """Compute the entry's due time and queue it. Call with the lock held."""
+        entry.jitter = random.uniform(0, self.jitter)
+        entry.due = self._due(entry, now)
+        heapq.heappush(self._queue, (entry.due, entry.username))
+
+    def _promote_read_users(self, now: float):
+        """Bring forward users read since the last check, now that they count as active"""
+        recent = read_activity.read_since(self._activity_checked)
+        self._activity_checked = now
+        with self._lock:
+            for username in recent:
+                entry = self.entries.get(username)
+                if entry is None:
+                    continue
+                due = self._due(entry, now)
+                if due < entry.due:
+                    entry.due = due
+                    heapq.heappush(self._queue, (due, username))
+
+    def _pop_due(self, now: float) -> Tuple[Optional[RefreshEntry], Optional[float]]:
+        """The most overdue entry, or None and when the next one comes due"""
+        with self._lock:
+            while self._queue:
+                due, username = self._queue[0]
+                entry = self.entries.get(username)
+                if entry is None or entry.due != due:
+                    # Superseded by a reload or a promotion
+                    heapq.heappop(self._queue)
+                    continue
+                if due > now:
+                    return None, due
+                heapq.heappop(self._queue)
+                return entry, None
+            return None, None
+
+    def _run(self):
+        # Instances started together don't all reload and refresh at once
+        if self._stop.wait(random.uniform(0, POLL_SECONDS)):
+            return
+        while not self._stop.is_set():
+            now = time.time()
+            if now >= self._next_reload:
+                try:
+                    self.reload()
+                except Exception as e:
+                    logger.error(f"Error reloading refresh queue: {e}")
+                    self._next_reload = now + self.reload_interval
+            self._promote_read_users(now)
+
+            entry, next_due = self._pop_due(now)
+            if entry is None:
+                wake = min(next_due or float('inf'), self._next_reload, now + POLL_SECONDS)
+                self._stop.wait(max(0.0, wake - now))
+                continue
+
+            if self._stop.wait(self.budget.reserve()):
+                return
+            self._refresh(entry)
+
+    def _refresh(self, entry: RefreshEntry):
+        overdue = time.time() - entry.due
+        logger.info(f"Refreshing {entry.username} ({overdue:.0f}s overdue)")
+        try:
+            result = self.scraping_service.scrape_and_save_user(entry.profile_url, streaming=True)
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+
+        now = time.time()
+        with self._lock:
+            if result.get('success'):
+                outcome = 'not_modified' if result.get('books_count') is None else 'success'
+                entry.scraped_at = now
+                self.refreshes += 1
+            else:
+                outcome = 'failure'
+                # Try again after an active interval rather than on the next wake-up
+                entry.not_before = now + self.active_interval
+                self.failures += 1
+                logger.warning(f"Refresh of {entry.username} failed: {result.get('error')}")
+            if self.entries.get(entry.username) is entry:
+                self._schedule(entry, now)
+        scheduled_refreshes.labels(outcome=outcome).inc()
+
+    def stats(self) -> Dict:
+        now = time.time()
+        with self._lock:
+            dues = [entry.due for entry in self.entries.values()]
+        return {
+            'running': self._thread is not None,
+            'users': len(dues),
+            'overdue': sum(1 for due in dues if due <= now),
+            'next_due_seconds': round(max(0.0, min(dues) - now), 1) if dues else None,
+            'budget_per_hour': self.budget_per_hour,
+            'refreshes': self.refreshes,
+            'failures': self.failures,
+        }
+
+
+get_refresh_scheduler = LazyService('refresh', RefreshScheduler)
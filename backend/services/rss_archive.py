@@ -0,0 +1,34 @@
+from typing import Dict
+import base64
+import gzip
+import hashlib
+
+# New payloads are written with this encoding; readers dispatch on the
+# encoding stored with each payload
+DEFAULT_ENCODING = "gzip"
+
+
+def content_hash(raw_content: str) -> str:
+    """Address of a raw feed: sha256 of its UTF-8 bytes"""
+    return hashlib.sha256(raw_content.encode('utf-8')).hexdigest()
+
+
+def compress_payload(raw_content: str) -> Dict:
+    """Build the rss_payloads record for a raw feed"""
+    raw_bytes = raw_content.encode('utf-8')
+    compressed = gzip.compress(raw_bytes, compresslevel=6)
+    return {
+        'content_hash': hashlib.sha256(raw_bytes).hexdigest(),
+        'encoding': DEFAULT_ENCODING,
+        # Supabase's REST API carries JSON, so binary data is stored as base64 text
+        'compressed_content': base64.b64encode(compressed).decode('ascii'),
+        'raw_size': len(raw_bytes),
+        'compressed_size': len(compressed),
+    }
+
+
+def decompress_payload(encoding: str, compressed_content: str) -> str:
+    compressed = base64.b64decode(compressed_content)
+    if encoding == "gzip":
+        return gzip.decompress(compressed).decode('utf-8')
+    raise ValueError(f"Unsupported RSS payload encoding: {encoding}")
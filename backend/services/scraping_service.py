@@ -1,29 +1,145 @@
-from scrapers.goodreads_rss_scraper import GoodreadsRSSScraper
-from services.database import database_service
+from scrapers.goodreads_rss_scraper import GoodreadsRSSScraper, PROFILE_USER_ID_RE, RSS_BASE_URL
+from scrapers.async_goodreads_scraper import AsyncScraperThread
+from scrapers.scraped_book import ScrapedBook
+from services.database import DatabaseService, get_database_service
+from services.config import env_str
+from services.lifecycle import LazyService
+from services.timing import StageTimer
+from services.metrics import scrape_duration, scrape_stage_duration
+from services.cache import library_cache
+from services.activity import read_activity
+from services.single_flight import SingleFlight
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, closing
 import uuid
-from typing import Dict
+from typing import Callable, Dict, List, Optional
 import logging
 from datetime import datetime
-import time
-import xml.etree.ElementTree as ET
 
 logger = logging.getLogger(__name__)
 
+
+def profile_key(profile_url: str) -> str:
+    """Identify a profile by its Goodreads user id, whatever the URL's slug or host"""
+    match = PROFILE_USER_ID_RE.search(profile_url)
+    return match.group(1) if match else profile_url
+
+
 class ScrapingService:
-    def __init__(self):
-        self.db = database_service
+    def __init__(
+        self,
+        db: Optional[DatabaseService] = None,
+        base_url: str = RSS_BASE_URL,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        self.db = db if db is not None else get_database_service()
+        # Where RSS feeds are fetched from; profiles come from the URL given
+        self.base_url = base_url
+        # Times batch scrapes for their throughput summary
+        self.clock = clock
+        # "sync" fetches the profile and then each feed page in sequence;
+        # "async" fetches the profile and first page together, and the
+        # following pages concurrently, ahead of saving them
+        self.scraper_engine = env_str('SCRAPER_ENGINE', 'sync').lower()
+        self._scrapes = SingleFlight('scrape')
+
+    def scrape_and_save_user(
+        self, profile_url: str, streaming: bool = False, incremental: bool = True
+    ) -> Dict:
+        """
+        Scrape a Goodreads profile and save it under the user's stable id.
 
-    def scrape_and_save_user(self, profile_url: str) -> Dict:
+        Concurrent scrapes of the same profile share one scrape: callers
+        arriving while it runs wait for it and get a copy of its result marked
+        coalesced, whatever options they passed.
+
+        With incremental (the default), stored user_books are diffed against the
+        feed by rss_guid and content hash, and only inserted, changed and removed
+        rows are written. Otherwise all of the user's data is deleted and
+        reinserted.
+
+        Each page of the RSS feed is persisted as soon as it is fetched, so the
+        library is never held in memory as a whole. The sync engine fetches
+        the next page once one is saved; the async engine
+        (SCRAPER_ENGINE=async) keeps several following pages downloading while
+        one is saved. Streaming scrapes always use the sync engine, which holds
+        the fewest pages at a time. Either way, when the last scrape found the
+        whole feed on its first page, that page is requested conditionally on
+        the last scrape's validators, and nothing more is fetched or written
+        when it is unchanged. Feeds of several pages are always walked in
+        full, since a change may be confined to a later page; the diff then
+        keeps the writes to what changed.
+        """
+        result, shared = self._scrapes.do(
+            profile_key(profile_url),
+            lambda: self._scrape_and_save_user(profile_url, streaming=streaming, incremental=incremental),
+        )
+        if shared:
+            return {**result, 'coalesced': True}
+        return result
+
+    def _scrape_and_save_user(self, profile_url: str, streaming: bool, incremental: bool) -> Dict:
+        timer = StageTimer(histogram=scrape_stage_duration)
+        started = time.perf_counter()
+        outcome = 'failure'
+        username = None
+        # Usernames whose cached reads a write to this user makes stale
+        cached_usernames = set()
+        resources = ExitStack()
         try:
-            scraper = GoodreadsRSSScraper()
+            scraper = GoodreadsRSSScraper(timer=timer, base_url=self.base_url)
 
             logger.info(f"Starting scrape for profile: {profile_url}")
-            user_data = scraper.scrape_full_user_data(profile_url)
+            # Only the first page is requested conditionally; the rest are fetched as they are saved
+            if self.scraper_engine == 'async' and not streaming:
+                # The feed validators are held by scraper until the scrape is saved
+                pages = resources.enter_context(
+                    AsyncScraperThread(timer=timer, base_url=self.base_url, parser=scraper)
+                )
+                user_data, first_page = pages.scrape_profile_and_first_page(profile_url)
+            else:
+                pages = scraper
+                user_data = scraper.scrape_user_profile_basic(profile_url)
+                if not user_data.get("user_id"):
+                    raise ValueError("Could not extract user ID from profile URL")
+                first_page = scraper.fetch_rss_page(user_data['user_id'], use_cache=True)
+                user_data['not_modified'] = first_page is None
+
+            username = user_data.get('username')
+            cached_usernames.add(username)
+            # Users are identified by their numeric Goodreads id, which unlike
+            # the URL slug is the same whichever way the profile was reached
+            with timer.stage('resolve_user'):
+                existing_user = self.db.get_user_by_goodreads_id(user_data['user_id'])
+            if existing_user:
+                cached_usernames.add(existing_user['username'])
+                if username == user_data['user_id']:
+                    # No name from the URL or the profile page; keep the stored one
+                    username = existing_user['username']
+
+            if user_data.get('not_modified'):
+                if existing_user:
+                    logger.info(f"RSS feed unchanged for {username}, skipping save")
+                    outcome = 'not_modified'
+                    return {
+                        'success': True,
+                        'user_id': existing_user['id'],
+                        'username': username,
+                        'books_count': None,
+                        'changes': {'inserted': 0, 'updated': 0, 'deleted': 0},
+                        'timings': timer.as_dict(),
+                        'message': f"No changes since last scrape for {username}"
+                    }
+                # Validators are cached but the stored data is gone, so fetch it again in full
+                first_page = pages.fetch_rss_page(user_data['user_id'])
 
-            user_id = uuid.uuid4()
+            # Keep the user's id stable across re-scrapes
+            user_id = existing_user['id'] if existing_user else str(uuid.uuid4())
             user_record = {
-                'id': str(user_id),
-                'username': user_data.get('username'),
+                'id': user_id,
+                'goodreads_id': user_data['user_id'],
+                'username': username,
                 'profile_url': profile_url,
                 'name': user_data.get('name'),
                 'location': user_data.get('location'),
@@ -35,117 +151,62 @@ class ScrapingService:
                 'scraped_at': datetime.utcnow().isoformat()
             }
 
-            # First, delete all existing data for this user to ensure fresh data
-            self.db.delete_user_data_by_username(user_data.get('username'))
-            logger.info(f"Cleared existing data for user {user_data.get('username')}")
-
-            # Small delay to ensure deletion is committed
-            time.sleep(0.5)
-
-            # Save fresh user data using upsert to handle any race conditions
-            self.db.save_user_data(user_record)
-            logger.info(f"Saved user data for {user_data.get('username')}")
-
-            # Save raw RSS feed data if available
-            if user_data.get('raw_rss_data'):
-                rss_feed_record = {
-                    'id': str(uuid.uuid4()),
-                    'user_id': str(user_id),
-                    'feed_url': user_data.get('rss_feed_url'),
-                    'feed_title': user_data.get('feed_title'),
-                    'feed_description': user_data.get('feed_description'),
-                    'feed_language': user_data.get('feed_language'),
-                    'feed_last_build_date': user_data.get('feed_last_build_date'),
-                    'feed_ttl': user_data.get('feed_ttl'),
-                    'raw_rss_content': user_data.get('raw_rss_data'),
-                    'scraped_at': datetime.utcnow().isoformat()
-                }
-                self.db.save_rss_feed(rss_feed_record)
-                logger.info(f"Saved raw RSS feed data for user")
-
-            books = user_data.get('books', [])
-            if books:
-                book_records = []
-                user_book_records = []
-
-                for book in books:
-                    goodreads_id = book.get('goodreads_id')
-
-                    # Check if book already exists
-                    existing_book = self.db.get_book_by_goodreads_id(goodreads_id)
-
-                    if existing_book:
-                        # Use existing book ID
-                        book_id = existing_book['id']
-                        # Update existing book record with any new data
-                        book_record = {
-                            'id': book_id,
-                            'goodreads_id': goodreads_id,
-                            'title': book.get('title'),
-                            'author': book.get('author'),
-                            'isbn': book.get('isbn'),
-                            'isbn13': book.get('isbn13'),
-                            'average_rating': book.get('average_rating'),
-                            'ratings_count': book.get('ratings_count', 0),
-                            'publication_year': book.get('publication_year'),
-                            'pages': book.get('pages'),
-                            'description': book.get('description'),
-                            'image_url': book.get('image_url'),
-                            'small_image_url': book.get('small_image_url'),
-                            'medium_image_url': book.get('medium_image_url'),
-                            'large_image_url': book.get('large_image_url')
-                        }
-                    else:
-                        # Create new book record
-                        book_id = str(uuid.uuid4())
-                        book_record = {
-                            'id': book_id,
-                            'goodreads_id': goodreads_id,
-                            'title': book.get('title'),
-                            'author': book.get('author'),
-                            'isbn': book.get('isbn'),
-                            'isbn13': book.get('isbn13'),
-                            'average_rating': book.get('average_rating'),
-                            'ratings_count': book.get('ratings_count', 0),
-                            'publication_year': book.get('publication_year'),
-                            'pages': book.get('pages'),
-                            'description': book.get('description'),
-                            'image_url': book.get('image_url'),
-                            'small_image_url': book.get('small_image_url'),
-                            'medium_image_url': book.get('medium_image_url'),
-                            'large_image_url': book.get('large_image_url')
-                        }
-
-                    book_records.append(book_record)
-
-                    user_book_record = {
-                        'id': str(uuid.uuid4()),
-                        'user_id': str(user_id),
-                        'book_id': str(book_id),
-                        'status': book.get('status', 'read'),
-                        'rating': book.get('user_rating'),
-                        'review': book.get('review'),
-                        'review_url': book.get('review_url'),
-                        'rss_guid': book.get('rss_guid'),
-                        'date_added': book.get('date_added'),
-                        'date_created': book.get('date_created'),
-                        'date_started': book.get('date_started'),
-                        'date_finished': book.get('date_finished'),
-                        'shelves': ','.join(book.get('shelves', [])) if book.get('shelves') else None,
-                        'pub_date': book.get('pub_date')
-                    }
-                    user_book_records.append(user_book_record)
+            stored_index = {}
+            if existing_user and incremental:
+                with timer.stage('resolve_user'):
+                    for row in self.db.get_user_book_index(user_id):
+                        stored_index[self._sync_key(row.get('rss_guid'), row['book_id'])] = row
+            elif existing_user:
+                with timer.stage('delete_user_data'):
+                    self.db.delete_user_data_by_username(existing_user['username'])
+                logger.info(f"Cleared existing data for user {username}")
 
-                self.db.save_books(book_records)
-                self.db.save_user_books(user_book_records)
-                logger.info(f"Saved {len(book_records)} books for user")
+            with timer.stage('save_user'):
+                self.db.save_user_data(user_record)
+            logger.info(f"Saved user data for {username}")
+
+            batches = resources.enter_context(closing(pages.iter_rss_pages(first_page, user_data['user_id'])))
+            books_count = 0
+            seen_keys = set()
+            saved_feed_ids = []
+            changes = {'inserted': 0, 'updated': 0, 'deleted': 0}
+            for batch in batches:
+                with timer.stage('save_rss_feed'):
+                    feed_id = self._save_rss_feed(user_id, batch['rss_metadata'])
+                if feed_id:
+                    saved_feed_ids.append(feed_id)
+                batch_changes = self._save_book_batch(
+                    user_id, batch['books'], stored_index, seen_keys, timer
+                )
+                for key, count in batch_changes.items():
+                    changes[key] += count
+                books_count += len(batch['books'])
+
+            if existing_user and incremental:
+                removed_ids = [row['id'] for key, row in stored_index.items() if key not in seen_keys]
+                if removed_ids:
+                    with timer.stage('delete_user_books'):
+                        self.db.delete_user_books(removed_ids)
+                changes['deleted'] = len(removed_ids)
+                # Only the latest copy of the feed is kept per user
+                with timer.stage('save_rss_feed'):
+                    self.db.delete_rss_feeds_except(user_id, saved_feed_ids)
+
+            scraper.commit_feed_validators()
+            logger.info(
+                f"Synced {username}: {changes['inserted']} inserted, "
+                f"{changes['updated']} updated, {changes['deleted']} deleted"
+            )
 
+            outcome = 'success'
             return {
                 'success': True,
-                'user_id': str(user_id),
-                'username': user_data.get('username'),
-                'books_count': len(books),
-                'message': f"Successfully scraped and saved data for {user_data.get('username')}"
+                'user_id': user_id,
+                'username': username,
+                'books_count': books_count,
+                'changes': changes,
+                'timings': timer.as_dict(),
+                'message': f"Successfully scraped and saved data for {username}"
             }
 
         except Exception as e:
@@ -153,27 +214,256 @@ class ScrapingService:
             return {
                 'success': False,
                 'error': str(e),
+                # A bad profile URL will fail the same way every time
+                'retryable': not isinstance(e, ValueError),
+                'timings': timer.as_dict(),
                 'message': 'Failed to scrape user data'
             }
+        finally:
+            resources.close()
+            scrape_duration.labels(outcome=outcome).observe(time.perf_counter() - started)
+            # Cached reads of this user are stale once anything may have been written
+            for cached_username in cached_usernames:
+                library_cache.invalidate_user(cached_username)
+
+    def scrape_many(
+        self,
+        profile_urls: List[str],
+        max_parallel: int = 4,
+        streaming: bool = False,
+        incremental: bool = True,
+    ) -> Dict:
+        """
+        Scrape several profiles with at most max_parallel scrapes in flight.
+        Upstream requests are throttled per host by the shared rate limiter.
+        Returns each profile's result plus aggregate throughput.
+        """
+        def scrape_one(profile_url: str) -> Dict:
+            start = self.clock()
+            result = self.scrape_and_save_user(
+                profile_url, streaming=streaming, incremental=incremental
+            )
+            result['profile_url'] = profile_url
+            result['elapsed_seconds'] = round(self.clock() - start, 4)
+            return result
+
+        start = self.clock()
+        with ThreadPoolExecutor(max_workers=max_parallel, thread_name_prefix='batch-scrape') as executor:
+            results = list(executor.map(scrape_one, profile_urls))
+        elapsed = self.clock() - start
+
+        succeeded = [result for result in results if result['success']]
+        books_count = sum(result.get('books_count') or 0 for result in succeeded)
+        summary = {
+            'profiles': len(results),
+            'succeeded': len(succeeded),
+            'failed': len(results) - len(succeeded),
+            'books_count': books_count,
+            'elapsed_seconds': round(elapsed, 4),
+            'profiles_per_second': round(len(results) / elapsed, 4) if elapsed else None,
+            'books_per_second': round(books_count / elapsed, 4) if elapsed else None,
+        }
+        logger.info(
+            f"Batch scrape finished: {summary['succeeded']}/{summary['profiles']} profiles "
+            f"in {summary['elapsed_seconds']}s"
+        )
+
+        return {
+            'success': summary['failed'] == 0,
+            # Failed profiles are reported individually; rerunning the batch would redo the rest
+            'retryable': False,
+            'summary': summary,
+            'results': results,
+            'message': f"Scraped {summary['succeeded']} of {summary['profiles']} profiles"
+        }
+
+    def _save_rss_feed(self, user_id: str, rss_metadata: Dict) -> Optional[str]:
+        """
+        Save RSS feed metadata if raw feed data is available, returning the
+        new feed id. The raw content goes to the compressed archive, where
+        identical payloads are stored only once.
+        """
+        if not rss_metadata.get('raw_rss_data'):
+            return None
 
-    def get_user_library(self, username: str) -> Dict:
+        rss_feed_record = {
+            'id': str(uuid.uuid4()),
+            'user_id': user_id,
+            'feed_url': rss_metadata.get('rss_feed_url'),
+            'feed_title': rss_metadata.get('feed_title'),
+            'feed_description': rss_metadata.get('feed_description'),
+            'feed_language': rss_metadata.get('feed_language'),
+            'feed_last_build_date': rss_metadata.get('feed_last_build_date'),
+            'feed_ttl': rss_metadata.get('feed_ttl'),
+            'scraped_at': datetime.utcnow().isoformat()
+        }
+        self.db.save_archived_rss_feed(rss_feed_record, rss_metadata['raw_rss_data'])
+        logger.info("Saved raw RSS feed data for user")
+        return rss_feed_record['id']
+
+    def _save_book_batch(
+        self,
+        user_id: str,
+        books: List[ScrapedBook],
+        stored_index: Dict[str, Dict],
+        seen_keys: set,
+        timer: StageTimer,
+    ) -> Dict[str, int]:
+        """
+        Save the books of one batch that are new or changed compared to
+        stored_index, recording every book's sync key in seen_keys.
+        Returns the number of inserted and updated user_books.
+        """
+        changes = {'inserted': 0, 'updated': 0}
+        if not books:
+            return changes
+
+        # Books whose guid matches a stored row with the same content are skipped
+        pending = []
+        for book in books:
+            content_hash = book.content_hash()
+            guid = book.get('rss_guid')
+            if guid:
+                seen_keys.add(guid)
+                stored = stored_index.get(guid)
+                if stored and stored.get('content_hash') == content_hash:
+                    continue
+            pending.append((book, content_hash))
+
+        if not pending:
+            return changes
+
+        book_records = []
+        user_book_records = []
+
+        # Resolve every existing book in the batch with a few bulk lookups
+        with timer.stage('resolve_books'):
+            existing_book_ids = self.db.get_book_ids_by_goodreads_ids(
+                book.get('goodreads_id') for book, _ in pending
+            )
+
+        for book, content_hash in pending:
+            goodreads_id = book.get('goodreads_id')
+
+            # Reuse the existing book ID so the upsert updates that record
+            if goodreads_id:
+                book_id = existing_book_ids.setdefault(goodreads_id, str(uuid.uuid4()))
+            else:
+                book_id = str(uuid.uuid4())
+
+            sync_key = self._sync_key(book.get('rss_guid'), book_id)
+            seen_keys.add(sync_key)
+            stored = stored_index.get(sync_key)
+            if stored:
+                if stored.get('content_hash') == content_hash:
+                    continue
+                changes['updated'] += 1
+            else:
+                changes['inserted'] += 1
+
+            book_record, user_book_record = book.to_records(
+                book_id, stored['id'] if stored else str(uuid.uuid4()), user_id, content_hash
+            )
+            book_records.append(book_record)
+            user_book_records.append(user_book_record)
+
+        if book_records:
+            with timer.stage('save_books'):
+                saved_books = self.db.save_books(book_records) or []
+            # A book inserted by a concurrent scrape keeps that scrape's id
+            stored_ids = {row['goodreads_id']: row['id'] for row in saved_books if row.get('goodreads_id')}
+            for book_record, user_book_record in zip(book_records, user_book_records):
+                stored_id = stored_ids.get(book_record.get('goodreads_id'))
+                if stored_id:
+                    user_book_record['book_id'] = stored_id
+        if user_book_records:
+            with timer.stage('save_user_books'):
+                self.db.save_user_books(user_book_records)
+        logger.info(f"Saved {len(user_book_records)} changed books for user")
+        return changes
+
+    @staticmethod
+    def _sync_key(rss_guid: Optional[str], book_id: str) -> str:
+        """Identify a user_book across scrapes: by RSS guid, else by book"""
+        return rss_guid or f"book:{book_id}"
+
+    def get_user(self, username: str) -> Optional[Dict]:
+        """
+        Look up a stored user by username, through the library cache. Every
+        library read goes through here, so found users are recorded as read.
+        """
+        user = library_cache.get_or_load(
+            ('user', username), lambda: self.db.get_user_by_username(username)
+        )
+        if user:
+            read_activity.touch(username)
+        return user
+
+    def get_user_library(
+        self,
+        username: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+    ) -> Dict:
+        """
+        Fetch a user and their books. With a limit, one page of books is
+        returned (newest first) along with next_cursor; fields restricts the
+        columns returned per book. Raises ValueError for an invalid cursor or
+        field name.
+
+        Concurrent cold reads of the same library share one fetch.
+        """
+        cache_key = ('library', username, limit, cursor, tuple(fields) if fields else None)
+        found, library = library_cache.get(cache_key)
+        if found:
+            return library
+
+        library, _ = library_cache.loads.do(
+            cache_key, lambda: self._load_user_library(cache_key, username, limit, cursor, fields)
+        )
+        return library
+
+    def _load_user_library(
+        self,
+        cache_key: tuple,
+        username: str,
+        limit: Optional[int],
+        cursor: Optional[str],
+        fields: Optional[List[str]],
+    ) -> Dict:
+        # A scrape invalidating the user while this runs keeps its result out of the cache
+        generation = library_cache.generation(username)
         try:
-            user = self.db.get_user_by_username(username)
+            user = self.get_user(username)
             if not user:
                 return {
                     'success': False,
                     'message': 'User not found'
                 }
 
-            books = self.db.get_user_books(user['id'])
-
-            return {
-                'success': True,
-                'user': user,
-                'books': books,
-                'total_books': len(books)
-            }
+            if limit:
+                page = self.db.get_user_books_page(user['id'], limit, cursor=cursor, fields=fields)
+                library = {
+                    'success': True,
+                    'user': user,
+                    'books': page['books'],
+                    'count': len(page['books']),
+                    'next_cursor': page['next_cursor']
+                }
+            else:
+                books = self.db.get_user_books(user['id'], fields=fields)
+                library = {
+                    'success': True,
+                    'user': user,
+                    'books': books,
+                    'total_books': len(books)
+                }
+            library_cache.set(cache_key, library, generation)
+            return library
 
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f"Error fetching user library: {e}")
             return {
@@ -182,4 +472,4 @@ class ScrapingService:
                 'message': 'Failed to fetch user library'
             }
 
-scraping_service = ScrapingService()
\ No newline at end of file
+get_scraping_service = LazyService('scraping', ScrapingService)
@@ -0,0 +1,56 @@
+from typing import Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+import threading
+from services.metrics import coalesced_calls
+
+T = TypeVar("T")
+
+
+class _Call(Generic[T]):
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Optional[T] = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight(Generic[T]):
+    """
+    Collapses concurrent calls with the same key into one execution: the
+    first caller runs the function, callers arriving while it runs wait for
+    it and get its result (or its exception). Nothing is kept once the call
+    returns, so the next call runs afresh.
+    """
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self._calls: Dict[Hashable, _Call[T]] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> Tuple[T, bool]:
+        """Return fn's result and whether it was shared from another caller's call"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            coalesced_calls.labels(kind=self.kind).inc()
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value, True
+
+        try:
+            call.value = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value, False
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,530 @@
+from sqlalchemy import and_, column, delete, event, func, nulls_first, or_, select, table, text
+from sqlalchemy.dialects import postgresql, sqlite
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+from uuid import UUID
+import logging
+from services.cache import library_cache
+from services.metrics import sql_statements
+from services.database import (
+    GOODREADS_ID_CHUNK_SIZE,
+    DatabaseService,
+    decode_cursor,
+    encode_cursor,
+    resolve_user_book_fields,
+)
+from services.rss_archive import content_hash, compress_payload, decompress_payload
+from models import Book, GoodreadsUser, RSSFeed, RSSPayload, UserBook
+
+logger = logging.getLogger(__name__)
+
+# Rows per INSERT ... ON CONFLICT statement
+UPSERT_CHUNK_SIZE = 500
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    sql_statements.labels(verb=statement.lstrip().split(None, 1)[0].upper()).inc()
+
+
+def _table(model):
+    # Untyped columns: values go to the driver as given, like they do through
+    # the REST API, so RSS date strings and shelf statuses are stored unchanged
+    return table(model.__tablename__, *(column(name) for name in model.__table__.columns.keys()))
+
+
+users = _table(GoodreadsUser)
+books = _table(Book)
+user_books = _table(UserBook)
+rss_feeds = _table(RSSFeed)
+rss_payloads = _table(RSSPayload)
+
+# Supported (dialect, driver) pairs. Parameters are sent untyped, which needs
+# a driver that lets Postgres infer their types (psycopg 3 casts them to VARCHAR)
+_INSERTS = {
+    ('postgresql', 'psycopg2'): postgresql.insert,
+    ('sqlite', 'pysqlite'): sqlite.insert,
+}
+
+
+def _jsonable(value):
+    """Convert a column value to what the REST API would have returned"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _row_dict(row) -> Dict:
+    return {key: _jsonable(value) for key, value in row._mapping.items()}
+
+
+class SQLDatabaseService(DatabaseService):
+    """
+    Storage backend that talks to Postgres (or SQLite) directly over the pooled
+    SQLAlchemy engine from DATABASE_URL. Writes are bulk INSERT ... ON CONFLICT
+    upserts and reads join on the server, so each operation is one round trip.
+    Rows are returned shaped like the Supabase backend's, with the book
+    embedded under "books".
+    """
+
+    uses_supabase = False
+
+    def __init__(self):
+        super().__init__()
+        self._insert = None
+        if self.engine is not None:
+            dialect = (self.engine.dialect.name, self.engine.dialect.driver)
+            if dialect not in _INSERTS:
+                raise ValueError(f"Unsupported database for the sql storage backend: {'+'.join(dialect)}")
+            self._insert = _INSERTS[dialect]
+            event.listen(self.engine, 'before_cursor_execute', _count_statement)
+
+    def ping(self):
+        if not self.engine:
+            raise RuntimeError("Database engine not configured")
+        with self.engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+
+    def _upsert(
+        self, conn, target, rows: List[Dict], key: str, update: bool = True, keep: Iterable[str] = ()
+    ):
+        """
+        Insert rows, updating (or skipping) those whose key already exists.
+        Columns in keep are left as they are on updated rows.
+        """
+        for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+            chunk = rows[start:start + UPSERT_CHUNK_SIZE]
+            statement = self._insert(target)
+            if update:
+                columns = [name for name in chunk[0] if name != key and name not in keep]
+                statement = statement.on_conflict_do_update(
+                    index_elements=[key],
+                    set_={name: statement.excluded[name] for name in columns},
+                )
+            else:
+                statement = statement.on_conflict_do_nothing(index_elements=[key])
+            conn.execute(statement, chunk)
+
+    def save_user_data(self, user_data: dict):
+        try:
+            if self.engine:
+                with self.engine.begin() as conn:
+                    self._upsert(conn, users, [user_data], 'id')
+                return [user_data]
+            else:
+                logger.warning("Database engine not configured")
+                return None
+        except Exception as e:
+            logger.error(f"Error saving user data: {e}")
+            raise
+
+    def save_books(self, books_data: list):
+        try:
+            if self.engine:
+                by_goodreads_id = list({
+                    book['goodreads_id']: book for book in books_data if book.get('goodreads_id')
+                }.values())
+                by_id = [book for book in books_data if not book.get('goodreads_id')]
+                stored_ids = {}
+                with self.engine.begin() as conn:
+                    if by_goodreads_id:
+                        # Matched on goodreads_id, keeping the id of a book that is already stored
+                        self._upsert(conn, books, by_goodreads_id, 'goodreads_id', keep=('id',))
+                        goodreads_ids = [book['goodreads_id'] for book in by_goodreads_id]
+                        for start in range(0, len(goodreads_ids), UPSERT_CHUNK_SIZE):
+                            query = select(books.c.goodreads_id, books.c.id).where(
+                                books.c.goodreads_id.in_(goodreads_ids[start:start + UPSERT_CHUNK_SIZE])
+                            )
+                            stored_ids.update({row.goodreads_id: row.id for row in conn.execute(query)})
+                    if by_id:
+                        self._upsert(conn, books, by_id, 'id')
+                saved = [{**book, 'id': stored_ids[book['goodreads_id']]} for book in by_goodreads_id] + by_id
+                self._remember_book_ids(saved)
+                return saved
+            else:
+                logger.warning("Database engine not configured")
+                return None
+        except Exception as e:
+            logger.error(f"Error saving books: {e}")
+            raise
+
+    def save_user_books(self, user_books_data: list):
+        try:
+            if self.engine:
+                if user_books_data:
+                    with self.engine.begin() as conn:
+                        self._upsert(conn, user_books, user_books_data, 'id')
+                return user_books_data
+            else:
+                logger.warning("Database engine not configured")
+                return None
+        except Exception as e:
+            logger.error(f"Error saving user books: {e}")
+            raise
+
+    def get_user_by_username(self, username: str):
+        try:
+            if self.engine:
+                with self.engine.connect() as conn:
+                    row = conn.execute(select(users).where(users.c.username == username)).first()
+                return _row_dict(row) if row else None
+            else:
+                logger.warning("Database engine not configured")
+                return None
+        except Exception as e:
+            logger.error(f"Error fetching user: {e}")
+            raise
+
+    def get_user_by_goodreads_id(self, goodreads_id: str):
+        """The stored user with a numeric Goodreads user id, or None"""
+        try:
+            if self.engine:
+                with self.engine.connect() as conn:
+                    row = conn.execute(select(users).where(users.c.goodreads_id == goodreads_id)).first()
+                return _row_dict(row) if row else None
+            else:
+                logger.warning("Database engine not configured")
+                return None
+        except Exception as e:
+            logger.error(f"Error fetching user: {e}")
+            raise
+
+    def _user_books_query(self, fields: Optional[List[str]] = None):
+        """user_books joined to books, selecting the projected columns of each"""
+        user_book_columns, book_columns = resolve_user_book_fields(fields)
+        columns = [user_books.c[name] for name in user_book_columns]
+        columns += [books.c[name].label(f"books__{name}") for name in book_columns]
+        query = select(*columns)
+        if book_columns:
+            query = query.select_from(user_books.outerjoin(books, books.c.id == user_books.c.book_id))
+        return query, bool(book_columns)
+
+    def _user_book_rows(self, conn, query, embeds_book: bool) -> List[Dict]:
+        """Run a _user_books_query, nesting the book columns under "books" like PostgREST"""
+        rows = []
+        for row in conn.execute(query):
+            record = {}
+            book = {}
+            for key, value in row._mapping.items():
+                if key.startswith('books__'):
+                    book[key[len('books__'):]] = _jsonable(value)
+                else:
+                    record[key] = _jsonable(value)
+            if embeds_book:
+                record['books'] = book if book.get('id', True) is not None else None
+            rows.append(record)
+        return rows
+
+    def get_user_books(self, user_id: str, fields: Optional[List[str]] = None):
+        try:
+            if self.engine:
+                query, embeds_book = self._user_books_query(fields)
+                with self.engine.connect() as conn:
+                    return self._user_book_rows(conn, query.where(user_books.c.user_id == user_id), embeds_book)
+            else:
+                logger.warning("Database engine not configured")
+                return []
+        except Exception as e:
+            logger.error(f"Error fetching user books: {e}")
+            raise
+
+    def get_user_books_page(
+        self,
+        user_id: str,
+        limit: int,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        status: Optional[str] = None,
+    ) -> Dict:
+        """
+        Fetch one page of a user's books, newest date_added first (id breaks
+        ties, rows without date_added come first as in Postgres), resuming
+        after the cursor.
+        """
+        try:
+            if self.engine:
+                query, embeds_book = self._user_books_query(fields)
+                query = query.where(user_books.c.user_id == user_id)
+                if status:
+                    query = query.where(user_books.c.status == status)
+                if cursor:
+                    query = query.where(self._after_cursor_clause(cursor))
+                # Fetch one extra row to learn whether another page follows
+                query = query.order_by(
+                    nulls_first(user_books.c.date_added.desc()), user_books.c.id.desc()
+                ).limit(limit + 1)
+                with self.engine.connect() as conn:
+                    rows = self._user_book_rows(conn, query, embeds_book)
+
+                next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+                return {'books': rows[:limit], 'next_cursor': next_cursor}
+            else:
+                logger.warning("Database engine not configured")
+                return {'books': [], 'next_cursor': None}
+        except Exception as e:
+            logger.error(f"Error fetching user books page: {e}")
+            raise
+
+    def _after_cursor_clause(self, cursor: str):
+        date_added, row_id = decode_cursor(cursor)
+        if date_added is None:
+            return or_(
+                and_(user_books.c.date_added.is_(None), user_books.c.id < row_id),
+                user_books.c.date_added.is_not(None),
+            )
+        return or_(
+            user_books.c.date_added < date_added,
+            and_(user_books.c.date_added == date_added, user_books.c.id < row_id),
+        )
+
+    def get_user_books_by_status(self, user_id: str, status: str):
+        try:
+            if self.engine:
+                query, embeds_book = self._user_books_query()
+                query = query.where(user_books.c.user_id == user_id, user_books.c.status == status)
+                with self.engine.connect() as conn:
+                    return self._user_book_rows(conn, query, embeds_book)
+            else:
+                logger.warning("Database engine not configured")
+                return []
+        except Exception as e:
+            logger.error(f"Error fetching user books by status: {e}")
+            raise
+
+    def get_books_by_status(self, username: str, status: str):
+        """
+        Fetch a user's books on one status shelf, joining on the username
+        server-side. Reads through the library cache; concurrent misses share
+        one query.
+        """
+        return library_cache.get_or_load(
+            ('status', username, status), lambda: self._load_books_by_status(username, status)
+        )
+
+    def _load_books_by_status(self, username: str, status: str):
+        try:
+            if self.engine:
+                query, embeds_book = self._user_books_query()
+                query = query.join(users, users.c.id == user_books.c.user_id).where(
+                    users.c.username == username, user_books.c.status == status
+                )
+                with self.engine.connect() as conn:
+                    return self._user_book_rows(conn, query, embeds_book)
+            else:
+                logger.warning("Database engine not configured")
+                return []
+        except Exception as e:
+            logger.error(f"Error fetching {status} books: {e}")
+            raise
+
+    def get_book_by_goodreads_id(self, goodreads_id: str):
+        try:
+            if self.engine:
+                with self.engine.connect() as conn:
+                    row = conn.execute(select(books).where(books.c.goodreads_id == goodreads_id)).first()
+                return _row_dict(row) if row else None
+            else:
+                logger.warning("Database engine not configured")
+                return None
+        except Exception as e:
+            logger.error(f"Error fetching book by goodreads_id: {e}")
+            raise
+
+    def get_book_ids_by_goodreads_ids(self, goodreads_ids: Iterable[str]) -> Dict[str, str]:
+        """
+        Resolve many goodreads_ids to existing book ids at once.
+        Ids not in the process-local cache are looked up with chunked IN
+        queries, keeping each within the database's bound-parameter limit.
+        """
+        resolved, missing = self._cached_book_ids(goodreads_ids)
+
+        try:
+            if missing and self.engine:
+                with self.engine.connect() as conn:
+                    for start in range(0, len(missing), GOODREADS_ID_CHUNK_SIZE):
+                        chunk = missing[start:start + GOODREADS_ID_CHUNK_SIZE]
+                        rows = [
+                            _row_dict(row)
+                            for row in conn.execute(
+                                select(books.c.id, books.c.goodreads_id).where(books.c.goodreads_id.in_(chunk))
+                            )
+                        ]
+                        self._remember_book_ids(rows)
+                        for row in rows:
+                            resolved[row['goodreads_id']] = row['id']
+            elif missing:
+                logger.warning("Database engine not configured")
+            return resolved
+        except Exception as e:
+            logger.error(f"Error resolving book ids: {e}")
+            raise
+
+    def get_user_book_index(self, user_id: str) -> List[Dict]:
+        try:
+            if self.engine:
+                query = select(
+                    user_books.c.id, user_books.c.book_id, user_books.c.rss_guid, user_books.c.content_hash
+                ).where(user_books.c.user_id == user_id)
+                with self.engine.connect() as conn:
+                    return [_row_dict(row) for row in conn.execute(query)]
+            else:
+                logger.warning("Database engine not configured")
+                return []
+        except Exception as e:
+            logger.error(f"Error fetching user book index: {e}")
+            raise
+
+    def get_refresh_candidates(self) -> List[Dict]:
+        try:
+            if self.engine:
+                query = select(
+                    users.c.id,
+                    users.c.username,
+                    users.c.profile_url,
+                    users.c.scraped_at,
+                    func.min(rss_feeds.c.feed_ttl).label('feed_ttl'),
+                ).select_from(
+                    users.outerjoin(rss_feeds, rss_feeds.c.user_id == users.c.id)
+                ).group_by(users.c.id, users.c.username, users.c.profile_url, users.c.scraped_at)
+                with self.engine.connect() as conn:
+                    return [_row_dict(row) for row in conn.execute(query)]
+            else:
+                logger.warning("Database engine not configured")
+                return []
+        except Exception as e:
+            logger.error(f"Error fetching refresh candidates: {e}")
+            raise
+
+    def delete_user_books(self, user_book_ids: List[str]):
+        try:
+            if self.engine:
+                if user_book_ids:
+                    with self.engine.begin() as conn:
+                        conn.execute(delete(user_books).where(user_books.c.id.in_(user_book_ids)))
+                return True
+            else:
+                logger.warning("Database engine not configured")
+                return False
+        except Exception as e:
+            logger.error(f"Error deleting user books: {e}")
+            raise
+
+    def delete_rss_feeds_except(self, user_id: str, keep_ids: List[str]):
+        try:
+            if self.engine:
+                statement = delete(rss_feeds).where(rss_feeds.c.user_id == user_id)
+                if keep_ids:
+                    statement = statement.where(rss_feeds.c.id.not_in(keep_ids))
+                with self.engine.begin() as conn:
+                    conn.execute(statement)
+                return True
+            else:
+                logger.warning("Database engine not configured")
+                return False
+        except Exception as e:
+            logger.error(f"Error deleting RSS feeds: {e}")
+            raise
+
+    def save_rss_payload(self, raw_content: str) -> str:
+        digest = content_hash(raw_content)
+        if self._payload_known(digest):
+            return digest
+
+        try:
+            if self.engine:
+                with self.engine.begin() as conn:
+                    exists = conn.execute(
+                        select(func.count()).select_from(rss_payloads).where(rss_payloads.c.content_hash == digest)
+                    ).scalar()
+                    if not exists:
+                        self._upsert(conn, rss_payloads, [compress_payload(raw_content)], 'content_hash', update=False)
+                self._remember_payload_hash(digest)
+                return digest
+            else:
+                logger.warning("Database engine not configured")
+                return digest
+        except Exception as e:
+            logger.error(f"Error archiving RSS payload: {e}")
+            raise
+
+    def get_rss_feeds(self, user_id: str):
+        try:
+            if self.engine:
+                query = select(
+                    *(rss_feeds.c[name] for name in RSSFeed.__table__.columns.keys() if name != 'raw_rss_content')
+                ).where(rss_feeds.c.user_id == user_id)
+                with self.engine.connect() as conn:
+                    return [_row_dict(row) for row in conn.execute(query)]
+            else:
+                logger.warning("Database engine not configured")
+                return []
+        except Exception as e:
+            logger.error(f"Error fetching RSS feeds: {e}")
+            raise
+
+    def get_rss_feed_content(self, feed_id: str) -> Optional[str]:
+        """Load and decompress one stored RSS feed, joined to its archived payload"""
+        try:
+            if self.engine:
+                query = select(
+                    rss_feeds.c.content_hash,
+                    rss_feeds.c.raw_rss_content,
+                    rss_payloads.c.encoding,
+                    rss_payloads.c.compressed_content,
+                ).select_from(
+                    rss_feeds.outerjoin(rss_payloads, rss_payloads.c.content_hash == rss_feeds.c.content_hash)
+                ).where(rss_feeds.c.id == feed_id)
+                with self.engine.connect() as conn:
+                    row = conn.execute(query).first()
+                if row is None:
+                    return None
+                if not row.content_hash:
+                    # Not yet moved to the archive
+                    return row.raw_rss_content
+                if row.compressed_content is None:
+                    return None
+                return decompress_payload(row.encoding, row.compressed_content)
+            else:
+                logger.warning("Database engine not configured")
+                return None
+        except Exception as e:
+            logger.error(f"Error fetching RSS feed content: {e}")
+            raise
+
+    def save_rss_feed(self, rss_feed_data: dict):
+        try:
+            if self.engine:
+                with self.engine.begin() as conn:
+                    self._upsert(conn, rss_feeds, [rss_feed_data], 'id')
+                return [rss_feed_data]
+            else:
+                logger.warning("Database engine not configured")
+                return None
+        except Exception as e:
+            logger.error(f"Error saving RSS feed: {e}")
+            raise
+
+    def delete_user_data_by_username(self, username: str):
+        """Delete a user and all their data in one transaction"""
+        try:
+            if self.engine:
+                user_ids = select(users.c.id).where(users.c.username == username).scalar_subquery()
+                with self.engine.begin() as conn:
+                    conn.execute(delete(user_books).where(user_books.c.user_id == user_ids))
+                    conn.execute(delete(rss_feeds).where(rss_feeds.c.user_id == user_ids))
+                    deleted = conn.execute(delete(users).where(users.c.username == username)).rowcount
+                if deleted:
+                    logger.info(f"Deleted all data for user {username}")
+                else:
+                    logger.info(f"No existing data found for user {username}")
+                return True
+            else:
+                logger.warning("Database engine not configured")
+                return False
+        except Exception as e:
+            logger.error(f"Error deleting user data: {e}")
+            raise
@@ -0,0 +1,106 @@
+import os
+import threading
+import time
+import logging
+from typing import Dict, Optional, Tuple
+from services.database import get_database_service
+from services.job_service import get_job_service
+from services.lifecycle import build_timings
+from services.refresh_scheduler import REFRESH_ENABLED, get_refresh_scheduler
+from services.scraping_service import get_scraping_service
+
+logger = logging.getLogger(__name__)
+
+
+class StartupState:
+    """Progress of the background warm-up, as reported by /health and /ready"""
+
+    def __init__(self):
+        self.warmed_up = False
+        self.error: Optional[str] = None
+        self.report: Dict[str, float] = {}
+
+
+startup_state = StartupState()
+
+
+def seconds_since_process_start() -> Optional[float]:
+    """
+    Wall-clock seconds since this process started, read from /proc (Linux);
+    None where that isn't available. Covers interpreter start-up and imports.
+    """
+    try:
+        with open('/proc/self/stat') as stat:
+            # Fields after the parenthesised command name start at field 3; starttime is field 22
+            start_ticks = int(stat.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime') as uptime:
+            system_uptime = float(uptime.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    return max(0.0, system_uptime - start_ticks / os.sysconf('SC_CLK_TCK'))
+
+
+def warm_up(started: float, boot_seconds: Optional[float]):
+    """
+    Build the services, create any missing tables and start the refresh
+    scheduler (when REFRESH_ENABLED is on), then log the startup timing
+    report. Runs on a background thread so the server accepts
+    connections (and answers /health) while backends are still being set up.
+
+    started is when the app's lifespan began, and boot_seconds how long the
+    process had been running by then (interpreter start-up and imports).
+    """
+    report = {'boot': round(boot_seconds, 4)} if boot_seconds is not None else {}
+    try:
+        get_database_service()
+        get_scraping_service()
+        get_job_service()
+        report.update(build_timings)
+
+        stage_started = time.perf_counter()
+        get_database_service().create_tables()
+        report['create_tables'] = round(time.perf_counter() - stage_started, 4)
+
+        if REFRESH_ENABLED:
+            get_refresh_scheduler().start()
+    except Exception as e:
+        logger.error(f"Startup warm-up failed: {e}")
+        startup_state.error = str(e)
+
+    report['total'] = round((boot_seconds or 0.0) + time.perf_counter() - started, 4)
+    startup_state.report = report
+    startup_state.warmed_up = startup_state.error is None
+    logger.info("Startup timings: " + ", ".join(f"{stage} {seconds:.3f}s" for stage, seconds in report.items()))
+
+
+def start_warm_up() -> threading.Thread:
+    """Warm up in the background, timed from now and from the process start"""
+    thread = threading.Thread(
+        target=warm_up,
+        args=(time.perf_counter(), seconds_since_process_start()),
+        name='startup-warm-up',
+        daemon=True,
+    )
+    thread.start()
+    return thread
+
+
+def check_readiness() -> Tuple[bool, Dict[str, str]]:
+    """Whether warm-up finished and the storage backend answers a query"""
+    checks = {}
+    if startup_state.error:
+        checks['warm_up'] = f"failed: {startup_state.error}"
+    else:
+        checks['warm_up'] = 'ok' if startup_state.warmed_up else 'pending'
+
+    if startup_state.warmed_up:
+        try:
+            get_database_service().ping()
+            checks['database'] = 'ok'
+        except Exception as e:
+            logger.warning(f"Readiness check failed: {e}")
+            checks['database'] = f"unreachable: {e}"
+    else:
+        checks['database'] = 'pending'
+
+    return all(result == 'ok' for result in checks.values()), checks
@@ -0,0 +1,34 @@
+from contextlib import contextmanager
+from typing import Dict, Optional
+import threading
+import time
+from prometheus_client import Histogram
+
+
+class StageTimer:
+    """
+    Accumulates wall-clock seconds per named stage of a piece of work, and
+    observes each stage's duration into a histogram when one is given.
+    Stages may be timed from several threads at once.
+    """
+
+    def __init__(self, histogram: Optional[Histogram] = None):
+        self.timings: Dict[str, float] = {}
+        self.histogram = histogram
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.timings[name] = self.timings.get(name, 0.0) + elapsed
+            if self.histogram is not None:
+                self.histogram.labels(stage=name).observe(elapsed)
+
+    def as_dict(self) -> Dict[str, float]:
+        with self._lock:
+            return {name: round(seconds, 4) for name, seconds in self.timings.items()}
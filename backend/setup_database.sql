@@ -1,12 +1,14 @@
 -- Drop existing tables (in reverse order due to foreign key constraints)
 DROP TABLE IF EXISTS user_books CASCADE;
 DROP TABLE IF EXISTS rss_feeds CASCADE;
+DROP TABLE IF EXISTS rss_payloads CASCADE;
 DROP TABLE IF EXISTS books CASCADE;
 DROP TABLE IF EXISTS goodreads_users CASCADE;
 
 -- Create goodreads_users table
 CREATE TABLE IF NOT EXISTS goodreads_users (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    goodreads_id VARCHAR UNIQUE,
     username VARCHAR UNIQUE NOT NULL,
     profile_url VARCHAR NOT NULL,
     name VARCHAR,
@@ -79,10 +81,21 @@ CREATE TABLE IF NOT EXISTS user_books (
     comments_count INTEGER,
     likes_count INTEGER,
     pub_date TIMESTAMP,
+    content_hash VARCHAR,
     created_at TIMESTAMP DEFAULT NOW(),
     updated_at TIMESTAMP DEFAULT NOW()
 );
 
+-- Create rss_payloads table (compressed raw feeds, one row per distinct content)
+CREATE TABLE IF NOT EXISTS rss_payloads (
+    content_hash VARCHAR PRIMARY KEY,
+    encoding VARCHAR NOT NULL,
+    compressed_content TEXT NOT NULL,
+    raw_size INTEGER,
+    compressed_size INTEGER,
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
 -- Create rss_feeds table
 CREATE TABLE IF NOT EXISTS rss_feeds (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -93,42 +106,48 @@ CREATE TABLE IF NOT EXISTS rss_feeds (
     feed_language VARCHAR,
     feed_last_build_date TIMESTAMP,
     feed_ttl INTEGER,
-    raw_rss_content TEXT NOT NULL,
+    content_hash VARCHAR REFERENCES rss_payloads(content_hash),
+    raw_rss_content TEXT,
     scraped_at TIMESTAMP DEFAULT NOW()
 );
 
--- Create indexes for better performance
-CREATE INDEX IF NOT EXISTS idx_goodreads_users_username ON goodreads_users(username);
-CREATE INDEX IF NOT EXISTS idx_books_goodreads_id ON books(goodreads_id);
-CREATE INDEX IF NOT EXISTS idx_user_books_user_id ON user_books(user_id);
+-- Create indexes shaped to the hot queries (usernames and goodreads_ids are
+-- already indexed by their UNIQUE constraints)
+CREATE INDEX IF NOT EXISTS idx_user_books_user_id_date_added ON user_books(user_id, date_added DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_user_books_user_id_status_date_added ON user_books(user_id, status, date_added DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_user_books_user_id_rss_guid ON user_books(user_id, rss_guid);
 CREATE INDEX IF NOT EXISTS idx_user_books_book_id ON user_books(book_id);
-CREATE INDEX IF NOT EXISTS idx_user_books_status ON user_books(status);
-CREATE INDEX IF NOT EXISTS idx_user_books_rss_guid ON user_books(rss_guid);
 CREATE INDEX IF NOT EXISTS idx_rss_feeds_user_id ON rss_feeds(user_id);
+CREATE INDEX IF NOT EXISTS idx_rss_feeds_content_hash ON rss_feeds(content_hash);
 
 -- Enable Row Level Security (RLS)
 ALTER TABLE goodreads_users ENABLE ROW LEVEL SECURITY;
 ALTER TABLE books ENABLE ROW LEVEL SECURITY;
 ALTER TABLE user_books ENABLE ROW LEVEL SECURITY;
 ALTER TABLE rss_feeds ENABLE ROW LEVEL SECURITY;
+ALTER TABLE rss_payloads ENABLE ROW LEVEL SECURITY;
 
 -- Create policies for public access (adjust as needed for your security requirements)
 CREATE POLICY "Allow public read access" ON goodreads_users FOR SELECT USING (true);
 CREATE POLICY "Allow public read access" ON books FOR SELECT USING (true);
 CREATE POLICY "Allow public read access" ON user_books FOR SELECT USING (true);
 CREATE POLICY "Allow public read access" ON rss_feeds FOR SELECT USING (true);
+CREATE POLICY "Allow public read access" ON rss_payloads FOR SELECT USING (true);
 
 CREATE POLICY "Allow public insert access" ON goodreads_users FOR INSERT WITH CHECK (true);
 CREATE POLICY "Allow public insert access" ON books FOR INSERT WITH CHECK (true);
 CREATE POLICY "Allow public insert access" ON user_books FOR INSERT WITH CHECK (true);
 CREATE POLICY "Allow public insert access" ON rss_feeds FOR INSERT WITH CHECK (true);
+CREATE POLICY "Allow public insert access" ON rss_payloads FOR INSERT WITH CHECK (true);
 
 CREATE POLICY "Allow public update access" ON goodreads_users FOR UPDATE USING (true);
 CREATE POLICY "Allow public update access" ON books FOR UPDATE USING (true);
 CREATE POLICY "Allow public update access" ON user_books FOR UPDATE USING (true);
 CREATE POLICY "Allow public update access" ON rss_feeds FOR UPDATE USING (true);
+CREATE POLICY "Allow public update access" ON rss_payloads FOR UPDATE USING (true);
 
 CREATE POLICY "Allow public delete access" ON goodreads_users FOR DELETE USING (true);
 CREATE POLICY "Allow public delete access" ON books FOR DELETE USING (true);
 CREATE POLICY "Allow public delete access" ON user_books FOR DELETE USING (true);
 CREATE POLICY "Allow public delete access" ON rss_feeds FOR DELETE USING (true);
+CREATE POLICY "Allow public delete access" ON rss_payloads FOR DELETE USING (true);
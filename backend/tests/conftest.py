@@ -0,0 +1,68 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.base import Base
+from scrapers.goodreads_rss_scraper import GoodreadsRSSScraper
+from services.cache import library_cache
+from services.rate_limiter import rate_limiter
+
+
+@pytest.fixture
+def sql_db(tmp_path, monkeypatch):
+    """
+    The sql storage backend on a fresh database: TEST_DATABASE_URL if set
+    (e.g. a local Postgres), otherwise a SQLite file.
+    """
+    from services.sql_database import SQLDatabaseService
+
+    url = os.getenv('TEST_DATABASE_URL') or f"sqlite:///{tmp_path / 'cozybookshelf.db'}"
+    monkeypatch.setenv('DATABASE_URL', url)
+    db = SQLDatabaseService()
+    Base.metadata.drop_all(bind=db.engine)
+    db.create_tables()
+    yield db
+    Base.metadata.drop_all(bind=db.engine)
+    db.engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    """No caches carried between tests, and no waiting on the Goodreads rate limit"""
+    library_cache.clear()
+    GoodreadsRSSScraper.forget_feed_validators()
+    monkeypatch.setattr(rate_limiter, 'rate', 1e9)
+    monkeypatch.setattr(rate_limiter, 'capacity', 1e9)
+    monkeypatch.setattr(rate_limiter, '_buckets', {})
+    yield
+    library_cache.clear()
+    GoodreadsRSSScraper.forget_feed_validators()
+
+
+@pytest.fixture
+def api(sql_db, monkeypatch):
+    """
+    A client for the API routes, served from sql_db, with a Goodreads
+    stand-in for scrapes: yields (client, stub, service).
+    """
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from api.routes import router
+    from benchmarks.goodreads_stub import GoodreadsStub
+    from middleware.metrics import RequestMetricsMiddleware
+    from services.database import get_database_service
+    from services.scraping_service import ScrapingService, get_scraping_service
+
+    monkeypatch.setenv('API_KEY_AUTH_ENABLED', 'false')
+    with GoodreadsStub() as stub:
+        service = ScrapingService(db=sql_db, base_url=stub.url)
+        app = FastAPI()
+        app.add_middleware(RequestMetricsMiddleware)
+        app.include_router(router, prefix="/api/v1")
+        app.dependency_overrides[get_scraping_service] = lambda: service
+        app.dependency_overrides[get_database_service] = lambda: sql_db
+        yield TestClient(app), stub, service
@@ -0,0 +1,152 @@
+import asyncio
+import threading
+
+import httpx
+
+from benchmarks.goodreads_stub import GoodreadsStub
+from benchmarks.synthetic import list_rss_feed, profile_page
+from scrapers.async_goodreads_scraper import AsyncGoodreadsRSSScraper
+from services.scraping_service import ScrapingService
+
+PROFILE_URL = 'https://www.goodreads.com/user/show/700-pager'
+
+
+def test_async_engine_stops_at_an_unchanged_single_page_feed(sql_db, monkeypatch):
+    monkeypatch.setenv('SCRAPER_ENGINE', 'async')
+    with GoodreadsStub() as stub:
+        stub.add_library('700', 'Pager', 50)
+        service = ScrapingService(db=sql_db, base_url=stub.url)
+        first = service.scrape_and_save_user(stub.profile_url('700'))
+        assert first['success'], first.get('error')
+        assert first['books_count'] == 50
+
+        stub.reset_counters()
+        unchanged = service.scrape_and_save_user(stub.profile_url('700'))
+        # The profile and a 304 for page 1
+        assert stub.requests == 2
+        assert unchanged['books_count'] is None
+        assert unchanged['user_id'] == first['user_id']
+
+        stub.libraries['700'].revise()
+        changed = service.scrape_and_save_user(stub.profile_url('700'))
+        assert changed['books_count'] == 50
+        assert changed['changes']['updated'] > 0
+
+
+def test_async_engine_keeps_validators_of_failed_saves(sql_db, monkeypatch):
+    monkeypatch.setenv('SCRAPER_ENGINE', 'async')
+    with GoodreadsStub() as stub:
+        stub.add_library('700', 'Pager', 50)
+        service = ScrapingService(db=sql_db, base_url=stub.url)
+        with monkeypatch.context() as patch:
+            patch.setattr(sql_db, 'save_books', lambda books: 1 / 0)
+            assert not service.scrape_and_save_user(stub.profile_url('700'))['success']
+
+        result = service.scrape_and_save_user(stub.profile_url('700'))
+        assert result['books_count'] == 50
+
+
+def stand_in_goodreads(entries: int, per_page: int, slow_page: int = 0):
+    """
+    A transport serving a profile and a paged library, where later pages
+    answer sooner, and slow_page (if any) takes far longer than the rest.
+    Records the pages requested, the order they were answered in and the
+    most requests in flight.
+    """
+    state = {'in_flight': 0, 'max_in_flight': 0, 'pages': [], 'answered': []}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        state['in_flight'] += 1
+        state['max_in_flight'] = max(state['max_in_flight'], state['in_flight'])
+        try:
+            if request.url.path.startswith('/user/show/'):
+                await asyncio.sleep(0.01)
+                return httpx.Response(200, text=profile_page('700', 'Pager', entries))
+            page = int(request.url.params['page'])
+            state['pages'].append(page)
+            await asyncio.sleep(0.2 if page == slow_page else 0.002 * (20 - page))
+            state['answered'].append(page)
+            start = (page - 1) * per_page
+            count = max(0, min(per_page, entries - start))
+            return httpx.Response(200, text=list_rss_feed('700', entries=count, start=start))
+        finally:
+            state['in_flight'] -= 1
+
+    return httpx.MockTransport(handler), state
+
+
+async def walk_stand_in(transport: httpx.MockTransport, per_page: int, max_connections_per_host: int):
+    async with AsyncGoodreadsRSSScraper(
+        per_page=per_page, max_connections_per_host=max_connections_per_host, transport=transport
+    ) as scraper:
+        user_data, first = await scraper.scrape_profile_and_first_page(PROFILE_URL)
+        return user_data, [batch async for batch in scraper.iter_rss_pages(first, user_data['user_id'])]
+
+
+def test_async_engine_yields_pages_in_order_and_stops_at_the_short_page():
+    transport, state = stand_in_goodreads(entries=75, per_page=10)
+
+    user_data, batches = asyncio.run(walk_stand_in(transport, per_page=10, max_connections_per_host=3))
+
+    assert user_data['user_id'] == '700'
+    assert [batch['page'] for batch in batches] == [1, 2, 3, 4, 5, 6, 7, 8]
+    assert [len(batch['books']) for batch in batches][-2:] == [10, 5]
+    # Book ids follow the library's order across pages
+    goodreads_ids = [book.goodreads_id for batch in batches for book in batch['books']]
+    assert goodreads_ids == [str(1000 + index) for index in range(75)]
+    # Pages are requested at most twice the connection limit ahead
+    assert max(state['pages']) <= 8 + 2 * 3
+
+
+def test_a_slow_page_does_not_hold_up_the_requests_after_it():
+    transport, state = stand_in_goodreads(entries=200, per_page=10, slow_page=2)
+
+    _, batches = asyncio.run(walk_stand_in(transport, per_page=10, max_connections_per_host=3))
+
+    assert [batch['page'] for batch in batches] == list(range(1, 21))
+    # While page 2 was outstanding, the other two connections kept answering
+    # pages up to the lookahead of six pages past it
+    answered_before_slow = state['answered'][:state['answered'].index(2)]
+    assert set(range(3, 8)) <= set(answered_before_slow)
+
+
+def test_async_engine_respects_the_per_host_connection_limit():
+    transport, state = stand_in_goodreads(entries=200, per_page=10)
+
+    _, batches = asyncio.run(walk_stand_in(transport, per_page=10, max_connections_per_host=3))
+
+    assert sum(len(batch['books']) for batch in batches) == 200
+    assert state['max_in_flight'] == 3
+
+
+def test_async_engine_saves_each_page_as_it_arrives(sql_db, monkeypatch):
+    monkeypatch.setenv('SCRAPER_ENGINE', 'async')
+    with GoodreadsStub() as stub:
+        stub.add_library('700', 'Pager', 250)
+        service = ScrapingService(db=sql_db, base_url=stub.url)
+        saved = []
+        save_user_books = sql_db.save_user_books
+
+        def record_save(user_books):
+            saved.append(len(user_books))
+            return save_user_books(user_books)
+
+        monkeypatch.setattr(sql_db, 'save_user_books', record_save)
+        result = service.scrape_and_save_user(stub.profile_url('700'))
+
+    assert result['books_count'] == 250
+    assert saved == [100, 100, 50]
+
+
+def test_async_engine_stops_fetching_when_a_save_fails(sql_db, monkeypatch):
+    monkeypatch.setenv('SCRAPER_ENGINE', 'async')
+    with GoodreadsStub() as stub:
+        stub.add_library('700', 'Pager', 250)
+        service = ScrapingService(db=sql_db, base_url=stub.url)
+        monkeypatch.setattr(sql_db, 'save_user_books', lambda user_books: 1 / 0)
+
+        result = service.scrape_and_save_user(stub.profile_url('700'))
+
+    assert not result['success']
+    # The loop thread and its pages still downloading are shut down with the scrape
+    assert not [thread for thread in threading.enumerate() if thread.name == 'async-scraper']
@@ -0,0 +1,62 @@
+from api.conditional import library_validators
+
+
+def test_library_response_carries_the_validators(api):
+    client, stub, service = api
+    stub.add_library('700', 'Pager', 30)
+    service.scrape_and_save_user(stub.profile_url('700'))
+
+    response = client.get('/api/v1/user/Pager/read')
+
+    user = service.get_user('Pager')
+    etag, last_modified = library_validators(user, 'read')
+    assert response.status_code == 200
+    assert response.headers['etag'] == etag
+    assert response.headers['last-modified']
+    assert response.headers['vary'] == 'Accept'
+
+
+def test_matching_if_none_match_is_answered_with_304(api):
+    client, stub, service = api
+    stub.add_library('700', 'Pager', 30)
+    service.scrape_and_save_user(stub.profile_url('700'))
+    etag = client.get('/api/v1/user/Pager').headers['etag']
+
+    response = client.get('/api/v1/user/Pager', headers={'If-None-Match': etag})
+
+    assert response.status_code == 304
+    assert response.content == b''
+    assert response.headers['etag'] == etag
+    assert response.headers['vary'] == 'Accept'
+    assert client.get('/api/v1/user/Pager', headers={'If-None-Match': '"stale"'}).status_code == 200
+
+
+def test_streamed_and_buffered_bodies_have_different_etags(api):
+    client, stub, service = api
+    stub.add_library('700', 'Pager', 30)
+    service.scrape_and_save_user(stub.profile_url('700'))
+
+    buffered = client.get('/api/v1/user/Pager')
+    streamed = client.get('/api/v1/user/Pager', headers={'Accept': 'application/x-ndjson'})
+
+    assert buffered.headers['etag'] != streamed.headers['etag']
+    revalidated = client.get(
+        '/api/v1/user/Pager',
+        headers={'Accept': 'application/x-ndjson', 'If-None-Match': buffered.headers['etag']},
+    )
+    assert revalidated.status_code == 200
+
+
+def test_rescrape_changes_the_etag(api):
+    client, stub, service = api
+    library = stub.add_library('700', 'Pager', 30)
+    service.scrape_and_save_user(stub.profile_url('700'))
+    etag = client.get('/api/v1/user/Pager').headers['etag']
+
+    library.entries = 25
+    service.scrape_and_save_user(stub.profile_url('700'))
+    response = client.get('/api/v1/user/Pager', headers={'If-None-Match': etag})
+
+    assert response.status_code == 200
+    assert response.headers['etag'] != etag
+    assert response.json()['total_books'] == 25
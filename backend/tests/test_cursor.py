@@ -0,0 +1,36 @@
+import base64
+import json
+import uuid
+
+import pytest
+
+from services.database import decode_cursor, encode_cursor
+
+
+def cursor_of(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode('utf-8')).decode('ascii')
+
+
+def test_cursor_round_trips():
+    row = {'date_added': '2024-01-02T08:00:00+00:00', 'id': str(uuid.uuid4())}
+    assert decode_cursor(encode_cursor(row)) == (row['date_added'], row['id'])
+    assert decode_cursor(encode_cursor({'date_added': None, 'id': row['id']})) == (None, row['id'])
+
+
+@pytest.mark.parametrize('cursor', [
+    'not base64!',
+    cursor_of({'date_added': None}),
+    cursor_of([None, 'a")),id.gt.("']),
+    cursor_of([None, 42]),
+    cursor_of([{'lt': 1}, str(uuid.uuid4())]),
+    cursor_of([['2024-01-02'], str(uuid.uuid4())]),
+    cursor_of(['2024-01-02",id.gt."0', str(uuid.uuid4())]),
+])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_malformed_cursor_is_rejected_by_the_sql_backend(sql_db):
+    with pytest.raises(ValueError):
+        sql_db.get_user_books_page(str(uuid.uuid4()), 10, cursor=cursor_of([None, 'x)']))
@@ -0,0 +1,23 @@
+import pytest
+
+from benchmarks.synthetic import list_rss_feed
+from scrapers.feed_parsers import PARSER_ENGINES
+from scrapers.goodreads_rss_scraper import GoodreadsRSSScraper
+
+RSS_URL = 'https://www.goodreads.com/review/list_rss/12345?per_page=100'
+
+
+def parse(engine: str, content: bytes):
+    return GoodreadsRSSScraper(parser_engine=engine).parse_rss_page(content, RSS_URL, parallel=False)
+
+
+@pytest.mark.parametrize('engine', [engine for engine in PARSER_ENGINES if engine != 'feedparser'])
+def test_engine_matches_feedparser(engine):
+    content = list_rss_feed(entries=200, edge_cases=True).encode('utf-8')
+
+    books, rss_metadata, item_count = parse(engine, content)
+    expected_books, expected_metadata, expected_count = parse('feedparser', content)
+
+    assert item_count == expected_count
+    assert rss_metadata == expected_metadata
+    assert [book.to_dict() for book in books] == [book.to_dict() for book in expected_books]
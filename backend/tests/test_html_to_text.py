@@ -0,0 +1,37 @@
+import pytest
+from bs4 import BeautifulSoup
+
+from benchmarks.synthetic import html_corpus
+from scrapers.goodreads_rss_scraper import html_to_text
+
+EDGE_CASES = [
+    "&amp;&unknown; &amp",
+    "&#169; &#xA9; &#x110000;",
+    "<br/>line<br />break",
+    "<img src='a>b' alt=x>caption",
+    "<b>unclosed <i>nested</b> end",
+    "</p>stray end tag",
+    "<![CDATA[raw]]>text",
+    "<?php echo 1; ?>after",
+    "<textarea><b>kept</b></textarea>",
+    "<P CLASS=upper>Upper case</P>",
+    "   \n\t  ",
+]
+
+
+def soup_text(fragment: str) -> str:
+    return BeautifulSoup(fragment, "html.parser").get_text(strip=True)
+
+
+def test_matches_beautifulsoup_on_the_synthetic_corpus():
+    mismatches = [
+        (fragment, html_to_text(fragment), soup_text(fragment))
+        for fragment in html_corpus()
+        if html_to_text(fragment) != soup_text(fragment)
+    ]
+    assert mismatches == []
+
+
+@pytest.mark.parametrize('fragment', EDGE_CASES)
+def test_matches_beautifulsoup_on_edge_cases(fragment):
+    assert html_to_text(fragment) == soup_text(fragment)
@@ -0,0 +1,60 @@
+import threading
+import time
+
+from services.job_service import JobService, JobState
+
+
+def wait_until_done(*jobs, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not all(job.done for job in jobs):
+        assert time.monotonic() < deadline, [job.to_dict() for job in jobs]
+        time.sleep(0.01)
+
+
+def test_job_waiting_to_retry_leaves_its_worker_free():
+    service = JobService(max_workers=1, max_attempts=2, retry_backoff=0.5)
+    attempts = []
+    finished = {}
+
+    def flaky():
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            return {'success': False, 'error': 'upstream timeout', 'retryable': True}
+        return {'success': True}
+
+    def quick():
+        finished['quick'] = time.monotonic()
+        return {'success': True}
+
+    try:
+        retried = service.submit('flaky', {}, flaky)
+        while retried.state != JobState.RETRYING:
+            time.sleep(0.01)
+        other = service.submit('quick', {}, quick)
+        wait_until_done(retried, other)
+    finally:
+        service.shutdown()
+
+    assert retried.state == JobState.SUCCEEDED
+    assert retried.attempts == 2
+    assert attempts[1] - attempts[0] >= 0.5
+    # The only worker ran the other job during the backoff
+    assert finished['quick'] < attempts[1]
+
+
+def test_shutdown_cancels_pending_retries():
+    service = JobService(max_workers=1, max_attempts=3, retry_backoff=0.2)
+    calls = threading.Event()
+
+    def failing():
+        calls.set()
+        return {'success': False, 'error': 'upstream timeout', 'retryable': True}
+
+    job = service.submit('failing', {}, failing)
+    calls.wait(1)
+    while job.state != JobState.RETRYING:
+        time.sleep(0.01)
+    service.shutdown()
+    time.sleep(0.4)
+
+    assert job.attempts == 1
@@ -0,0 +1,60 @@
+from prometheus_client.parser import text_string_to_metric_families
+
+from middleware.metrics import route_template
+
+
+def scrape_metrics(client, monkeypatch):
+    monkeypatch.setenv('PERSONAL_API_KEY', 'admin-key')
+    response = client.get('/api/v1/metrics', headers={'X-API-Key': 'admin-key'})
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/plain')
+    return {family.name: family for family in text_string_to_metric_families(response.text)}
+
+
+def sample_value(family, suffix, **labels):
+    for sample in family.samples:
+        if sample.name == family.name + suffix and all(sample.labels.get(k) == v for k, v in labels.items()):
+            return sample.value
+    return 0.0
+
+
+def test_metrics_parse_and_label_requests_by_full_route_template(api, monkeypatch):
+    client, stub, service = api
+    stub.add_library('700', 'Pager', 30)
+    service.scrape_and_save_user(stub.profile_url('700'))
+    before = scrape_metrics(client, monkeypatch)
+    route = {'method': 'GET', 'route': '/api/v1/user/{username}', 'status': '200'}
+    requests_before = sample_value(before['cozybookshelf_http_request_duration_seconds'], '_count', **route)
+
+    client.get('/api/v1/user/Pager')
+    client.get('/api/v1/user/Pager')
+    families = scrape_metrics(client, monkeypatch)
+
+    latency = families['cozybookshelf_http_request_duration_seconds']
+    assert latency.type == 'histogram'
+    assert sample_value(latency, '_count', **route) == requests_before + 2
+    assert sample_value(latency, '_bucket', le='+Inf', **route) == requests_before + 2
+    assert all(
+        sample.labels['route'].startswith('/api/v1/')
+        for sample in latency.samples if 'route' in sample.labels
+    )
+
+    upstream = families['cozybookshelf_upstream_requests']
+    assert upstream.type == 'counter'
+    assert sample_value(upstream, '_total', host=stub.url.split('://', 1)[1], status='200') >= 2
+    assert sample_value(families['cozybookshelf_scrape_duration_seconds'], '_count', outcome='success') >= 1
+    assert sample_value(families['cozybookshelf_scrape_stage_duration_seconds'], '_count') >= 1
+
+
+class Route:
+    def __init__(self, path):
+        self.path = path
+
+
+def test_route_template_keeps_or_restores_the_router_prefix():
+    assert route_template({'path': '/api/v1/user/bob/read', 'route': Route('/user/{username}/read')}) == \
+        '/api/v1/user/{username}/read'
+    assert route_template({'path': '/api/v1/user/bob', 'route': Route('/api/v1/user/{username}')}) == \
+        '/api/v1/user/{username}'
+    assert route_template({'path': '/', 'route': Route('/')}) == '/'
+    assert route_template({'path': '/nowhere'}) == 'unmatched'
@@ -0,0 +1,41 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from benchmarks.goodreads_stub import GoodreadsStub
+from scrapers import parallel_parser
+from scrapers import goodreads_rss_scraper
+from scrapers.goodreads_rss_scraper import GoodreadsRSSScraper
+
+
+@pytest.fixture
+def parse_pool(monkeypatch):
+    """A two-worker parse pool whose submitted documents are recorded"""
+    monkeypatch.setattr(parallel_parser, 'PARSE_WORKERS', 2)
+    pool = parallel_parser.get_pool()
+    submitted = []
+
+    def submit(fn, *args):
+        submitted.append(args[1])
+        return ProcessPoolExecutor.submit(pool, fn, *args)
+
+    monkeypatch.setattr(pool, 'submit', submit)
+    yield submitted
+    parallel_parser.shutdown_pool()
+
+
+def test_paged_scrape_parses_following_pages_in_the_pool(parse_pool, monkeypatch):
+    with GoodreadsStub() as stub:
+        stub.add_library('700', 'Pager', 250)
+        with monkeypatch.context() as patch:
+            patch.setattr(goodreads_rss_scraper, 'get_pool', lambda: None)
+            in_process = list(GoodreadsRSSScraper(base_url=stub.url).iter_books_via_rss('700'))
+        assert parse_pool == []
+
+        batches = list(GoodreadsRSSScraper(base_url=stub.url).iter_books_via_rss('700'))
+
+    # Page 1 is parsed in-process for the unchanged-feed check, the rest in the pool
+    assert [url.rsplit('page=', 1)[1] for url in parse_pool] == ['2', '3']
+    assert [batch['page'] for batch in batches] == [1, 2, 3]
+    assert [batch['books'] for batch in batches] == [batch['books'] for batch in in_process]
+    assert sum(len(batch['books']) for batch in batches) == 250
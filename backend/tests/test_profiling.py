@@ -0,0 +1,53 @@
+import threading
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from middleware.profiling import ProfilingMiddleware, run_blocking
+from services import profiling
+
+
+def test_admin_request_profiles_loop_and_handler_and_stores_off_the_loop(tmp_path, monkeypatch):
+    monkeypatch.setenv('PERSONAL_API_KEY', 'admin-key')
+    monkeypatch.setattr(profiling, 'PROFILE_DIR', str(tmp_path))
+    threads = {}
+    store = profiling.RunningProfile.store
+
+    def record_store(profile):
+        threads.setdefault('store', []).append((profile.name, threading.get_ident()))
+        store(profile)
+
+    monkeypatch.setattr(profiling.RunningProfile, 'store', record_store)
+
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware)
+
+    @app.get('/work')
+    async def work(request: Request):
+        threads['loop'] = threading.get_ident()
+        return {'total': await run_blocking(request, lambda: sum(range(10000)))}
+
+    response = TestClient(app).get('/work', headers={'X-Profile': 'cprofile', 'X-API-Key': 'admin-key'})
+
+    assert response.json() == {'total': sum(range(10000))}
+    assert response.headers['x-profile-scope'] == 'event-loop'
+    assert profiling.find_profile(response.headers['x-profile-id'])
+    assert profiling.find_profile(response.headers['x-handler-profile-id'])
+    loop_store = [ident for name, ident in threads['store'] if 'event loop' in name]
+    assert loop_store and loop_store[0] != threads['loop']
+
+
+def test_requests_without_the_admin_key_are_not_profiled(tmp_path, monkeypatch):
+    monkeypatch.setenv('PERSONAL_API_KEY', 'admin-key')
+    monkeypatch.setattr(profiling, 'PROFILE_DIR', str(tmp_path))
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware)
+
+    @app.get('/work')
+    async def work():
+        return {}
+
+    response = TestClient(app).get('/work', headers={'X-Profile': 'cprofile', 'X-API-Key': 'other'})
+
+    assert 'x-profile-id' not in response.headers
+    assert list(tmp_path.iterdir()) == []
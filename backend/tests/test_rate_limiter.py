@@ -0,0 +1,58 @@
+import pytest
+
+from services.rate_limiter import HostRateLimiter, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_a_full_bucket_allows_a_burst_of_its_capacity():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=5, clock=clock)
+
+    delays = [bucket.reserve() for _ in range(7)]
+
+    assert delays[:5] == [0.0] * 5
+    # Beyond the burst, callers queue up half a second apart
+    assert delays[5:] == pytest.approx([0.5, 1.0])
+
+
+def test_tokens_refill_at_the_rate_up_to_the_capacity():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=5, clock=clock)
+    for _ in range(5):
+        bucket.reserve()
+
+    clock.now += 1
+    assert [bucket.reserve() for _ in range(3)] == pytest.approx([0.0, 0.0, 0.5])
+
+    # A long idle spell refills the bucket only to its capacity
+    clock.now += 60
+    assert [bucket.reserve() for _ in range(6)] == pytest.approx([0.0] * 5 + [0.5])
+
+
+def test_reserved_deficits_are_paid_back_before_new_tokens_are_free():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1, capacity=1, clock=clock)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(1.0)
+    assert bucket.reserve() == pytest.approx(2.0)
+
+    clock.now += 2
+    assert bucket.reserve() == pytest.approx(1.0)
+
+
+def test_each_host_has_its_own_bucket():
+    clock = FakeClock()
+    limiter = HostRateLimiter(rate=1, capacity=1, clock=clock)
+
+    goodreads = limiter.bucket_for('https://www.goodreads.com/review/list_rss/1')
+    assert goodreads is limiter.bucket_for('https://www.goodreads.com/user/show/1')
+    assert goodreads.reserve() == 0.0
+    assert limiter.bucket_for('https://images.gr-assets.com/x.jpg').reserve() == 0.0
+    assert goodreads.reserve() == pytest.approx(1.0)
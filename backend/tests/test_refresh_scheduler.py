@@ -0,0 +1,131 @@
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from services import refresh_scheduler
+from services.activity import read_activity
+from services.refresh_scheduler import RefreshScheduler
+
+HOUR = 3600.0
+
+
+class StoredUsers:
+    """Stands in for the database: refresh candidates scraped the given seconds ago"""
+
+    def __init__(self, ages):
+        now = time.time()
+        self.candidates = [
+            {
+                'username': username,
+                'profile_url': f'https://www.goodreads.com/user/show/{n}-{username}',
+                'scraped_at': datetime.fromtimestamp(now - age, timezone.utc).isoformat() if age is not None else None,
+                'feed_ttl': None,
+            }
+            for n, (username, age) in enumerate(ages.items())
+        ]
+
+    def get_refresh_candidates(self):
+        return self.candidates
+
+
+class RecordingScrapes:
+    def __init__(self):
+        self.scraped = []
+
+    def scrape_and_save_user(self, profile_url, streaming=False):
+        self.scraped.append(profile_url.rsplit('-', 1)[1])
+        return {'success': True, 'books_count': None}
+
+
+def scheduler(ages, **kwargs):
+    return RefreshScheduler(
+        scraping_service=RecordingScrapes(), db=StoredUsers(ages),
+        active_interval=HOUR, idle_interval=24 * HOUR, jitter=0, **kwargs
+    )
+
+
+def drain_due(scheduler):
+    order = []
+    while True:
+        entry, next_due = scheduler._pop_due(time.time())
+        if entry is None:
+            return order, next_due
+        order.append(entry.username)
+
+
+def test_most_overdue_users_come_first(monkeypatch):
+    monkeypatch.setattr(read_activity, '_last_read', type(read_activity._last_read)())
+    refresh = scheduler({'recent': HOUR, 'old': 30 * HOUR, 'never': None, 'older': 50 * HOUR})
+    refresh.reload()
+
+    order, next_due = drain_due(refresh)
+
+    assert order == ['never', 'older', 'old']
+    # 'recent' is idle, so due a day after its scrape
+    assert next_due == pytest.approx(time.time() + 23 * HOUR, abs=5)
+
+
+def test_reads_bring_a_user_forward_and_supersede_the_old_place(monkeypatch):
+    monkeypatch.setattr(read_activity, '_last_read', type(read_activity._last_read)())
+    refresh = scheduler({'reader': 2 * HOUR, 'idle': 20 * HOUR})
+    refresh.reload()
+    assert drain_due(refresh)[0] == []
+
+    read_activity.touch('reader')
+    refresh._promote_read_users(time.time())
+
+    order, next_due = drain_due(refresh)
+    assert order == ['reader']
+    # The reader's superseded idle place was dropped rather than returned again
+    assert next_due == pytest.approx(time.time() + 4 * HOUR, abs=5)
+
+
+class StopAfter:
+    """Stands in for the stop event: records each wait without sleeping"""
+
+    def __init__(self, waits):
+        self.waits = []
+        self.remaining = waits
+
+    def wait(self, seconds):
+        self.waits.append(seconds)
+        self.remaining -= 1
+        return self.remaining < 0
+
+    def is_set(self):
+        return self.remaining < 0
+
+    def set(self):
+        self.remaining = -1
+
+
+def test_refreshes_are_spaced_by_the_budget(monkeypatch):
+    monkeypatch.setattr(read_activity, '_last_read', type(read_activity._last_read)())
+    monkeypatch.setattr(refresh_scheduler.random, 'uniform', lambda low, high: low)
+    refresh = scheduler({f'user{n}': (30 + n) * HOUR for n in range(4)}, budget_per_hour=HOUR)
+    # The start-up delay, one budget wait per refresh, then a wait for the next due user
+    refresh._stop = StopAfter(waits=6)
+
+    refresh._run()
+
+    assert refresh.scraping_service.scraped == ['user3', 'user2', 'user1', 'user0']
+    # One refresh a second: the waits don't sleep, so each refresh owes one more second
+    assert refresh._stop.waits[1:5] == pytest.approx([0, 1, 2, 3], abs=0.1)
+    # Everyone was refreshed, so nothing is due before the next poll
+    assert refresh._stop.waits[5] == pytest.approx(refresh_scheduler.POLL_SECONDS, abs=1)
+
+
+def test_refreshes_are_off_by_default():
+    env = {name: value for name, value in os.environ.items() if name != 'REFRESH_ENABLED'}
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    output = subprocess.run(
+        [sys.executable, '-c', 'from services.refresh_scheduler import REFRESH_ENABLED; print(REFRESH_ENABLED)'],
+        cwd=backend, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+
+    assert output.strip() == 'False'
@@ -0,0 +1,77 @@
+import base64
+import gzip
+import uuid
+
+import pytest
+from sqlalchemy import func, select
+
+from benchmarks.fake_supabase import FakeSupabase
+from benchmarks.synthetic import list_rss_feed
+from services.database import DatabaseService
+from services.rss_archive import compress_payload, content_hash, decompress_payload
+from services.sql_database import rss_payloads
+
+FEED = list_rss_feed(entries=40, seed=3) + '\n<!-- café — “quoted” -->'
+
+
+class FakeSupabaseDatabase(DatabaseService):
+    """The Supabase backend against the in-memory stand-in"""
+
+    def __init__(self):
+        super().__init__()
+        self.supabase = FakeSupabase()
+        self.engine = None
+        self.SessionLocal = None
+
+    def payload_count(self):
+        return len(self.supabase.tables['rss_payloads'])
+
+
+@pytest.fixture(params=['sql', 'supabase'])
+def archive_db(request, monkeypatch):
+    if request.param == 'sql':
+        db = request.getfixturevalue('sql_db')
+
+        def payload_count():
+            with db.engine.connect() as conn:
+                return conn.execute(select(func.count()).select_from(rss_payloads)).scalar()
+
+        db.payload_count = payload_count
+        return db
+    monkeypatch.delenv('DATABASE_URL', raising=False)
+    return FakeSupabaseDatabase()
+
+
+def test_payload_round_trips_through_gzip_and_base64():
+    payload = compress_payload(FEED)
+
+    assert payload['content_hash'] == content_hash(FEED)
+    assert payload['raw_size'] == len(FEED.encode('utf-8'))
+    assert payload['compressed_size'] < payload['raw_size']
+    assert gzip.decompress(base64.b64decode(payload['compressed_content'])).decode('utf-8') == FEED
+    assert decompress_payload(payload['encoding'], payload['compressed_content']) == FEED
+
+
+def test_unknown_encodings_are_refused():
+    with pytest.raises(ValueError):
+        decompress_payload('zstd', compress_payload(FEED)['compressed_content'])
+
+
+def save_feed(db, raw_content):
+    feed_id = str(uuid.uuid4())
+    db.save_archived_rss_feed({'id': feed_id, 'user_id': 'user-1', 'feed_url': 'https://example.com/rss'}, raw_content)
+    return feed_id
+
+
+def test_identical_payloads_are_archived_once(archive_db):
+    archive_db.save_user_data({'id': 'user-1', 'username': 'Pager', 'profile_url': 'https://example.com/user/show/1'})
+    first = save_feed(archive_db, FEED)
+    # A fresh process doesn't remember the hash, but the stored payload is found
+    archive_db._known_payload_hashes.clear()
+    second = save_feed(archive_db, FEED)
+    other = save_feed(archive_db, FEED + '\n')
+
+    assert archive_db.payload_count() == 2
+    assert archive_db.get_rss_feed_content(first) == FEED
+    assert archive_db.get_rss_feed_content(second) == FEED
+    assert archive_db.get_rss_feed_content(other) == FEED + '\n'
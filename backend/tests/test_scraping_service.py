@@ -0,0 +1,156 @@
+from benchmarks.goodreads_stub import GoodreadsStub
+from benchmarks.synthetic import REVISED_EVERY
+from scrapers.goodreads_rss_scraper import GoodreadsRSSScraper
+from services.scraping_service import ScrapingService
+
+
+def test_default_scrape_saves_each_page_before_fetching_the_next(sql_db, monkeypatch):
+    with GoodreadsStub() as stub:
+        stub.add_library('700', 'Pager', 250)
+        service = ScrapingService(db=sql_db, base_url=stub.url)
+        save_user_books = sql_db.save_user_books
+        requests_at_save = []
+
+        def record_save(user_books):
+            requests_at_save.append(stub.requests)
+            return save_user_books(user_books)
+
+        monkeypatch.setattr(sql_db, 'save_user_books', record_save)
+        result = service.scrape_and_save_user(stub.profile_url('700'))
+
+    assert result['books_count'] == 250
+    # The profile, then one feed page per save
+    assert requests_at_save == [2, 3, 4]
+
+
+def test_change_confined_to_a_later_page_is_synced(sql_db):
+    with GoodreadsStub() as stub:
+        library = stub.add_library('700', 'Pager', 250)
+        service = ScrapingService(db=sql_db, base_url=stub.url)
+        assert service.scrape_and_save_user(stub.profile_url('700'))['books_count'] == 250
+
+        # The last ten entries, all on page 3, are removed
+        library.entries = 240
+        result = service.scrape_and_save_user(stub.profile_url('700'))
+
+    assert result['books_count'] == 240
+    assert result['changes'] == {'inserted': 0, 'updated': 0, 'deleted': 10}
+
+
+def test_unchanged_single_page_feed_is_not_walked_again(sql_db):
+    with GoodreadsStub() as stub:
+        stub.add_library('700', 'Pager', 50)
+        service = ScrapingService(db=sql_db, base_url=stub.url)
+        service.scrape_and_save_user(stub.profile_url('700'))
+
+        stub.reset_counters()
+        result = service.scrape_and_save_user(stub.profile_url('700'))
+
+    assert result['books_count'] is None
+    # The profile and a 304 for the feed
+    assert stub.requests == 2
+
+
+def test_profile_reached_by_another_url_updates_the_same_user(sql_db):
+    with GoodreadsStub() as stub:
+        stub.add_library('700', 'Pager', 50)
+        service = ScrapingService(db=sql_db, base_url=stub.url)
+        first = service.scrape_and_save_user(stub.profile_url('700'))
+        GoodreadsRSSScraper.forget_feed_validators()
+
+        # No slug, and the stand-in has no profile page at this URL
+        bare = service.scrape_and_save_user(f'{stub.url}/user/show/700')
+        GoodreadsRSSScraper.forget_feed_validators()
+        renamed = service.scrape_and_save_user(f'{stub.url}/user/show/700-renamed')
+
+    assert bare['user_id'] == renamed['user_id'] == first['user_id']
+    assert bare['username'] == 'Pager'
+    assert bare['changes'] == {'inserted': 0, 'updated': 0, 'deleted': 0}
+    assert sql_db.get_user_by_goodreads_id('700')['username'] == 'renamed'
+    assert sql_db.get_user_by_username('Pager') is None
+
+
+def test_unchanged_feed_writes_nothing(sql_db, monkeypatch):
+    with GoodreadsStub() as stub:
+        stub.add_library('700', 'Pager', 250)
+        service = ScrapingService(db=sql_db, base_url=stub.url)
+        service.scrape_and_save_user(stub.profile_url('700'))
+        writes = []
+        for name in ('save_books', 'save_user_books', 'delete_user_books'):
+            monkeypatch.setattr(sql_db, name, lambda rows, name=name: writes.append(name))
+
+        result = service.scrape_and_save_user(stub.profile_url('700'))
+
+    assert result['books_count'] == 250
+    assert result['changes'] == {'inserted': 0, 'updated': 0, 'deleted': 0}
+    assert writes == []
+
+
+def test_revised_entries_are_updated_in_place(sql_db):
+    with GoodreadsStub() as stub:
+        library = stub.add_library('700', 'Pager', 250)
+        service = ScrapingService(db=sql_db, base_url=stub.url)
+        first = service.scrape_and_save_user(stub.profile_url('700'))
+        before = {row['rss_guid']: row for row in sql_db.get_user_book_index(first['user_id'])}
+
+        # Every REVISED_EVERY-th entry changes, keeping its guid
+        library.revise()
+        result = service.scrape_and_save_user(stub.profile_url('700'))
+        after = {row['rss_guid']: row for row in sql_db.get_user_book_index(first['user_id'])}
+
+    revised = len(range(0, 250, REVISED_EVERY))
+    assert result['changes'] == {'inserted': 0, 'updated': revised, 'deleted': 0}
+    assert before.keys() == after.keys()
+    assert all(after[guid]['id'] == row['id'] for guid, row in before.items())
+    assert sum(after[guid]['content_hash'] != row['content_hash'] for guid, row in before.items()) == revised
+
+
+def test_removed_entries_are_deleted(sql_db):
+    with GoodreadsStub() as stub:
+        library = stub.add_library('700', 'Pager', 50)
+        service = ScrapingService(db=sql_db, base_url=stub.url)
+        first = service.scrape_and_save_user(stub.profile_url('700'))
+
+        library.entries = 45
+        result = service.scrape_and_save_user(stub.profile_url('700'))
+
+    assert result['changes'] == {'inserted': 0, 'updated': 0, 'deleted': 5}
+    assert len(sql_db.get_user_book_index(first['user_id'])) == 45
+
+
+def test_batch_summary_is_computed_from_the_clock(monkeypatch):
+    class Clock:
+        now = 50.0
+
+        def __call__(self):
+            return self.now
+
+    clock = Clock()
+    service = ScrapingService(db=object(), clock=clock)
+    outcomes = {
+        'https://www.goodreads.com/user/show/1-a': (2.0, {'success': True, 'books_count': 30}),
+        'https://www.goodreads.com/user/show/2-b': (1.0, {'success': False, 'error': 'timed out'}),
+        'https://www.goodreads.com/user/show/3-c': (3.0, {'success': True, 'books_count': None}),
+    }
+
+    def scrape(profile_url, streaming=False, incremental=True):
+        seconds, result = outcomes[profile_url]
+        clock.now += seconds
+        return dict(result)
+
+    monkeypatch.setattr(service, 'scrape_and_save_user', scrape)
+    batch = service.scrape_many(list(outcomes), max_parallel=1)
+
+    assert batch['success'] is False
+    assert batch['summary'] == {
+        'profiles': 3,
+        'succeeded': 2,
+        'failed': 1,
+        'books_count': 30,
+        'elapsed_seconds': 6.0,
+        'profiles_per_second': 0.5,
+        'books_per_second': 5.0,
+    }
+    assert [result['profile_url'] for result in batch['results']] == list(outcomes)
+    assert [result['elapsed_seconds'] for result in batch['results']] == [2.0, 1.0, 3.0]
+    assert batch['message'] == 'Scraped 2 of 3 profiles'
@@ -0,0 +1,116 @@
+import threading
+
+import pytest
+
+from services import single_flight
+from services.single_flight import SingleFlight
+
+CALLERS = 8
+
+
+class CountingWaits:
+    """Stands in for the coalesced_calls metric to tell when followers are waiting"""
+
+    def __init__(self, expected):
+        self.count = 0
+        self.expected = expected
+        self.all_waiting = threading.Event()
+        self._lock = threading.Lock()
+
+    def labels(self, **labels):
+        return self
+
+    def inc(self):
+        with self._lock:
+            self.count += 1
+            if self.count == self.expected:
+                self.all_waiting.set()
+
+
+def run_concurrently(flight, key, fn, monkeypatch):
+    """Call flight.do from CALLERS threads while fn is held in flight; returns the outcomes"""
+    waits = CountingWaits(CALLERS - 1)
+    monkeypatch.setattr(single_flight, 'coalesced_calls', waits)
+    started = threading.Event()
+    release = threading.Event()
+    outcomes = []
+    outcomes_lock = threading.Lock()
+
+    def held():
+        started.set()
+        assert release.wait(5)
+        return fn()
+
+    def caller():
+        try:
+            outcome = ('value', flight.do(key, held))
+        except Exception as e:
+            outcome = ('error', e)
+        with outcomes_lock:
+            outcomes.append(outcome)
+
+    threads = [threading.Thread(target=caller) for _ in range(CALLERS)]
+    threads[0].start()
+    assert started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    assert waits.all_waiting.wait(5)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    return outcomes
+
+
+def test_concurrent_calls_with_one_key_run_once_and_share_the_result(monkeypatch):
+    flight = SingleFlight('test')
+    runs = []
+    result = object()
+
+    def load():
+        runs.append(1)
+        return result
+
+    outcomes = run_concurrently(flight, 'key', load, monkeypatch)
+
+    assert len(runs) == 1
+    assert all(kind == 'value' and value is result for kind, (value, _) in outcomes)
+    assert sorted(shared for _, (_, shared) in outcomes) == [False] + [True] * (CALLERS - 1)
+    assert flight.in_flight() == 0
+
+
+def test_concurrent_calls_share_the_exception_and_release_the_key(monkeypatch):
+    flight = SingleFlight('test')
+    runs = []
+    error = RuntimeError('load failed')
+
+    def load():
+        runs.append(1)
+        raise error
+
+    outcomes = run_concurrently(flight, 'key', load, monkeypatch)
+
+    assert len(runs) == 1
+    assert outcomes == [('error', error)] * CALLERS
+    assert flight.in_flight() == 0
+    # The failure isn't remembered: the next call runs afresh
+    assert flight.do('key', lambda: 'fresh') == ('fresh', False)
+
+
+def test_different_keys_do_not_wait_on_each_other():
+    flight = SingleFlight('test')
+    release = threading.Event()
+    thread = threading.Thread(target=flight.do, args=('slow', lambda: release.wait(5)))
+    thread.start()
+    try:
+        assert flight.do('other', lambda: 'quick') == ('quick', False)
+    finally:
+        release.set()
+        thread.join(5)
+
+
+def test_errors_reach_a_lone_caller():
+    flight = SingleFlight('test')
+
+    with pytest.raises(ValueError):
+        flight.do('key', lambda: int('x'))
+    assert flight.in_flight() == 0
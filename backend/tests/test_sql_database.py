@@ -0,0 +1,140 @@
+from datetime import datetime
+import uuid
+
+from benchmarks.goodreads_stub import GoodreadsStub
+from scrapers.scraped_book import ScrapedBook
+from services import sql_database
+from services.cache import library_cache
+from services.metrics import registry
+from services.scraping_service import ScrapingService
+
+
+def save_user(db, username='reader'):
+    user = {'id': str(uuid.uuid4()), 'username': username, 'profile_url': f'https://example.com/{username}'}
+    db.save_user_data(user)
+    return user
+
+
+def save_entries(db, user, entries):
+    """Store parsed feed entries for the user the way a scrape does"""
+    books, user_books = [], []
+    for entry in entries:
+        book, user_book = ScrapedBook(**entry).to_records(str(uuid.uuid4()), str(uuid.uuid4()), user['id'])
+        books.append(book)
+        user_books.append(user_book)
+    db.save_books(books)
+    db.save_user_books(user_books)
+
+
+def walk_pages(db, user_id, limit):
+    books, cursor = [], None
+    while True:
+        page = db.get_user_books_page(user_id, limit, cursor)
+        books.extend(page['books'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            return books
+
+
+def test_pages_come_newest_date_added_first(sql_db):
+    user = save_user(sql_db)
+    added = {
+        '1': 'Mon, 28 Feb 2011 09:00:00 -0800',
+        '2': 'Tue, 02 Jan 2024 08:00:00 +0000',
+        '3': 'Wed, 15 Mar 2023 23:30:00 -0700',
+        # Later than '3' only once the offsets are taken into account
+        '4': 'Thu, 16 Mar 2023 08:00:00 +0100',
+        '5': '',
+    }
+    save_entries(sql_db, user, [
+        {'goodreads_id': gid, 'title': f'Book {gid}', 'author': 'Author', 'date_added': date}
+        for gid, date in added.items()
+    ])
+
+    books = walk_pages(sql_db, user['id'], limit=2)
+
+    # Rows without date_added come first, as in Postgres
+    assert [book['books']['goodreads_id'] for book in books] == ['5', '2', '4', '3', '1']
+    assert books[1]['date_added'].startswith('2024-01-02T08:00:00')
+
+
+def test_saving_known_books_keeps_their_ids(sql_db):
+    user = save_user(sql_db)
+    save_entries(sql_db, user, [{'goodreads_id': '42', 'title': 'First', 'author': 'Author'}])
+    stored = sql_db.get_book_by_goodreads_id('42')
+
+    saved = sql_db.save_books([{'id': str(uuid.uuid4()), 'goodreads_id': '42', 'title': 'Renamed', 'author': 'Author'}])
+
+    assert saved[0]['id'] == stored['id']
+    book = sql_db.get_book_by_goodreads_id('42')
+    assert (book['id'], book['title']) == (stored['id'], 'Renamed')
+
+
+def test_scraped_library_reads_back_in_date_order(sql_db):
+    with GoodreadsStub() as stub:
+        stub.add_library('700', 'Pager', 250)
+        service = ScrapingService(db=sql_db, base_url=stub.url)
+
+        result = service.scrape_and_save_user(stub.profile_url('700'))
+        assert result['success'], result.get('error')
+
+        user = sql_db.get_user_by_username(result['username'])
+        books = walk_pages(sql_db, user['id'], limit=100)
+
+    assert len(books) == 250
+    dates = [datetime.fromisoformat(book['date_added']) for book in books]
+    assert dates == sorted(dates, reverse=True)
+
+
+
+def test_goodreads_ids_are_resolved_in_chunks(sql_db, monkeypatch):
+    user = save_user(sql_db)
+    save_entries(sql_db, user, [
+        {'goodreads_id': str(gid), 'title': f'Book {gid}', 'author': 'Author'} for gid in range(10)
+    ])
+    stored = {str(gid): sql_db.get_book_by_goodreads_id(str(gid))['id'] for gid in range(10)}
+    sql_db._book_id_cache.clear()
+    monkeypatch.setattr(sql_database, 'GOODREADS_ID_CHUNK_SIZE', 4)
+
+    def selects():
+        return registry.get_sample_value('cozybookshelf_sql_statements_total', {'verb': 'SELECT'}) or 0
+
+    before = selects()
+    resolved = sql_db.get_book_ids_by_goodreads_ids([str(gid) for gid in range(12)])
+
+    assert resolved == stored
+    # Twelve uncached ids in chunks of four
+    assert selects() - before == 3
+
+def test_status_read_racing_a_scrape_is_not_cached(sql_db, monkeypatch):
+    user = save_user(sql_db)
+    save_entries(sql_db, user, [{'goodreads_id': '1', 'title': 'Old', 'author': 'Author', 'status': 'read'}])
+    load = sql_db._load_books_by_status
+
+    def load_during_scrape(username, status):
+        rows = load(username, status)
+        # A scrape finishing while the rows were read invalidates the user
+        library_cache.invalidate_user(username)
+        return rows
+
+    monkeypatch.setattr(sql_db, '_load_books_by_status', load_during_scrape)
+    assert [row['books']['title'] for row in sql_db.get_read_books('reader')] == ['Old']
+    assert library_cache.get(('status', 'reader', 'read')) == (False, None)
+
+    monkeypatch.setattr(sql_db, '_load_books_by_status', load)
+    sql_db.get_read_books('reader')
+    assert library_cache.get(('status', 'reader', 'read'))[0]
+
+
+def test_feed_dates_are_stored_as_utc_timestamps(sql_db):
+    user = save_user(sql_db)
+    save_entries(sql_db, user, [{
+        'goodreads_id': '1', 'title': 'Book', 'author': 'Author',
+        'date_added': 'Mon, 28 Feb 2011 09:00:00 -0800',
+        'date_finished': 'Sat, 15 Jun 2024 00:00:00 -0700',
+    }])
+
+    book = sql_db.get_user_books(user['id'])[0]
+
+    assert book['date_added'].startswith('2011-02-28T17:00:00')
+    assert book['date_finished'].startswith('2024-06-15T07:00:00')
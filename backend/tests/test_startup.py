@@ -0,0 +1,50 @@
+import sys
+import time
+
+import pytest
+
+from services import startup
+from services.database import get_database_service
+from services.job_service import get_job_service
+from services.scraping_service import ScrapingService, get_scraping_service
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason='reads /proc')
+def test_process_start_is_read_from_proc():
+    first = startup.seconds_since_process_start()
+    time.sleep(0.05)
+    second = startup.seconds_since_process_start()
+
+    assert 0 < first < second
+
+
+@pytest.fixture
+def stored_services(sql_db):
+    services = (get_database_service, get_scraping_service, get_job_service)
+    for service, instance in zip(services, (sql_db, ScrapingService(db=sql_db), object())):
+        service.set(instance)
+    yield
+    for service in services:
+        service.set(None)
+
+
+def test_warm_up_reports_boot_and_total_from_the_lifespan_start(stored_services, monkeypatch):
+    monkeypatch.setattr(startup, 'startup_state', startup.StartupState())
+    started = time.perf_counter()
+
+    startup.warm_up(started, boot_seconds=1.5)
+
+    report = startup.startup_state.report
+    assert startup.startup_state.warmed_up
+    assert report['boot'] == 1.5
+    assert 'create_tables' in report
+    assert 1.5 <= report['total'] < 1.5 + time.perf_counter() - started + 0.001
+
+
+def test_warm_up_without_a_process_start_omits_boot(stored_services, monkeypatch):
+    monkeypatch.setattr(startup, 'startup_state', startup.StartupState())
+
+    startup.warm_up(time.perf_counter(), boot_seconds=None)
+
+    assert 'boot' not in startup.startup_state.report
+    assert startup.startup_state.report['total'] >= 0
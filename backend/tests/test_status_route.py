@@ -0,0 +1,55 @@
+def scraped(api, entries=120):
+    client, stub, service = api
+    stub.add_library('700', 'Pager', entries)
+    service.scrape_and_save_user(stub.profile_url('700'))
+    return client, service
+
+
+def test_status_route_returns_only_that_shelf(api):
+    client, service = scraped(api)
+    user = service.get_user('Pager')
+    expected = {book['id'] for book in service.db.get_user_books(user['id']) if book['status'] == 'to-read'}
+
+    response = client.get('/api/v1/user/Pager/status/to-read')
+
+    body = response.json()
+    assert response.status_code == 200
+    assert body['status'] == 'to-read'
+    assert body['count'] == len(body['books']) == len(expected) > 0
+    assert {book['id'] for book in body['books']} == expected
+
+
+def test_unknown_status_is_rejected(api):
+    client, _ = scraped(api, entries=5)
+
+    response = client.get('/api/v1/user/Pager/status/abandoned')
+
+    assert response.status_code == 422
+
+
+def test_status_route_pages_with_a_cursor(api):
+    client, _ = scraped(api)
+    everything = client.get('/api/v1/user/Pager/status/read').json()['books']
+
+    pages = []
+    cursor = None
+    while True:
+        params = {'limit': 7, **({'cursor': cursor} if cursor else {})}
+        body = client.get('/api/v1/user/Pager/status/read', params=params).json()
+        pages.append(body['books'])
+        cursor = body['next_cursor']
+        if not cursor:
+            break
+
+    paged = [book['id'] for page in pages for book in page]
+    assert all(len(page) == 7 for page in pages[:-1])
+    assert len(paged) == len(set(paged)) == len(everything)
+    assert set(paged) == {book['id'] for book in everything}
+
+
+def test_status_route_rejects_a_malformed_cursor(api):
+    client, _ = scraped(api, entries=5)
+
+    response = client.get('/api/v1/user/Pager/status/read', params={'limit': 2, 'cursor': 'not-a-cursor'})
+
+    assert response.status_code == 400
@@ -0,0 +1,72 @@
+import json
+
+from api import streaming
+from services.database import STREAM_CHUNK_SIZE
+
+LIBRARY_SIZE = 2 * STREAM_CHUNK_SIZE + 100
+
+
+def scraped_library(api, monkeypatch):
+    client, stub, service = api
+    stub.add_library('700', 'Pager', LIBRARY_SIZE)
+    service.scrape_and_save_user(stub.profile_url('700'))
+    pages = []
+    get_user_books_page = service.db.get_user_books_page
+
+    def record_page(*args, **kwargs):
+        page = get_user_books_page(*args, **kwargs)
+        pages.append(len(page['books']))
+        return page
+
+    monkeypatch.setattr(service.db, 'get_user_books_page', record_page)
+    return client, pages
+
+
+def test_ndjson_streams_one_book_per_line(api, monkeypatch):
+    client, pages = scraped_library(api, monkeypatch)
+
+    response = client.get('/api/v1/user/Pager', params={'format': 'ndjson'})
+
+    assert response.headers['content-type'] == streaming.NDJSON_MEDIA_TYPE
+    assert response.text.endswith('\n')
+    lines = response.text.splitlines()
+    assert len(lines) == LIBRARY_SIZE
+    books = [json.loads(line) for line in lines]
+    assert len({book['id'] for book in books}) == LIBRARY_SIZE
+    # Read from the database a chunk at a time
+    assert pages == [STREAM_CHUNK_SIZE, STREAM_CHUNK_SIZE, 100]
+
+
+def test_json_stream_is_the_buffered_document(api, monkeypatch):
+    client, pages = scraped_library(api, monkeypatch)
+
+    streamed = client.get('/api/v1/user/Pager', params={'format': 'json-stream'}).json()
+    buffered = client.get('/api/v1/user/Pager').json()
+
+    assert streamed['total_books'] == buffered['total_books'] == LIBRARY_SIZE
+    assert len(streamed['books']) == LIBRARY_SIZE
+    assert streamed['user'] == buffered['user']
+    assert sorted(book['id'] for book in streamed['books']) == sorted(book['id'] for book in buffered['books'])
+    assert len(pages) == 3
+
+
+def test_status_stream_counts_only_that_shelf(api, monkeypatch):
+    client, _ = scraped_library(api, monkeypatch)
+
+    buffered = client.get('/api/v1/user/Pager/status/read').json()
+    streamed = client.get('/api/v1/user/Pager/status/read', params={'format': 'json-stream'}).json()
+
+    assert streamed['count'] == buffered['count'] == len(streamed['books'])
+    assert streamed['status'] == 'read'
+
+
+def test_json_document_framing_with_empty_and_grouped_rows(monkeypatch):
+    monkeypatch.setattr(streaming, 'ROWS_PER_WRITE', 2)
+
+    empty = b''.join(streaming.json_document_chunks({'success': True}, 'books', 'count', iter(())))
+    chunks = list(streaming.json_document_chunks({}, 'books', 'count', iter([{'id': n} for n in range(5)])))
+
+    assert json.loads(empty) == {'success': True, 'books': [], 'count': 0}
+    assert json.loads(b''.join(chunks)) == {'books': [{'id': n} for n in range(5)], 'count': 5}
+    # Opening, three groups of rows, closing
+    assert len(chunks) == 5
@@ -5,7 +5,7 @@ import axios from 'axios'
 import BookshelfDisplay from '@/components/BookshelfDisplay'
 import { useBookData } from '@/context/BookDataContext'
 import { useAdmin } from '@/context/AdminContext'
-import { apiGet, apiPost } from '@/lib/api'
+import { apiGet, scrapeProfile } from '@/lib/api'
 
 export default function Home() {
   const { userData, refreshUserData } = useBookData()
@@ -30,11 +30,7 @@ export default function Home() {
     setResult(null)
 
     try {
-      const response = await apiPost('/api/v1/scrape', {
-        profile_url: profileUrl,
-        full_scrape: true
-      })
-      const responseData = await response.json()
+      const responseData = await scrapeProfile(profileUrl)
 
       setResult(responseData)
       // Auto-set the username after successful scrape
@@ -43,7 +39,7 @@ export default function Home() {
         setUsernameInput(responseData.username)
       }
     } catch (err: any) {
-      setError(err.response?.data?.detail || 'Failed to scrape profile')
+      setError(err.response?.data?.detail || err.message || 'Failed to scrape profile')
     } finally {
       setLoading(false)
     }
@@ -82,11 +78,7 @@ export default function Home() {
       }
 
       // Rescrape using the original profile URL
-      const response = await apiPost('/api/v1/scrape', {
-        profile_url: profileUrlToUse,
-        full_scrape: true
-      })
-      const responseData = await response.json()
+      const responseData = await scrapeProfile(profileUrlToUse)
 
       if (responseData.success) {
         // Refresh the cached data
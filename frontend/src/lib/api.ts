@@ -51,4 +51,33 @@ export async function apiPost(url: string, body: any, skipAuth = false) {
     body: JSON.stringify(body),
     skipAuth,
   })
-}
\ No newline at end of file
+}
+/**
+ * Queue a scrape of a Goodreads profile and wait for the background job to
+ * finish, polling its status. Resolves with the scrape result.
+ */
+export async function scrapeProfile(profileUrl: string, pollIntervalMs = 1000) {
+  const response = await apiPost('/api/v1/scrape', {
+    profile_url: profileUrl,
+    full_scrape: true
+  })
+  const job = await response.json()
+  if (!response.ok) {
+    throw new Error(job.detail || 'Failed to start scrape')
+  }
+
+  while (true) {
+    await new Promise((resolve) => setTimeout(resolve, pollIntervalMs))
+    const statusResponse = await apiGet(job.status_url)
+    const status = await statusResponse.json()
+    if (!statusResponse.ok) {
+      throw new Error(status.detail || 'Failed to fetch scrape status')
+    }
+    if (status.state === 'succeeded') {
+      return status.result
+    }
+    if (status.state === 'failed') {
+      throw new Error(status.error || 'Scraping failed')
+    }
+  }
+}